@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pycurl
+
+from main import sendRequest
+from slatency.domain.entities.request import Request
+from slatency.domain.entities.response_columns import NONE, ResponseColumns
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.url import URL
+from slatency.infrastructure.benchmark.target_server import TargetServer
+from slatency.infrastructure.repositories.sqlite_test_repository import SqliteTestRepository
+from slatency.infrastructure.services.async_curl_multi_test_runner_service import AsyncCurlMultiTestRunnerService
+from slatency.infrastructure.services.columnar_test_output_persistence_service import ColumnarTestOutputPersistenceService
+from slatency.infrastructure.services.curl_multi_test_runner_service import CurlMultiTestRunnerService
+from slatency.infrastructure.services.json_lines_test_output_persistence_service import JsonLinesTestOutputPersistenceService
+from slatency.infrastructure.services.process_pool_test_runner_service import ProcessPoolTestRunnerService
+
+RESULTS_VERSION = 1
+
+# A successful result as written by main.py, used to generate persistence workloads
+RESULT_TEMPLATE = {
+    "http_code": 200, "queueTime_ms": 0.021, "namelookupTime_ms": 0.05, "connectTime_ms": 0.31,
+    "appconnectTime_ms": 0.0, "pretransferTime_ms": 0.35, "startTransferTime_ms": 1.42, "totalTime_ms": 1.47,
+    "redirectTime_ms": 0.0, "localIP": "127.0.0.1", "localPort": 40000, "remoteIP": "127.0.0.1",
+    "remotePort": 8080, "connectionReused": False,
+}
+
+
+def serve_target(connection, options: dict) -> None:
+    """
+    Runs a TargetServer in a child process, so that it does not compete with the
+    client for the GIL, and reports its URL and certificate through `connection`.
+    """
+    server = TargetServer(**options)
+    connection.send((server.url, server.certificate))
+    connection.close()
+    server.serve_forever()
+
+
+def start_target(options: dict):
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve_target, args=(child, options), daemon=True)
+    process.start()
+    url, certificate = parent.recv()
+    return process, url, certificate
+
+
+def measure(run, traced: bool) -> dict:
+    """
+    Calls `run` once and measures it. Under tracemalloc Python code runs markedly
+    slower, so throughput comes from an untraced call and peak memory from a traced one.
+    """
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    details = run() or {}
+    measurement = {"seconds": time.perf_counter() - start, "cpu_seconds": time.process_time() - cpu_start}
+    if traced:
+        measurement["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    measurement.update(details)
+    return measurement
+
+
+def timing_error(server_ms, delay_ms: float) -> dict:
+    """
+    How far the measured server processing time (first byte after the request was
+    sent) is from the delay the target injected.
+    """
+    errors = np.asarray(server_ms, dtype=np.float64) - delay_ms
+    errors = errors[~np.isnan(errors)]
+    if not len(errors):
+        return {}
+    p50, p99 = np.percentile(errors, [50, 99])
+    return {"mean": float(errors.mean()), "p50": float(p50), "p99": float(p99), "max": float(errors.max())}
+
+
+def check_round_trip(test: Test) -> None:
+    """
+    Checks that the responses of a run survive being copied into another
+    ResponseColumns and saved to and loaded from SQLite, ids included.
+    """
+    responses = list(test.responses)
+    if ResponseColumns(responses) != responses:
+        raise RuntimeError("ResponseColumns does not keep the responses appended to it")
+    with tempfile.TemporaryDirectory(prefix="slatency-benchmark-") as directory:
+        with SqliteTestRepository(os.path.join(directory, "tests.db")) as repository:
+            repository.save(test)
+            loaded = repository.find_by_id(test.test_id)
+    if loaded is None or loaded.responses != responses:
+        raise RuntimeError("SqliteTestRepository does not load the responses it saved")
+
+
+def probe_benchmark(name: str, run, probes: int, delay_ms: float) -> dict:
+    timed = measure(run, traced=False)
+    traced = measure(run, traced=True)
+    if "test" in timed:
+        check_round_trip(timed["test"])
+    return {
+        "name": name,
+        "category": "probing",
+        "operations": probes,
+        "seconds": timed["seconds"],
+        "cpu_seconds": timed["cpu_seconds"],
+        "operations_per_second": probes / timed["seconds"],
+        "peak_memory_bytes": traced["peak_memory_bytes"],
+        "memory_measure": "tracemalloc",
+        "failures": timed["failures"],
+        "timing_error_ms": timing_error(timed["server_ms"], delay_ms),
+    }
+
+
+def send_request_run(url: str, probes: int, ca_info: str):
+    def run() -> dict:
+        server_ms = []
+        failures = 0
+        for _ in range(probes):
+            result = sendRequest(url, 5, 10, ca_info=ca_info)
+            if "error" in result:
+                failures += 1
+            else:
+                server_ms.append(result["startTransferTime_ms"] - result["pretransferTime_ms"])
+        return {"server_ms": server_ms, "failures": failures}
+    return run
+
+
+def runner_run(url: str, probes: int, make_runner, asynchronous: bool = False):
+    def run() -> dict:
+        test = Test(request=Request(url=URL.from_string(url), method=HTTPMethod.GET, headers={}, body=None),
+                    expected_responses=probes)
+        runner = make_runner()
+        if asynchronous:
+            asyncio.run(runner.execute(test))
+        else:
+            runner.execute(test)
+        responses = test.responses
+        return {
+            "server_ms": np.frombuffer(responses.timings["receive_first_byte"], dtype=np.float32)[
+                np.frombuffer(responses.failure_phase, dtype=np.int8) == NONE].astype(np.float64),
+            "failures": len(responses) - responses.successes(),
+            "test": test,
+        }
+    return run
+
+
+def persistence_benchmarks(directory: str, rows: int) -> list:
+    results = [dict(RESULT_TEMPLATE, localPort=40000 + i % 20000, totalTime_ms=1.0 + (i % 997) / 100.0)
+               for i in range(rows)]
+
+    def write_json(path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=4)
+
+    def write_jsonl(path: str) -> None:
+        with JsonLinesTestOutputPersistenceService(path) as writer:
+            for result in results:
+                writer.append_result(result)
+
+    def write_columnar(path: str) -> None:
+        writer = ColumnarTestOutputPersistenceService(path, capacity=rows)
+        for result in results:
+            writer.append_result(result)
+        writer.close()
+
+    benchmarks = []
+    for output_format, write in (("json", write_json), ("jsonl", write_jsonl), ("columnar", write_columnar)):
+        path = os.path.join(directory, f"results.{output_format}")
+        timed = measure(lambda: write(path), traced=False)
+        traced = measure(lambda: write(path), traced=True)
+        benchmarks.append({
+            "name": f"persistence_{output_format}",
+            "category": "persistence",
+            "operations": rows,
+            "seconds": timed["seconds"],
+            "cpu_seconds": timed["cpu_seconds"],
+            "operations_per_second": rows / timed["seconds"],
+            "peak_memory_bytes": traced["peak_memory_bytes"],
+            "memory_measure": "tracemalloc",
+            "file_bytes": os.path.getsize(path),
+        })
+    return benchmarks
+
+
+def analyze_benchmarks(directory: str, rows: int, chunk_size: int) -> list:
+    """
+    Runs analyze.py on the files written by the persistence benchmarks, in a child
+    process each so that its peak resident memory can be read from wait4().
+    """
+    benchmarks = []
+    analyze = os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyze.py")
+    for output_format in ("json", "jsonl", "columnar"):
+        path = os.path.join(directory, f"results.{output_format}")
+        for chunked in (False, True):
+            command = [sys.executable, analyze, path] + (["--chunk-size", str(chunk_size)] if chunked else [])
+            start = time.perf_counter()
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            _, status, usage = os.wait4(process.pid, 0)
+            seconds = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            if process.returncode != 0:
+                raise RuntimeError(f"{' '.join(command)} failed: {process.stderr.read().decode()}")
+            benchmarks.append({
+                "name": f"analyze_{output_format}{'_chunked' if chunked else ''}",
+                "category": "analysis",
+                "operations": rows,
+                "seconds": seconds,
+                "cpu_seconds": usage.ru_utime + usage.ru_stime,
+                "operations_per_second": rows / seconds,
+                # ru_maxrss is in kilobytes on Linux
+                "peak_memory_bytes": usage.ru_maxrss * 1024,
+                "memory_measure": "max_rss",
+            })
+    return benchmarks
+
+
+def run_benchmarks(args) -> dict:
+    http, http_url, _ = start_target({})
+    https, https_url, certificate = start_target({"tls": True})
+    query = f"?delay={args.delay_ms}&size={args.body_size}"
+    probes = args.probes
+    concurrency = args.concurrency
+    scenarios = [
+        ("send_request_http", send_request_run(http_url + query, probes, None)),
+        ("send_request_https", send_request_run(https_url + query, probes, certificate)),
+        ("curl_multi_http", runner_run(http_url + query, probes,
+                                       lambda: CurlMultiTestRunnerService(concurrency=concurrency))),
+        ("curl_multi_https", runner_run(https_url + query, probes,
+                                        lambda: CurlMultiTestRunnerService(concurrency=concurrency, ca_info=certificate))),
+        ("curl_multi_warm_http", runner_run(http_url + query, probes,
+                                            lambda: CurlMultiTestRunnerService(concurrency=concurrency,
+                                                                               reuse_connections=True))),
+        ("curl_multi_http_errors", runner_run(http_url + query + f"&error_rate={args.error_rate}", probes,
+                                              lambda: CurlMultiTestRunnerService(concurrency=concurrency))),
+        ("async_curl_multi_http", runner_run(http_url + query, probes,
+                                             lambda: AsyncCurlMultiTestRunnerService(concurrency=concurrency),
+                                             asynchronous=True)),
+        ("process_pool_http", runner_run(http_url + query, probes,
+                                         lambda: ProcessPoolTestRunnerService(args.workers, concurrency=concurrency))),
+    ]
+    benchmarks = []
+    try:
+        for name, run in scenarios:
+            if args.only and args.only not in name:
+                continue
+            print(f"Running {name}...", flush=True)
+            benchmarks.append(probe_benchmark(name, run, probes, args.delay_ms))
+    finally:
+        http.terminate()
+        https.terminate()
+
+    with tempfile.TemporaryDirectory(prefix="slatency-benchmark-") as directory:
+        if not args.only or "persistence" in args.only or "analyze" in args.only:
+            print("Running persistence benchmarks...", flush=True)
+            persisted = persistence_benchmarks(directory, args.rows)
+            if not args.only or "persistence" in args.only:
+                benchmarks.extend(persisted)
+            if not args.only or "analyze" in args.only:
+                print("Running analyze.py benchmarks...", flush=True)
+                benchmarks.extend(analyze_benchmarks(directory, args.rows, args.chunk_size))
+
+    return {
+        "version": RESULTS_VERSION,
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pycurl": pycurl.version,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                "probes": probes, "delay_ms": args.delay_ms, "body_size": args.body_size,
+                "concurrency": concurrency, "workers": args.workers, "error_rate": args.error_rate,
+                "rows": args.rows, "chunk_size": args.chunk_size,
+            },
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def print_benchmarks(results: dict) -> None:
+    print(f"\n{'benchmark':<26} {'ops/s':>12} {'peak MiB':>10} {'err p50 ms':>11} {'err p99 ms':>11}")
+    for benchmark in results["benchmarks"]:
+        error = benchmark.get("timing_error_ms", {})
+        p50 = f"{error['p50']:.3f}" if error else "-"
+        p99 = f"{error['p99']:.3f}" if error else "-"
+        print(f"{benchmark['name']:<26} {benchmark['operations_per_second']:>12.1f} "
+              f"{benchmark['peak_memory_bytes'] / 2 ** 20:>10.1f} {p50:>11} {p99:>11}")
+
+
+def compare_benchmarks(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Prints the change of every benchmark against a baseline results file and returns
+    whether any throughput dropped or peak memory grew by more than `tolerance`.
+    """
+    previous = {benchmark["name"]: benchmark for benchmark in baseline["benchmarks"]}
+    regressed = False
+    print(f"\n{'benchmark':<26} {'ops/s change':>13} {'memory change':>14}")
+    for benchmark in results["benchmarks"]:
+        old = previous.get(benchmark["name"])
+        if old is None:
+            continue
+        throughput = benchmark["operations_per_second"] / old["operations_per_second"] - 1.0
+        memory = benchmark["peak_memory_bytes"] / old["peak_memory_bytes"] - 1.0 if old["peak_memory_bytes"] else 0.0
+        flag = throughput < -tolerance or memory > tolerance
+        regressed = regressed or flag
+        print(f"{benchmark['name']:<26} {100.0 * throughput:>+12.1f}% {100.0 * memory:>+13.1f}%"
+              f"{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slatency itself against a bundled local target server.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite.")
+    run_parser.add_argument("--probes", type=int, default=1000, help="Probes per probing benchmark (default: 1000).")
+    run_parser.add_argument("--delay-ms", type=float, default=1.0, help="Delay injected by the target, in ms (default: 1.0).")
+    run_parser.add_argument("--body-size", type=int, default=256, help="Response body size in bytes (default: 256).")
+    run_parser.add_argument("--error-rate", type=float, default=0.5, help="Fraction of 500s in the error benchmark (default: 0.5).")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrency of the runner benchmarks (default: 16).")
+    run_parser.add_argument("--workers", type=int, default=2, help="Processes of the process pool benchmark (default: 2).")
+    run_parser.add_argument("--rows", type=int, default=100_000, help="Results written and analyzed by the persistence and analyze.py benchmarks (default: 100000).")
+    run_parser.add_argument("--chunk-size", type=int, default=10_000, help="Chunk size of the chunked analyze.py benchmarks (default: 10000).")
+    run_parser.add_argument("--only", type=str, default=None, help="Only run benchmarks whose name contains this string.")
+    run_parser.add_argument("--output-file", type=str, default="benchmark_results.json", help="File to save the results to (default: benchmark_results.json).")
+    run_parser.add_argument("--baseline", type=str, default=None, help="Earlier results file to compare against; exits with status 1 on a regression.")
+    run_parser.add_argument("--tolerance", type=float, default=0.1, help="Relative change counted as a regression (default: 0.1).")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the target server alone, e.g. to probe it with main.py.")
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080).")
+    serve_parser.add_argument("--delay-ms", type=float, default=0.0, help="Delay before every response, in ms (default: 0).")
+    serve_parser.add_argument("--body-size", type=int, default=0, help="Response body size in bytes (default: 0).")
+    serve_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500 (default: 0).")
+    serve_parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate.")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = TargetServer(args.host, args.port, delay_ms=args.delay_ms, body_size=args.body_size,
+                              error_rate=args.error_rate, tls=args.tls)
+        print(f"Target server listening on {server.url}")
+        if server.certificate:
+            print(f"Certificate: {server.certificate}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nTarget server stopped.")
+        finally:
+            server.server_close()
+        return
+
+    results = run_benchmarks(args)
+    print_benchmarks(results)
+    try:
+        with open(args.output_file, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"\nResults saved to {args.output_file}")
+    except IOError as e:
+        print(f"Error saving results to {args.output_file}: {e}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare_benchmarks(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
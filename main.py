@@ -1,41 +1,57 @@
 import pycurl
-import certifi
-from io import BytesIO
 import argparse
+import math
+import time
 import json # Import the json module
 
+from slatency.domain.entities.request import Request
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.http_version import HTTPVersion
+from slatency.domain.value_objects.url import URL
+from slatency.infrastructure.analysis.client_saturation_monitor import DEFAULT_LAG_THRESHOLD_MS, ClientSaturationMonitor
+from slatency.infrastructure.analysis.percentile_convergence import PercentileConvergence, parse_percentile_targets
+from slatency.infrastructure.analysis.phases import PHASES, result_phases
+from slatency.infrastructure.curl.body_sink import attach_body_sink
+from slatency.infrastructure.curl.handle_setup import default_ca_info
+from slatency.infrastructure.curl.response_reader import read_body
+from slatency.infrastructure.mappers.response_mapper import body_to_result, response_to_result, result_to_response
+from slatency.infrastructure.presentation.live_progress_view import LiveProgressView
+from slatency.infrastructure.services.curl_multi_test_runner_service import CurlMultiTestRunnerService
+from slatency.infrastructure.services.json_lines_test_output_persistence_service import JsonLinesTestOutputPersistenceService
+# The columnar writer (numpy), the process pool and the distributed runner are imported
+# where they are used, so that a plain run starts without paying for them
+
 # Define a constant for microsecond to millisecond conversion
 US_TO_MS_DIVISOR = 1000.0
 
-def sendRequest(url: str, connect_timeout: int, total_timeout: int) -> dict:
+def sendRequest(url: str, connect_timeout: int, total_timeout: int, ca_info: str = None,
+                body_policy: BodyPolicy = None) -> dict:
     statistics = {}
-    buffer = BytesIO()
     request = pycurl.Curl()
     request.setopt(pycurl.URL, url)
-    request.setopt(pycurl.WRITEDATA, buffer)
-    request.setopt(pycurl.CAINFO, certifi.where())
+    # The body is never buffered, the policy decides what is recorded of it
+    attach_body_sink(request, body_policy or BodyPolicy())
+    request.setopt(pycurl.CAINFO, ca_info or default_ca_info())
     
     request.setopt(pycurl.CONNECTTIMEOUT, connect_timeout)
     request.setopt(pycurl.TIMEOUT, total_timeout)
 
     try:
+        # Wall-clock start of the probe, for time-bucketed analysis of long runs
+        statistics["timestamp"] = round(time.time(), 6)
         request.perform()
         statistics["http_code"] = request.getinfo(pycurl.RESPONSE_CODE)
-        # Collect timings and convert to milliseconds
-        statistics["queueTime_ms"] = request.getinfo(pycurl.QUEUE_TIME_T) / US_TO_MS_DIVISOR
-        statistics["namelookupTime_ms"] = request.getinfo(pycurl.NAMELOOKUP_TIME_T) / US_TO_MS_DIVISOR
-        statistics["connectTime_ms"] = request.getinfo(pycurl.CONNECT_TIME_T) / US_TO_MS_DIVISOR
-        statistics["appconnectTime_ms"] = request.getinfo(pycurl.APPCONNECT_TIME_T) / US_TO_MS_DIVISOR
-        statistics["pretransferTime_ms"] = request.getinfo(pycurl.PRETRANSFER_TIME_T) / US_TO_MS_DIVISOR
-        statistics["startTransferTime_ms"] = request.getinfo(pycurl.STARTTRANSFER_TIME_T) / US_TO_MS_DIVISOR
-        statistics["totalTime_ms"] = request.getinfo(pycurl.TOTAL_TIME_T) / US_TO_MS_DIVISOR
-        statistics["redirectTime_ms"] = request.getinfo(pycurl.REDIRECT_TIME_T) / US_TO_MS_DIVISOR
+        collectTimings(request, statistics)
+        statistics.update(body_to_result(read_body(request, failed=not 200 <= statistics["http_code"] < 400)))
         
         if statistics["http_code"] >= 200 and statistics["http_code"] < 400:
             statistics["localIP"] = request.getinfo(pycurl.LOCAL_IP)
             statistics["localPort"] = request.getinfo(pycurl.LOCAL_PORT)
             statistics["remoteIP"] = request.getinfo(pycurl.PRIMARY_IP)
             statistics["remotePort"] = request.getinfo(pycurl.PRIMARY_PORT)
+            statistics["connectionReused"] = request.getinfo(pycurl.NUM_CONNECTS) == 0
         else:
             statistics["error"] = f"HTTP Error: {statistics['http_code']}"
             for key in ["localIP", "localPort", "remoteIP", "remotePort"]:
@@ -43,24 +59,229 @@ def sendRequest(url: str, connect_timeout: int, total_timeout: int) -> dict:
     except pycurl.error as e:
         statistics["error"] = f"PycURL error: {e.args[0]} - {e.args[1]}"
         statistics["http_code"] = -1 
-        for key_ms in ["queueTime_ms", "namelookupTime_ms", "connectTime_ms", "appconnectTime_ms",
-                       "pretransferTime_ms", "startTransferTime_ms", "totalTime_ms", "redirectTime_ms"]:
-            statistics.setdefault(key_ms, 0.0) # Default to float 0.0 for milliseconds
+        # The timings show how far the probe got before failing
+        collectTimings(request, statistics)
+        statistics.update(body_to_result(read_body(request, failed=True)))
         for key_ip in ["localIP", "localPort", "remoteIP", "remotePort"]:
             statistics.setdefault(key_ip, "N/A")
     finally:
         request.close()
     return statistics
 
-def main():
-    parser = argparse.ArgumentParser(description="Send multiple HTTP requests, print timing statistics, and save to JSON.")
+def collectTimings(request: pycurl.Curl, statistics: dict) -> None:
+    # Collect timings and convert to milliseconds
+    statistics["queueTime_ms"] = request.getinfo(pycurl.QUEUE_TIME_T) / US_TO_MS_DIVISOR
+    statistics["namelookupTime_ms"] = request.getinfo(pycurl.NAMELOOKUP_TIME_T) / US_TO_MS_DIVISOR
+    statistics["connectTime_ms"] = request.getinfo(pycurl.CONNECT_TIME_T) / US_TO_MS_DIVISOR
+    statistics["appconnectTime_ms"] = request.getinfo(pycurl.APPCONNECT_TIME_T) / US_TO_MS_DIVISOR
+    statistics["pretransferTime_ms"] = request.getinfo(pycurl.PRETRANSFER_TIME_T) / US_TO_MS_DIVISOR
+    statistics["startTransferTime_ms"] = request.getinfo(pycurl.STARTTRANSFER_TIME_T) / US_TO_MS_DIVISOR
+    statistics["totalTime_ms"] = request.getinfo(pycurl.TOTAL_TIME_T) / US_TO_MS_DIVISOR
+    statistics["redirectTime_ms"] = request.getinfo(pycurl.REDIRECT_TIME_T) / US_TO_MS_DIVISOR
+
+def printResult(index: int, num_probes: int, results: dict, target_url: str) -> None:
+    print(f"--- Request {index+1}/{num_probes} ---")
+    if "error" in results:
+        print(f"Error during request: {results['error']}")
+        if results.get("http_code") and results["http_code"] != -1:
+             print(f"HTTP Status Code: {results['http_code']}")
+        if 'bodyHead' in results:
+            print(f"Response body starts with: {results['bodyHead']!r}")
+        print("-" * 30)
+        return
+
+    print(f"HTTP Status Code: {results.get('http_code', 'N/A')}")
+
+    namelookup_ms = results.get('namelookupTime_ms', 0.0)
+    connect_ms = results.get('connectTime_ms', 0.0)
+    appconnect_ms = results.get('appconnectTime_ms', 0.0)
+    pretransfer_ms = results.get('pretransferTime_ms', 0.0)
+    starttransfer_ms = results.get('startTransferTime_ms', 0.0)
+    total_ms = results.get('totalTime_ms', 0.0)
+    redirect_ms = results.get('redirectTime_ms', 0.0)
+
+    print(f"Time to lookup: {namelookup_ms:.3f}ms")
+    if connect_ms > 0 and namelookup_ms >= 0 : 
+        print(f"Time to connect: {(connect_ms - namelookup_ms):.3f}ms")
+    else:
+        print(f"Time to connect: {connect_ms:.3f}ms (namelookup time was zero or invalid)")
+
+    if appconnect_ms > 0 and connect_ms >= 0:
+        print(f"Time to TLS (if HTTPS): {(appconnect_ms - connect_ms):.3f}ms")
+    elif appconnect_ms == 0 and connect_ms > 0 and "https://" in target_url:
+         print(f"Time to TLS (if HTTPS): 0.000ms (appconnect_time was zero, check SSL details)")
+    elif appconnect_ms == 0 and "http://" in target_url:
+         print(f"Time to TLS (if HTTPS): N/A (HTTP request)")
+
+    ttfb_base_ms = appconnect_ms if appconnect_ms > 0 else connect_ms
+    if pretransfer_ms > 0 and ttfb_base_ms >= 0:
+        print(f"Time to first request byte (TTFB setup): {(pretransfer_ms - ttfb_base_ms):.3f}ms")
+    else:
+        print(f"Time to first request byte (TTFB setup): {pretransfer_ms:.3f}ms (base time was zero or invalid)")
+
+    if starttransfer_ms > 0 and pretransfer_ms >= 0:
+        print(f"Time for server processing (to first response byte): {(starttransfer_ms - pretransfer_ms):.3f}ms")
+    else:
+        print(f"Time for server processing (to first response byte): {starttransfer_ms:.3f}ms (pretransfer time was zero or invalid)")
+
+    if total_ms > 0 and starttransfer_ms >= 0:
+        print(f"Time to download response: {(total_ms - starttransfer_ms):.3f}ms")
+    else:
+        print(f"Time to download response: {(total_ms - (starttransfer_ms if starttransfer_ms > 0 else pretransfer_ms)):.3f}ms (starttransfer time was zero or invalid)")
+    if 'downloadSize_bytes' in results:
+        print(f"Response size: {results['downloadSize_bytes']} bytes, download speed: {results['downloadSpeed_Bps'] / 1e6:.3f}MB/s")
+    if 'bodySha256' in results:
+        print(f"Response body SHA-256: {results['bodySha256']}")
+
+
+    print(f"Actual Total time: {total_ms:.3f}ms")
+    if 'queueingDelay_ms' in results:
+        print(f"Queueing delay (behind intended send time): {results['queueingDelay_ms']:.3f}ms")
+        print(f"Total time from intended send time: {results['totalTimeFromIntended_ms']:.3f}ms")
+    if 'schedulingLag_ms' in results:
+        print(f"Client scheduling lag: {results['schedulingLag_ms']:.3f}ms, ready-to-processed lag: {results['processingLag_ms']:.3f}ms")
+    print(f"Redirection time: {redirect_ms:.3f}ms")
+    
+    connection_kind = "reused" if results.get('connectionReused') else "cold"
+    print(f"Connection ({connection_kind}) from {results.get('localIP', 'N/A')}:{results.get('localPort', 'N/A')} -> {results.get('remoteIP', 'N/A')}:{results.get('remotePort', 'N/A')}")
+    print("-" * 30)
+
+def printWorkerBreakdown(runner) -> None:
+    print("\n--- Per-Worker Breakdown (total time, ms) ---")
+    print(f"{'Worker':<24} {'OK':>8} {'Failed':>8} {'Min':>10} {'Avg':>10} {'P90':>10} {'P99':>10}")
+    for worker, report in runner.worker_reports().items():
+        analysis = runner.worker_analyses[worker]
+        total = report.total
+        print(f"{worker:<24} {analysis.successes:>8} {sum(analysis.failures.values()):>8} "
+              f"{total.min:>10.3f} {total.average:>10.3f} {total.p90:>10.3f} {total.p99:>10.3f}")
+    for worker, error in runner.worker_errors.items():
+        print(f"Worker {worker} failed: {error.strip().splitlines()[-1]}")
+    if runner.missing:
+        print(f"Warning: {runner.missing} probes could not be run by any worker.")
+
+def printClientSaturation(monitor: ClientSaturationMonitor) -> None:
+    summary = monitor.summary()
+    print("\n--- Client-Side Instrumentation ---")
+    print(f"CPU utilisation: {100.0 * summary['cpu_utilisation']:.1f}% of one core "
+          f"({summary['cpu_seconds']:.2f}s CPU over {summary['wall_seconds']:.2f}s)")
+    labels = {"scheduling_lag_ms": "Scheduling lag", "processing_lag_ms": "Ready-to-processed lag",
+              "callback_ms": "Callback time", "queue_ms": "libcurl queue time"}
+    for key, label in labels.items():
+        if key in summary:
+            print(f"{label}: P50 {summary[key]['p50']:.3f}ms, P99 {summary[key]['p99']:.3f}ms, max {summary[key]['max']:.3f}ms")
+    if summary["completions_per_drain"]["max"]:
+        print(f"Completions per event-loop drain: mean {summary['completions_per_drain']['mean']:.2f}, "
+              f"max {summary['completions_per_drain']['max']}")
+    if summary["max_overdue"]:
+        print(f"Max probes overdue at once: {summary['max_overdue']}")
+    warnings = monitor.warnings()
+    if warnings:
+        print("\n!!! CLIENT SATURATED: reported latencies may include client-side delay !!!")
+        for warning in warnings:
+            print(f"  - {warning}")
+
+def buildTest(url: str, num_probes: int, connect_timeout: int, total_timeout: int,
+              body_policy: BodyPolicy = None, http_version: HTTPVersion = None) -> Test:
+    return Test(
+        request=Request(url=URL.from_string(url), method=HTTPMethod.GET, headers={}, body=None,
+                        timeout=total_timeout, connect_timeout=connect_timeout,
+                        body_policy=body_policy or BodyPolicy(), http_version=http_version),
+        expected_responses=num_probes,
+    )
+
+def saveToDatabase(test: Test, database: str) -> None:
+    # sqlite3 and numpy are only loaded when a database is used
+    from slatency.infrastructure.repositories.sqlite_test_repository import SqliteTestRepository
+    try:
+        with SqliteTestRepository(database) as repository:
+            repository.save(test)
+        print(f"Test {test.test_id} saved to {database}")
+    except Exception as e:
+        print(f"Error saving test to {database}: {e}")
+
+def printConvergence(convergence: PercentileConvergence, completed: int, budget: int) -> None:
+    print("\n--- Adaptive Stopping ---")
+    if convergence.converged:
+        print(f"Converged after {completed} of at most {budget} probes "
+              f"({convergence.count} successful): every interval is within ±{100 * convergence.precision:g}%.")
+    else:
+        print(f"Not converged: the budget of {budget} probes ran out before every interval was within "
+              f"±{100 * convergence.precision:g}%.")
+    print(f"{'Percentile':<14} {'Estimate':>10} {'Lower':>10} {'Upper':>10} {'± %':>8}  ({100 * convergence.confidence:g}% confidence, ms)")
+    for interval in convergence.intervals():
+        half_width = interval.relative_half_width
+        precision = f"{100 * half_width:>8.2f}" if half_width != float("inf") else f"{'-':>8}"
+        print(f"{interval.label:<14} {interval.estimate:>10.3f} {interval.lower:>10.3f} {interval.upper:>10.3f} {precision}")
+
+def printMultiplexing(report) -> None:
+    print(f"\n--- HTTP/2 Multiplexing ({len(report.connections)} connections, times in ms) ---")
+    if report.peak_streams <= 1:
+        print("Warning: no connection ever carried two streams at once; the server may not speak HTTP/2.")
+    print(f"{'Connection':<44} {'Streams':>8} {'Peak':>5} {'Setup':>9} {'P50':>9} {'P99':>9} {'Srv P50':>9} {'Srv P99':>9}")
+    for connection in report.connections:
+        streams = connection.streams
+        print(f"{connection.connection:<44} {streams.streams:>8} {connection.peak_streams:>5} {connection.setup_ms:>9.3f} "
+              f"{streams.total_p50:>9.3f} {streams.total_p99:>9.3f} {streams.server_p50:>9.3f} {streams.server_p99:>9.3f}")
+    print(f"\n{'Streams in flight on the connection':<44} {'Streams':>8} {'':>5} {'':>9} {'P50':>9} {'P99':>9} {'Srv P50':>9} {'Srv P99':>9}")
+    for streams in report.by_concurrency + [report.opening, report.multiplexed]:
+        print(f"{streams.label:<44} {streams.streams:>8} {'':>5} {'':>9} {streams.total_p50:>9.3f} {streams.total_p99:>9.3f} "
+              f"{streams.server_p50:>9.3f} {streams.server_p99:>9.3f}")
+
+def runConcurrentProbes(url: str, num_probes: int, concurrency: int, connect_timeout: int, total_timeout: int,
+                        on_result, warm: bool = False, rate: float = None, workers: int = 1,
+                        remote_workers: list = None, monitor: ClientSaturationMonitor = None,
+                        stop_when=None, body_policy: BodyPolicy = None, http_version: HTTPVersion = None,
+                        multiplex_connections: int = None) -> None:
+    test = buildTest(url, num_probes, connect_timeout, total_timeout, body_policy, http_version)
+    on_response = lambda response: on_result(response_to_result(response))
+    if remote_workers:
+        from slatency.infrastructure.services.distributed_test_runner_service import DistributedTestRunnerService
+        runner = DistributedTestRunnerService(remote_workers, concurrency=max(concurrency, len(remote_workers)), rate=rate,
+                                              reuse_connections=warm, on_response=on_response, keep_responses=False)
+        runner.execute(test)
+        printWorkerBreakdown(runner)
+        return
+    if workers > 1:
+        # Every worker keeps at least one probe in flight
+        from slatency.infrastructure.services.process_pool_test_runner_service import ProcessPoolTestRunnerService
+        runner = ProcessPoolTestRunnerService(workers=workers, concurrency=max(concurrency, workers), rate=rate,
+                                              reuse_connections=warm, on_response=on_response, keep_responses=False)
+    else:
+        runner = CurlMultiTestRunnerService(concurrency=concurrency, reuse_connections=warm, rate=rate,
+                                            on_response=on_response, keep_responses=False, monitor=monitor,
+                                            stop_when=stop_when, multiplex_connections=multiplex_connections)
+    runner.execute(test)
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Send multiple HTTP requests, print timing statistics, and save to JSON.")
     parser.add_argument("url", type=str, help="The URL to send requests to.")
     parser.add_argument("probes", type=int, help="The number of requests (probes) to send.")
     parser.add_argument("--timeout", type=int, default=60, help="Total timeout for each request in seconds (default: 60).")
     parser.add_argument("--connect-timeout", type=int, default=30, help="Connection timeout for each request in seconds (default: 30).")
+    parser.add_argument("--concurrency", type=int, default=None, help="Max number of requests in flight, sent through pycurl.CurlMulti (default: 1, sequential; with --rate, enough for every probe started within --timeout).")
+    parser.add_argument("--warm", action="store_true", help="Reuse handles, keep connections alive and share the DNS cache and TLS sessions between probes (default: every probe is cold).")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop mode: start probes at this constant rate (probes per second) whether or not earlier probes have finished. Unless --concurrency is given, it is raised so that in-flight probes never delay the schedule.")
+    parser.add_argument("--workers", type=int, default=1, help="Split the probes across this many processes, each with its own CurlMulti; --concurrency and --rate are totals shared by the workers (default: 1).")
+    parser.add_argument("--remote-worker", action="append", default=None, metavar="HOST:PORT", help="Coordinate remote slatency workers (worker.py) instead of probing locally; repeat for several workers. --concurrency and --rate are totals shared by the workers.")
+    parser.add_argument("--print-probes", action="store_true", help="Print the timings of every probe instead of the live progress view.")
+    parser.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between refreshes of the live progress view; 0 disables it (default: 0.5).")
+    parser.add_argument("--lag-threshold", type=float, default=DEFAULT_LAG_THRESHOLD_MS, help="P99 client-side lag in ms above which the run is reported as client saturated, while the client also uses at least half a core (default: %(default)s).")
+    parser.add_argument("--profile-file", type=str, default=None, help="Time the client's hot-path sections and save them as JSON to this file.")
+    parser.add_argument("--http2", action="store_true", help="Multiplex the probes as HTTP/2 streams over --connections connections, negotiated through TLS for https:// URLs and with prior knowledge (h2c) for http:// URLs; --concurrency is the number of streams in flight.")
+    parser.add_argument("--connections", type=int, default=1, help="With --http2, number of connections the streams are multiplexed over (default: 1).")
+    parser.add_argument("--body", type=str, default="discard", metavar="POLICY", help="What to record of response bodies, which are never buffered: 'discard', 'count' (size and download speed), 'hash' (also a SHA-256 checksum) or 'keep[:N]' (also the first N bytes, default 1024, of failed responses) (default: discard).")
+    parser.add_argument("--until-precision", type=float, default=None, help="Adaptive mode: stop as soon as the confidence interval of every --percentiles entry is within this relative precision of its estimate (e.g. 0.05 for ±5%%); PROBES becomes the maximum budget.")
+    parser.add_argument("--percentiles", type=str, default="total:p95,total:p99", help="With --until-precision, the percentiles to converge, as PHASE:pNN with PHASE one of dns, connect, tls, server, total (default: total:p95,total:p99).")
+    parser.add_argument("--confidence", type=float, default=0.95, help="With --until-precision, confidence level of the intervals (default: 0.95).")
+    parser.add_argument("--min-probes", type=int, default=100, help="With --until-precision, successful probes to collect before stopping is considered (default: 100).")
     parser.add_argument("--output-file", type=str, default="results.json", help="File path to save the JSON results (default: results.json).")
-    
-    args = parser.parse_args()
+    parser.add_argument("--output-format", choices=["json", "jsonl", "columnar"], default="json", help="'json' writes one indented array at the end of the run; 'jsonl' streams one compact object per line as probes complete; 'columnar' writes a binary column-oriented file that analyze.py memory-maps (default: json).")
+    parser.add_argument("--fsync-interval", type=float, default=1.0, help="With --output-format jsonl, seconds between background writes and fsyncs of the buffered results (default: 1.0).")
+    parser.add_argument("--database", type=str, default=None, help="Also store the run, its request and its responses in this SQLite database, with per-phase statistics for 'slatency history'.")
+    return parser
+
+def main(argv=None, prog=None):
+    args = build_parser(prog).parse_args(argv)
 
     target_url = args.url
     num_probes = args.probes
@@ -71,84 +292,173 @@ def main():
     if num_probes <= 0:
         print("Error: Number of probes must be a positive integer.")
         return
+    if args.concurrency is not None and args.concurrency <= 0:
+        print("Error: Concurrency must be a positive integer.")
+        return
+    if args.workers <= 0:
+        print("Error: Workers must be a positive integer.")
+        return
+    if args.rate is not None and args.rate <= 0:
+        print("Error: Rate must be a positive number.")
+        return
+    if args.concurrency is None:
+        # Open-loop probes must never wait for earlier ones: allow every probe that can
+        # start before the oldest in-flight one times out
+        args.concurrency = min(math.ceil(args.rate * total_timeout_val), num_probes) if args.rate is not None else 1
+    http_version = None
+    if args.http2:
+        if args.workers > 1 or args.remote_worker:
+            print("Error: --http2 only works with a single local client, not with --workers or --remote-worker.")
+            return
+        if not 0 < args.connections <= args.concurrency:
+            print("Error: Connections must be a positive integer no larger than the concurrency.")
+            return
+        http_version = HTTPVersion.HTTP_2 if target_url.lower().startswith("https://") else HTTPVersion.HTTP_2_PRIOR_KNOWLEDGE
+    try:
+        body_policy = BodyPolicy.from_string(args.body)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    convergence = None
+    if args.until_precision is not None:
+        if args.workers > 1 or args.remote_worker:
+            print("Error: --until-precision only works with a single local client, not with --workers or --remote-worker.")
+            return
+        try:
+            convergence = PercentileConvergence(parse_percentile_targets(args.percentiles, PHASES),
+                                                precision=args.until_precision, confidence=args.confidence,
+                                                min_probes=args.min_probes)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
 
     print(f"Sending {num_probes} probes to {target_url}...\n")
 
     all_results = []
+    completed = 0
+    successful = 0
+    successful_total_ms = 0.0
+    writer = None
+    try:
+        if args.output_format == "jsonl":
+            writer = JsonLinesTestOutputPersistenceService(output_file, fsync_interval=args.fsync_interval)
+        elif args.output_format == "columnar":
+            from slatency.infrastructure.services.columnar_test_output_persistence_service import ColumnarTestOutputPersistenceService
+            writer = ColumnarTestOutputPersistenceService(output_file, capacity=num_probes,
+                                                          include_schedule=args.rate is not None,
+                                                          include_body=body_policy.records_body)
+    except IOError as e:
+        print(f"Error opening {output_file}: {e}")
+        return
 
-    for i in range(num_probes):
-        print(f"--- Request {i+1}/{num_probes} ---")
-        results = sendRequest(target_url, connect_timeout_val, total_timeout_val)
-        all_results.append(results)
-
-        if "error" in results:
-            print(f"Error during request: {results['error']}")
-            if results.get("http_code") and results["http_code"] != -1:
-                 print(f"HTTP Status Code: {results['http_code']}")
-            print("-" * 30)
-            # We still append the error result to all_results for completeness in the JSON
-            continue 
-
-        print(f"HTTP Status Code: {results.get('http_code', 'N/A')}")
-
-        namelookup_ms = results.get('namelookupTime_ms', 0.0)
-        connect_ms = results.get('connectTime_ms', 0.0)
-        appconnect_ms = results.get('appconnectTime_ms', 0.0)
-        pretransfer_ms = results.get('pretransferTime_ms', 0.0)
-        starttransfer_ms = results.get('startTransferTime_ms', 0.0)
-        total_ms = results.get('totalTime_ms', 0.0)
-        redirect_ms = results.get('redirectTime_ms', 0.0)
-
-        print(f"Time to lookup: {namelookup_ms:.3f}ms")
-        if connect_ms > 0 and namelookup_ms >= 0 : 
-            print(f"Time to connect: {(connect_ms - namelookup_ms):.3f}ms")
-        else:
-            print(f"Time to connect: {connect_ms:.3f}ms (namelookup time was zero or invalid)")
-
-        if appconnect_ms > 0 and connect_ms >= 0:
-            print(f"Time to TLS (if HTTPS): {(appconnect_ms - connect_ms):.3f}ms")
-        elif appconnect_ms == 0 and connect_ms > 0 and "https://" in target_url:
-             print(f"Time to TLS (if HTTPS): 0.000ms (appconnect_time was zero, check SSL details)")
-        elif appconnect_ms == 0 and "http://" in target_url:
-             print(f"Time to TLS (if HTTPS): N/A (HTTP request)")
-
-        ttfb_base_ms = appconnect_ms if appconnect_ms > 0 else connect_ms
-        if pretransfer_ms > 0 and ttfb_base_ms >= 0:
-            print(f"Time to first request byte (TTFB setup): {(pretransfer_ms - ttfb_base_ms):.3f}ms")
-        else:
-            print(f"Time to first request byte (TTFB setup): {pretransfer_ms:.3f}ms (base time was zero or invalid)")
+    progress = None
+    if not args.print_probes and args.progress_interval > 0:
+        progress = LiveProgressView(num_probes, interval=args.progress_interval)
+        progress.start()
 
-        if starttransfer_ms > 0 and pretransfer_ms >= 0:
-            print(f"Time for server processing (to first response byte): {(starttransfer_ms - pretransfer_ms):.3f}ms")
+    # Worker processes and hosts are not instrumented, only the local client
+    monitor = None
+    if args.workers == 1 and not args.remote_worker:
+        monitor = ClientSaturationMonitor(lag_threshold_ms=args.lag_threshold, profile=args.profile_file is not None)
+
+    # The responses are only kept in memory when the run is stored in a database
+    test = (buildTest(target_url, num_probes, connect_timeout_val, total_timeout_val, body_policy, http_version)
+            if args.database else None)
+
+    multiplexing = None
+    if args.http2:
+        from slatency.infrastructure.analysis.multiplexing import MultiplexingRecorder
+        multiplexing = MultiplexingRecorder()
+
+    def handleResult(results: dict) -> None:
+        nonlocal completed, successful, successful_total_ms
+        if progress is not None:
+            progress.update(results)
+        elif args.print_probes:
+            printResult(completed, num_probes, results, target_url)
+        completed += 1
+        if writer is not None:
+            writer.append_result(results)
         else:
-            print(f"Time for server processing (to first response byte): {starttransfer_ms:.3f}ms (pretransfer time was zero or invalid)")
+            all_results.append(results)
+        if test is not None:
+            test.responses.append(result_to_response(results))
+        if multiplexing is not None:
+            multiplexing.record(results)
+        if "error" not in results and 200 <= results.get("http_code", 0) < 400:
+            successful += 1
+            successful_total_ms += results.get('totalTime_ms', 0.0)
+            if convergence is not None:
+                convergence.record(result_phases(results))
 
-        if total_ms > 0 and starttransfer_ms >= 0:
-            print(f"Time to download response: {(total_ms - starttransfer_ms):.3f}ms")
+    try:
+        if (args.concurrency > 1 or args.warm or args.rate is not None or args.workers > 1 or args.remote_worker
+                or args.http2):
+            runConcurrentProbes(target_url, num_probes, args.concurrency, connect_timeout_val, total_timeout_val,
+                                handleResult, warm=args.warm, rate=args.rate, workers=args.workers,
+                                remote_workers=args.remote_worker, monitor=monitor,
+                                stop_when=(lambda: convergence.converged) if convergence is not None else None,
+                                body_policy=body_policy, http_version=http_version,
+                                multiplex_connections=args.connections if args.http2 else None)
         else:
-            print(f"Time to download response: {(total_ms - (starttransfer_ms if starttransfer_ms > 0 else pretransfer_ms)):.3f}ms (starttransfer time was zero or invalid)")
+            # Resolve the CA bundle before the first probe so that its timing does not include it
+            ca_info = default_ca_info()
+            monitor.start()
+            try:
+                for i in range(num_probes):
+                    if convergence is not None and convergence.converged:
+                        break
+                    results = sendRequest(target_url, connect_timeout_val, total_timeout_val, ca_info, body_policy)
+                    callback_start = time.perf_counter()
+                    handleResult(results)
+                    monitor.record_callback(time.perf_counter() - callback_start)
+                    if "error" not in results:
+                        monitor.record_probe(results["queueTime_ms"])
+            finally:
+                monitor.stop()
+        if progress is not None:
+            progress.stop()
+        print(f"\nFinished {completed} probes.")
+    except KeyboardInterrupt:
+        if progress is not None:
+            progress.stop()
+        print(f"\nInterrupted after {completed} of {num_probes} probes.")
+    finally:
+        if writer is not None:
+            writer.close()
+            print(f"Results saved to {output_file}")
 
+    if writer is None:
+        # Save all results to a JSON file
+        try:
+            with open(output_file, 'w') as f:
+                json.dump(all_results, f, indent=4)
+            print(f"Results saved to {output_file}")
+        except IOError as e:
+            print(f"Error saving results to {output_file}: {e}")
 
-        print(f"Actual Total time: {total_ms:.3f}ms")
-        print(f"Redirection time: {redirect_ms:.3f}ms")
-        
-        print(f"Connection from {results.get('localIP', 'N/A')}:{results.get('localPort', 'N/A')} -> {results.get('remoteIP', 'N/A')}:{results.get('remotePort', 'N/A')}")
-        print("-" * 30)
-    
-    print(f"\nFinished {num_probes} probes.")
+    if convergence is not None:
+        printConvergence(convergence, completed, num_probes)
 
-    # Save all results to a JSON file
-    try:
-        with open(output_file, 'w') as f:
-            json.dump(all_results, f, indent=4)
-        print(f"Results saved to {output_file}")
-    except IOError as e:
-        print(f"Error saving results to {output_file}: {e}")
+    if multiplexing is not None and successful:
+        printMultiplexing(multiplexing.report())
+
+    if test is not None:
+        saveToDatabase(test, args.database)
+
+    if monitor is not None:
+        printClientSaturation(monitor)
+        if args.profile_file:
+            try:
+                monitor.dump_profile(args.profile_file)
+                print(f"Hot-path profile saved to {args.profile_file}")
+            except IOError as e:
+                print(f"Error saving profile to {args.profile_file}: {e}")
 
     # Example: Calculate average total time for successful requests
-    successful_results = [r for r in all_results if "error" not in r and r.get("http_code", 0) >= 200 and r.get("http_code",0) < 400]
-    if successful_results:
-        avg_total_time_ms = sum(r.get('totalTime_ms', 0.0) for r in successful_results) / len(successful_results)
+    if successful:
+        avg_total_time_ms = successful_total_ms / successful
         print(f"Average total time for successful requests: {avg_total_time_ms:.3f}ms")
     
     return
@@ -0,0 +1,92 @@
+import argparse
+import signal
+import sys
+
+from slatency.infrastructure.mappers.request_mapper import request_from_dict
+from slatency.infrastructure.mappers.target_mapper import load_targets, target_name
+from slatency.infrastructure.monitoring.latency_metrics import DEFAULT_BUCKETS_MS, LatencyMetrics
+from slatency.infrastructure.monitoring.metrics_server import MetricsServer
+from slatency.infrastructure.services.periodic_test_runner_service import PeriodicTestRunnerService
+
+
+def parse_buckets(text: str):
+    try:
+        return [float(bound) for bound in text.split(",")]
+    except ValueError:
+        raise ValueError(f"Invalid buckets '{text}', expected comma-separated milliseconds, e.g. 10,50,100,500")
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Probe endpoints periodically, keep their latency histograms in memory and serve them to a Prometheus-compatible scraper.")
+    parser.add_argument("urls", type=str, nargs="*", help="URLs to probe with GET.")
+    parser.add_argument("--targets-file", type=str, default=None, help="JSON array or JSON Lines file of Request definitions with an optional name, as in 'slatency sweep' ('probes' is ignored).")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between two probes of the same target (default: 10).")
+    parser.add_argument("--warm", action="store_true", help="Reuse connections, DNS entries and TLS sessions between the probes of a target (default: every probe is cold).")
+    parser.add_argument("--timeout", type=int, default=10, help="Total timeout for each request in seconds, unless the target sets one (default: 10).")
+    parser.add_argument("--connect-timeout", type=int, default=5, help="Connection timeout for each request in seconds, unless the target sets one (default: 5).")
+    parser.add_argument("--buckets", type=str, default=",".join(f"{bound:g}" for bound in DEFAULT_BUCKETS_MS), help="Upper bounds of the histogram buckets in milliseconds, comma-separated (default: %(default)s).")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address the metrics endpoint listens on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=9464, help="Port of the metrics endpoint (default: 9464).")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = build_parser(prog).parse_args(argv)
+    if args.interval <= 0:
+        print("Error: Interval must be a positive number.")
+        sys.exit(1)
+
+    targets = []
+    for url in args.urls:
+        try:
+            request = request_from_dict({"url": url, "timeout": args.timeout, "connect_timeout": args.connect_timeout})
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        targets.append((target_name(request.url.to_string(), request.resolve), request))
+    if args.targets_file:
+        try:
+            targets += [(name, test.request)
+                        for name, test in load_targets(args.targets_file, 1, args.timeout, args.connect_timeout)]
+        except FileNotFoundError:
+            print(f"Error: Targets file '{args.targets_file}' not found.")
+            sys.exit(1)
+        except (ValueError, KeyError) as e:
+            print(f"Error reading '{args.targets_file}': {e}")
+            sys.exit(1)
+    if not targets:
+        print("Error: Give at least one URL or a --targets-file.")
+        sys.exit(1)
+    names = [name for name, _ in targets]
+    if len(set(names)) < len(names):
+        print("Error: Every target needs a distinct name; name the duplicates in a --targets-file.")
+        sys.exit(1)
+
+    try:
+        metrics = LatencyMetrics(names, parse_buckets(args.buckets))
+        server = MetricsServer(metrics, args.host, args.port)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error: Cannot listen on {args.host}:{args.port}: {e}")
+        sys.exit(1)
+
+    runner = PeriodicTestRunnerService(interval=args.interval, reuse_connections=args.warm,
+                                       on_response=lambda index, response: metrics.record(names[index], response))
+    # Service managers stop daemons with SIGTERM
+    signal.signal(signal.SIGTERM, lambda signum, frame: runner.stop())
+    server.start()
+    host, port = server.address
+    print(f"Probing {len(targets)} targets every {args.interval:g}s, metrics at http://{host}:{port}/metrics")
+    try:
+        completed = runner.execute([request for _, request in targets])
+    except KeyboardInterrupt:
+        completed = None
+    finally:
+        server.stop()
+    print("\nMonitor stopped." + (f" {completed} probes completed." if completed is not None else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import itertools
+import json
+import math
+import sys
+from collections import Counter
+from dataclasses import asdict
+from typing import Dict, List, Tuple
+
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.infrastructure.analysis.log_histogram import LogHistogram
+from slatency.infrastructure.mappers.response_mapper import response_to_result
+from slatency.infrastructure.presentation.live_progress_view import LiveProgressView
+from slatency.infrastructure.replay.trace_reader import count_records, read_trace
+from slatency.infrastructure.services.json_lines_test_output_persistence_service import JsonLinesTestOutputPersistenceService
+from slatency.infrastructure.services.replay_test_runner_service import ReplayTestRunnerService
+from slatency.infrastructure.services.sketch_latency_analysis_service import SketchLatencyAnalysisService
+
+# Columns of the per-route and per-method tables: (label, phase, statistic)
+REPORT_COLUMNS = [
+    ("TTFB P99", "receive_first_byte", "p99"),
+    ("Total Avg", "total", "average"),
+    ("Total P90", "total", "p90"),
+    ("Total P99", "total", "p99"),
+    ("Total Max", "total", "max"),
+]
+
+
+def print_table(title: str, rows: List[Tuple[str, SketchLatencyAnalysisService]]) -> None:
+    """
+    Prints one line per group, busiest first, with times in milliseconds.
+    """
+    width = max([len("Group")] + [len(name) for name, _ in rows])
+    print(f"\n--- {title} (times in ms) ---")
+    print(f"{'Group':<{width}} {'OK':>8} {'Failed':>7} " + " ".join(f"{label:>10}" for label, _, _ in REPORT_COLUMNS))
+    for name, analysis in rows:
+        report = analysis.report()
+        values = " ".join(_format(getattr(getattr(report, phase), statistic)) for _, phase, statistic in REPORT_COLUMNS)
+        print(f"{name:<{width}} {analysis.successes:>8} {sum(analysis.failures.values()):>7} {values}")
+
+
+def print_schedule(queueing_delay: LogHistogram, late: int, late_ms: float) -> None:
+    if not queueing_delay.count:
+        return
+    print(f"\nSend delay behind the trace's timing: P50 {queueing_delay.quantile(0.5):.3f}ms, "
+          f"P99 {queueing_delay.quantile(0.99):.3f}ms, max {queueing_delay.max:.3f}ms")
+    if late:
+        print(f"Warning: {late} requests were sent more than {late_ms:g}ms late; raise --concurrency or lower --speed "
+              f"to reproduce the recorded load shape.")
+
+
+def report_to_dict(name: str, analysis: SketchLatencyAnalysisService) -> Dict:
+    return {
+        "group": name,
+        "successes": analysis.successes,
+        "failures": {phase.name: count for phase, count in analysis.failures.items()},
+        # Phases without successful requests have no statistics
+        "report": {phase: {key: None if math.isnan(value) else value for key, value in statistics.items()}
+                   for phase, statistics in asdict(analysis.report()).items()},
+    }
+
+
+def _format(value: float) -> str:
+    return f"{'-':>10}" if math.isnan(value) else f"{value:>10.3f}"
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Replay a recorded request log at its original timing and report latency per route and method.")
+    parser.add_argument("trace_file", type=str, help="JSON Lines request log: one object per request with timestamp (epoch seconds or ISO 8601), url and optional method, headers, route, body or body_file.")
+    parser.add_argument("--target", type=str, default=None, help="Send the requests to this scheme://host[:port] instead of the recorded hosts, e.g. a staging environment.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor: 2 sends the trace twice as fast, 0.5 at half speed (default: 1).")
+    parser.add_argument("--concurrency", type=int, default=100, help="Max number of requests in flight; requests due while all are busy are sent late (default: 100).")
+    parser.add_argument("--warm", action="store_true", help="Reuse connections, DNS entries and TLS sessions across requests, like a client connection pool (default: every request is cold).")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests of the trace.")
+    parser.add_argument("--timeout", type=int, default=60, help="Total timeout for each request in seconds (default: 60).")
+    parser.add_argument("--connect-timeout", type=int, default=30, help="Connection timeout for each request in seconds (default: 30).")
+    parser.add_argument("--body", type=str, default="discard", metavar="POLICY", help="What to record of response bodies: 'discard', 'count', 'hash' or 'keep[:N]', as in 'slatency run' (default: discard).")
+    parser.add_argument("--routes", type=int, default=50, help="Number of busiest routes shown in the per-route table (default: 50).")
+    parser.add_argument("--late-threshold", type=float, default=10.0, help="Send delay in ms behind the trace's timing above which requests are reported as late (default: 10).")
+    parser.add_argument("--output-file", type=str, default="replay.jsonl", help="JSON Lines file for the results of every request, tagged with their method and route (default: replay.jsonl).")
+    parser.add_argument("--report-file", type=str, default=None, help="Also save the per-route and per-method reports as JSON to this file.")
+    parser.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between refreshes of the live progress view; 0 disables it (default: 0.5).")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = build_parser(prog).parse_args(argv)
+    if args.speed <= 0:
+        print("Error: Speed must be a positive number.")
+        sys.exit(1)
+    for option, value in (("Concurrency", args.concurrency), ("Limit", args.limit if args.limit is not None else 1)):
+        if value <= 0:
+            print(f"Error: {option} must be a positive integer.")
+            sys.exit(1)
+    try:
+        body_policy = BodyPolicy.from_string(args.body)
+        total = count_records(args.trace_file)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except FileNotFoundError:
+        print(f"Error: Trace file '{args.trace_file}' not found.")
+        sys.exit(1)
+    if args.limit is not None:
+        total = min(total, args.limit)
+
+    records = read_trace(args.trace_file, target=args.target, timeout=args.timeout,
+                         connect_timeout=args.connect_timeout, body_policy=body_policy)
+    if args.limit is not None:
+        records = itertools.islice(records, args.limit)
+
+    print(f"Replaying up to {total} requests from {args.trace_file} at {args.speed:g}x speed...\n")
+    routes: Dict[Tuple[str, str], SketchLatencyAnalysisService] = {}
+    methods: Dict[str, SketchLatencyAnalysisService] = {}
+    requests = Counter()
+    queueing_delay = LogHistogram()
+    late = 0
+    try:
+        writer = JsonLinesTestOutputPersistenceService(args.output_file)
+    except IOError as e:
+        print(f"Error opening {args.output_file}: {e}")
+        sys.exit(1)
+    progress = LiveProgressView(total, interval=args.progress_interval) if args.progress_interval > 0 else None
+
+    def on_response(record, response):
+        nonlocal late
+        method = record.request.method.value
+        key = (method, record.route)
+        requests[key] += 1
+        for analyses, group in ((routes, key), (methods, method)):
+            if group not in analyses:
+                analyses[group] = SketchLatencyAnalysisService()
+            analyses[group].record(response)
+        queueing_delay.record(response.schedule.queueing_delay)
+        if response.schedule.queueing_delay > args.late_threshold:
+            late += 1
+        result = response_to_result(response)
+        if progress is not None:
+            progress.update(result)
+        result["method"] = method
+        result["route"] = record.route
+        writer.append_result(result)
+
+    runner = ReplayTestRunnerService(concurrency=args.concurrency, speed=args.speed, reuse_connections=args.warm,
+                                     on_response=on_response)
+    if progress is not None:
+        progress.start()
+    try:
+        sent = runner.execute(records)
+        if progress is not None:
+            progress.stop()
+        print(f"\nReplayed {sent} requests.")
+    except ValueError as e:
+        if progress is not None:
+            progress.stop()
+        print(f"\nError reading '{args.trace_file}': {e}")
+    except KeyboardInterrupt:
+        if progress is not None:
+            progress.stop()
+        print("\nInterrupted, reporting the requests completed so far.")
+    finally:
+        writer.close()
+        print(f"Results saved to {args.output_file}")
+
+    busiest = sorted(routes, key=lambda key: -requests[key])
+    route_rows = [(f"{method} {route}", routes[(method, route)]) for method, route in busiest[:args.routes]]
+    title = f"Per Route ({len(routes)} routes" + (f", busiest {args.routes} shown)" if len(routes) > args.routes else ")")
+    print_table(title, route_rows)
+    method_rows = sorted(methods.items(), key=lambda row: -(row[1].successes + sum(row[1].failures.values())))
+    print_table("Per Method", method_rows)
+    print_schedule(queueing_delay, late, args.late_threshold)
+
+    if args.report_file:
+        try:
+            with open(args.report_file, "w") as f:
+                json.dump({
+                    "routes": [report_to_dict(f"{method} {route}", routes[(method, route)]) for method, route in busiest],
+                    "methods": [report_to_dict(method, analysis) for method, analysis in method_rows],
+                }, f, indent=4)
+            print(f"\nReports saved to {args.report_file}")
+        except IOError as e:
+            print(f"Error saving reports to {args.report_file}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import sys
+import time
+
+COMMANDS = {
+    "run": "Send probes to a URL and save their timings (main.py).",
+    "sweep": "Probe many endpoints interleaved in one process and compare them (sweep.py).",
+    "replay": "Replay a recorded request log at its original timing, per route (replay.py).",
+    "monitor": "Probe endpoints periodically and serve their latency histograms to Prometheus (monitor.py).",
+    "analyze": "Full statistical analysis of a results file with pandas (analyze.py).",
+    "report": "Quick overview, summary statistics and failure analysis of a results file.",
+    "history": "Trend of one latency statistic across the runs stored in a database (run --database).",
+}
+
+
+def build_report_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=COMMANDS["report"])
+    parser.add_argument("input_file", type=str, nargs='?', default="results.json",
+                        help="Path to the input file, in any format written by 'run' (default: results.json).")
+    return parser
+
+
+def report(argv=None) -> None:
+    args = build_report_parser("slatency report").parse_args(argv)
+    from slatency.infrastructure.presentation.results_report import build_report
+    try:
+        results_report = build_report(args.input_file)
+    except FileNotFoundError:
+        print(f"Error: Input file '{args.input_file}' not found.")
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error reading '{args.input_file}': {e}")
+        sys.exit(1)
+    results_report.print()
+
+
+def build_history_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description=COMMANDS["history"])
+    parser.add_argument("database", type=str, help="Path to the SQLite database written by 'run --database'.")
+    parser.add_argument("--phase", type=str, default="total",
+                        help="Latency phase: queue, dns, connect, tls, send_first_byte, send_last_byte, "
+                             "receive_first_byte or total (default: total).")
+    parser.add_argument("--statistic", type=str, default="p99",
+                        help="min, max, average, p90, p95 or p99 (default: p99).")
+    parser.add_argument("--host", type=str, default=None, help="Only runs against this host.")
+    parser.add_argument("--endpoint", type=str, default=None,
+                        help="Only runs against this endpoint, written as scheme://host:port/path.")
+    parser.add_argument("--runs", type=int, default=30, help="Number of most recent runs (default: 30).")
+    return parser
+
+
+def history(argv=None) -> None:
+    args = build_history_parser("slatency history").parse_args(argv)
+    if not os.path.exists(args.database):
+        print(f"Error: Database '{args.database}' not found.")
+        sys.exit(1)
+    from slatency.infrastructure.repositories.sqlite_test_repository import SqliteTestRepository
+    with SqliteTestRepository(args.database) as repository:
+        try:
+            rows = repository.latency_history(args.phase, args.statistic, host=args.host,
+                                              endpoint=args.endpoint, limit=args.runs)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    print(f"\n--- {args.statistic} {args.phase} time (ms), last {len(rows)} runs ---")
+    print(f"{'Saved At':<20} {'Test':<36} {'Value':>10}")
+    for test_id, saved_at, value in reversed(rows):
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(saved_at)):<20} {str(test_id):<36} {value:>10.3f}")
+
+
+def main(argv=None) -> None:
+    """
+    The single `slatency` entry point. Each subcommand imports only what it needs,
+    so that `run` starts probing without loading pandas or numpy.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print("usage: python -m slatency {run,sweep,replay,monitor,analyze,report,history} ...\n")
+        for command, description in COMMANDS.items():
+            print(f"  {command:<8} {description}")
+        sys.exit(0 if argv and argv[0] in ("-h", "--help") else 2)
+    command, arguments = argv[0], argv[1:]
+    if command == "run":
+        import main as run_command
+        run_command.main(arguments, prog="slatency run")
+    elif command == "sweep":
+        import sweep as sweep_command
+        sweep_command.main(arguments, prog="slatency sweep")
+    elif command == "replay":
+        import replay as replay_command
+        replay_command.main(arguments, prog="slatency replay")
+    elif command == "monitor":
+        import monitor as monitor_command
+        monitor_command.main(arguments, prog="slatency monitor")
+    elif command == "analyze":
+        import analyze as analyze_command
+        analyze_command.main(arguments, prog="slatency analyze")
+    elif command == "history":
+        history(arguments)
+    else:
+        report(arguments)
+
+
+if __name__ == "__main__":
+    main()
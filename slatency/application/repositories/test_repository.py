@@ -0,0 +1,27 @@
+from typing import List, Optional, Protocol
+from uuid import UUID
+
+from slatency.domain.entities.test import Test
+
+class TestRepository(Protocol):
+    """
+    This port defines the contract for storing and retrieving Test entities,
+    together with their Request definition and their responses.
+    """
+    def save(self, test: Test) -> None:
+        """
+        Stores the Test, replacing any earlier version with the same test_id.
+        """
+        ...
+
+    def find_by_id(self, test_id: UUID) -> Optional[Test]:
+        """
+        Returns the Test with the given id, or None if there is none.
+        """
+        ...
+
+    def get_all(self) -> List[Test]:
+        """
+        Returns every stored Test.
+        """
+        ...
@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from uuid import UUID, uuid4
 
+from slatency.domain.value_objects.body_policy import BodyPolicy
 from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.http_version import HTTPVersion
 from slatency.domain.value_objects.url import URL
 
 
@@ -10,10 +12,18 @@ from slatency.domain.value_objects.url import URL
 class Request:
     """
     A Request represents an HTTP request to be sent to a target service.
+    `resolve` pins host names to addresses, as "HOST:PORT:ADDRESS" entries in the
+    format of curl's --resolve, e.g. to probe one backend behind a load balancer.
+    `body_policy` says what happens to response bodies, see BodyPolicy. Without an
+    `http_version` libcurl picks its default.
     """
     url: URL
     method: HTTPMethod
     headers: Dict[str, str]
     body: Optional[bytes]
     timeout: int = 10
+    connect_timeout: Optional[int] = None
+    resolve: List[str] = field(default_factory=list)
+    body_policy: BodyPolicy = field(default_factory=BodyPolicy)
+    http_version: Optional[HTTPVersion] = None
     request_id: UUID = field(default_factory=uuid4)
@@ -1,30 +1,51 @@
 from dataclasses import dataclass, field
-from typing import Union
+from typing import Optional, Union
 from uuid import UUID, uuid4
 
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
 from slatency.domain.value_objects.failure_phase import FailurePhase
 from slatency.domain.value_objects.flow import Flow
 from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.schedule import Schedule
 
 
 @dataclass
 class SuccessfulResponse:
     """
-    Represents a successful HTTP response.
+    Represents a successful HTTP response. `started_at` is the wall-clock time
+    the probe was started, in seconds since the epoch. `body` is only recorded
+    when the Request's BodyPolicy asks for it.
     """
     status_code: int
     latency: Latency
     flow: Flow
+    connection_reused: bool = False
+    schedule: Optional[Schedule] = None
+    client_timing: Optional[ClientTiming] = None
+    started_at: Optional[float] = None
+    body: Optional[Body] = None
     response_id: UUID = field(default_factory=uuid4)
 
 
 @dataclass
 class FailedResponse:
     """
-    Represents a failed HTTP request.
+    Represents a failed HTTP request. `started_at` is the wall-clock time the
+    probe was started, in seconds since the epoch. `body` holds what was
+    downloaded before the failure, e.g. an error page. `latency` and `flow` hold
+    what libcurl measured before the failure, phases it never completed being
+    zero; they are None when unknown.
     """
     failure_phase: FailurePhase
     error_message: str
+    status_code: Optional[int] = None
+    latency: Optional[Latency] = None
+    flow: Optional[Flow] = None
+    schedule: Optional[Schedule] = None
+    client_timing: Optional[ClientTiming] = None
+    started_at: Optional[float] = None
+    body: Optional[Body] = None
     response_id: UUID = field(default_factory=uuid4)
 
 
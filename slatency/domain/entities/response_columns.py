@@ -0,0 +1,252 @@
+import math
+from array import array
+from collections.abc import Sequence
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, overload
+from uuid import UUID
+
+from slatency.domain.entities.response import FailedResponse, Response, SuccessfulResponse
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.flow import Flow
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.schedule import Schedule
+
+PHASES = [phase.name for phase in fields(Latency)]
+FAILURE_PHASES = list(FailurePhase)
+
+# Sentinels of the integer columns; float columns use NaN
+NONE = -1
+
+# Type codes of the columns that are only allocated once a response carries them
+OPTIONAL_COLUMNS = {
+    "intended_start": "d", "actual_start": "d", "scheduling_lag": "d", "processing_lag": "d",
+    "started_at": "d", "body_size": "d", "download_speed": "d", "checksum": "i", "body_head": "i",
+}
+
+
+class ResponseColumns(Sequence):
+    """
+    The responses of a Test, stored column by column in typed arrays instead of one
+    SuccessfulResponse/FailedResponse object per probe. Flows, error messages, body
+    checksums and body heads repeat across probes and are interned. Timings are
+    single-precision and rounded back to libcurl's whole microseconds when read,
+    exact up to about 16 seconds and within a few microseconds at a minute.
+
+    The schedule, client timing, start time and body columns are optional: they are
+    None until the first response carrying them is appended, and earlier rows are
+    then backfilled with NaN (NONE in integer columns). Response ids are kept as 16
+    raw bytes each, so a view equals the response it was appended from as long as
+    its timings are whole microseconds, as libcurl's are. A plain run's response
+    costs about 72 bytes: the id, timings, status code, failure phase, reuse flag,
+    flow and start time.
+
+    Indexing and iteration hand out SuccessfulResponse/FailedResponse views built on
+    demand; analysis code can read the columns directly. Rows of failed responses
+    hold the timings libcurl measured before the failure, or NaN when unknown, so
+    statistics must skip them by `failure_phase`, which indexes FAILURE_PHASES and
+    is NONE for successful rows.
+    """
+    def __init__(self, responses: Iterable[Response] = ()):
+        self._reset()
+        self.extend(responses)
+
+    def _reset(self) -> None:
+        self.response_ids = bytearray()
+        self.status_code = array("h")
+        self.failure_phase = array("b")
+        self.connection_reused = array("b")
+        self.timings: Dict[str, array] = {phase: array("f") for phase in PHASES}
+        self.flow = array("i")
+        self.error_message = array("i")
+        self.intended_start: Optional[array] = None
+        self.actual_start: Optional[array] = None
+        self.scheduling_lag: Optional[array] = None
+        self.processing_lag: Optional[array] = None
+        self.started_at: Optional[array] = None
+        self.body_size: Optional[array] = None
+        self.download_speed: Optional[array] = None
+        self.checksum: Optional[array] = None
+        self.body_head: Optional[array] = None
+        self.flows: List[Flow] = []
+        self.error_messages: List[str] = []
+        self.checksums: List[str] = []
+        self.body_heads: List[bytes] = []
+        self._flow_index: Dict[Flow, int] = {}
+        self._error_message_index: Dict[str, int] = {}
+        self._checksum_index: Dict[str, int] = {}
+        self._body_head_index: Dict[bytes, int] = {}
+
+    def append(self, response: Response) -> None:
+        row = len(self)
+        self.response_ids += response.response_id.bytes
+        if isinstance(response, SuccessfulResponse):
+            self.status_code.append(response.status_code)
+            self.failure_phase.append(NONE)
+            self.connection_reused.append(response.connection_reused)
+            latency = response.latency
+            for phase, column in self.timings.items():
+                column.append(getattr(latency, phase))
+            self.flow.append(self._intern(self._flow_index, self.flows, response.flow))
+            self.error_message.append(NONE)
+        else:
+            self.status_code.append(NONE if response.status_code is None else response.status_code)
+            self.failure_phase.append(FAILURE_PHASES.index(response.failure_phase))
+            self.connection_reused.append(False)
+            latency = response.latency
+            for phase, column in self.timings.items():
+                column.append(math.nan if latency is None else getattr(latency, phase))
+            self.flow.append(NONE if response.flow is None else self._intern(self._flow_index, self.flows, response.flow))
+            self.error_message.append(self._intern(self._error_message_index, self.error_messages,
+                                                   response.error_message))
+        schedule = response.schedule
+        self._append_optional(row, ("intended_start", "actual_start"),
+                              None if schedule is None else (schedule.intended_start, schedule.actual_start))
+        client_timing = response.client_timing
+        self._append_optional(row, ("scheduling_lag", "processing_lag"), None if client_timing is None
+                              else (client_timing.scheduling_lag, client_timing.processing_lag))
+        self._append_optional(row, ("started_at",), None if response.started_at is None else (response.started_at,))
+        body = response.body
+        self._append_optional(row, ("body_size", "download_speed"),
+                              None if body is None else (body.size, body.download_speed))
+        self._append_optional(row, ("checksum",), None if body is None or body.checksum is None
+                              else (self._intern(self._checksum_index, self.checksums, body.checksum),))
+        self._append_optional(row, ("body_head",), None if body is None or body.head is None
+                              else (self._intern(self._body_head_index, self.body_heads, body.head),))
+
+    def cell(self, column: str, row: int) -> Union[float, int]:
+        """
+        Returns the value of an optional column at `row`, NaN or NONE while the
+        column has not been allocated.
+        """
+        values = getattr(self, column)
+        if values is None:
+            return NONE if OPTIONAL_COLUMNS[column] == "i" else math.nan
+        return values[row]
+
+    def response_id(self, row: int) -> UUID:
+        return UUID(bytes=bytes(self.response_ids[row * 16:row * 16 + 16]))
+
+    def extend(self, responses: Iterable[Response]) -> None:
+        for response in responses:
+            self.append(response)
+
+    def clear(self) -> None:
+        self._reset()
+
+    def successes(self) -> int:
+        return self.failure_phase.count(NONE)
+
+    def __len__(self) -> int:
+        return len(self.failure_phase)
+
+    @overload
+    def __getitem__(self, index: int) -> Response: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Response]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Response, List[Response]]:
+        if isinstance(index, slice):
+            return [self._view(row) for row in range(*index.indices(len(self)))]
+        row = index + len(self) if index < 0 else index
+        if not 0 <= row < len(self):
+            raise IndexError("response index out of range")
+        return self._view(row)
+
+    def __iter__(self) -> Iterator[Response]:
+        for row in range(len(self)):
+            yield self._view(row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ResponseColumns, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResponseColumns({len(self)} responses)"
+
+    def _view(self, row: int) -> Response:
+        response_id = self.response_id(row)
+        schedule = self._schedule(row)
+        client_timing = self._client_timing(row)
+        started_at = self.cell("started_at", row)
+        started_at = None if math.isnan(started_at) else started_at
+        body = self._body(row)
+        phase = self.failure_phase[row]
+        if phase == NONE:
+            return SuccessfulResponse(
+                status_code=self.status_code[row],
+                latency=self._latency(row),
+                flow=self.flows[self.flow[row]],
+                connection_reused=bool(self.connection_reused[row]),
+                schedule=schedule,
+                client_timing=client_timing,
+                started_at=started_at,
+                body=body,
+                response_id=response_id,
+            )
+        status_code = self.status_code[row]
+        flow = self.flow[row]
+        return FailedResponse(
+            failure_phase=FAILURE_PHASES[phase],
+            error_message=self.error_messages[self.error_message[row]],
+            status_code=None if status_code == NONE else status_code,
+            latency=None if math.isnan(self.timings["total"][row]) else self._latency(row),
+            flow=None if flow == NONE else self.flows[flow],
+            schedule=schedule,
+            client_timing=client_timing,
+            started_at=started_at,
+            body=body,
+            response_id=response_id,
+        )
+
+    def _latency(self, row: int) -> Latency:
+        return Latency(**{name: round(column[row], 3) for name, column in self.timings.items()})
+
+    def _schedule(self, row: int) -> Optional[Schedule]:
+        intended_start = self.cell("intended_start", row)
+        if math.isnan(intended_start):
+            return None
+        return Schedule(intended_start=intended_start, actual_start=self.actual_start[row])
+
+    def _client_timing(self, row: int) -> Optional[ClientTiming]:
+        scheduling_lag = self.cell("scheduling_lag", row)
+        if math.isnan(scheduling_lag):
+            return None
+        return ClientTiming(scheduling_lag=scheduling_lag, processing_lag=self.processing_lag[row])
+
+    def _body(self, row: int) -> Optional[Body]:
+        size = self.cell("body_size", row)
+        if math.isnan(size):
+            return None
+        checksum, head = self.cell("checksum", row), self.cell("body_head", row)
+        return Body(size=int(size), download_speed=self.download_speed[row],
+                    checksum=None if checksum == NONE else self.checksums[checksum],
+                    head=None if head == NONE else self.body_heads[head])
+
+    def _append_optional(self, row: int, columns: Tuple[str, ...], values: Optional[tuple]) -> None:
+        """
+        Appends one row to a group of optional columns, allocating the group,
+        backfilled up to `row`, when the first values arrive.
+        """
+        if values is None:
+            if getattr(self, columns[0]) is not None:
+                for column in columns:
+                    getattr(self, column).append(NONE if OPTIONAL_COLUMNS[column] == "i" else math.nan)
+            return
+        for column, value in zip(columns, values):
+            if getattr(self, column) is None:
+                fill = NONE if OPTIONAL_COLUMNS[column] == "i" else math.nan
+                setattr(self, column, array(OPTIONAL_COLUMNS[column], [fill]) * row)
+            getattr(self, column).append(value)
+
+    @staticmethod
+    def _intern(index: Dict, values: List, value) -> int:
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(values)
+            values.append(value)
+        return position
+
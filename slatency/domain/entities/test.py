@@ -1,18 +1,17 @@
 from dataclasses import dataclass, field
-from typing import List
 from uuid import UUID, uuid4
 
 from slatency.domain.entities.request import Request
-from slatency.domain.entities.response import Response
+from slatency.domain.entities.response_columns import ResponseColumns
 
 
 @dataclass
 class Test:
     """
     A Test represents a scenario for sending a specific request multiple times
-    and collecting its responses.
+    and collecting its responses, stored column by column in a ResponseColumns.
     """
     request: Request
     expected_responses: int
-    responses: List[Response] = field(default_factory=list)
+    responses: ResponseColumns = field(default_factory=ResponseColumns)
     test_id: UUID = field(default_factory=uuid4)
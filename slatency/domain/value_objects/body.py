@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Body:
+    """
+    A value object describing a downloaded response body: its `size` in bytes, the
+    average download speed libcurl measured in bytes per second, and, depending on
+    the BodyPolicy, its SHA-256 `checksum` (hex) and its first bytes (`head`).
+    """
+    size: int
+    download_speed: float
+    checksum: Optional[str] = None
+    head: Optional[bytes] = None
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+MODES = ("discard", "count", "hash", "keep")
+DEFAULT_KEEP_BYTES = 1024
+
+
+@dataclass(frozen=True)
+class BodyPolicy:
+    """
+    A value object describing what a probe does with the response body:
+    'discard' drops it, 'count' records its size and download speed, 'hash' also
+    streams a SHA-256 checksum of it for integrity checks, and 'keep' instead keeps
+    its first `keep_bytes` bytes on failed responses, to diagnose error pages. The
+    body is never buffered whole under any policy.
+    """
+    mode: str = "discard"
+    keep_bytes: int = 0
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"Body policy must be one of {', '.join(MODES)}")
+        if self.keep_bytes < 0 or (self.mode == "keep") != (self.keep_bytes > 0):
+            raise ValueError("Only the 'keep' body policy keeps bytes, and it keeps at least one")
+
+    @classmethod
+    def from_string(cls, value: str) -> "BodyPolicy":
+        """
+        Builds a BodyPolicy from 'discard', 'count', 'hash', 'keep' or 'keep:N'.
+        """
+        mode, _, size = value.strip().lower().partition(":")
+        if mode == "keep":
+            if size and not size.isdigit():
+                raise ValueError(f"Invalid body policy '{value}', expected keep:N with N a number of bytes")
+            return cls(mode, int(size) if size else DEFAULT_KEEP_BYTES)
+        if size:
+            raise ValueError(f"Invalid body policy '{value}', only 'keep' takes a size")
+        return cls(mode)
+
+    def to_string(self) -> str:
+        return f"keep:{self.keep_bytes}" if self.mode == "keep" else self.mode
+
+    @property
+    def records_body(self) -> bool:
+        return self.mode != "discard"
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ClientTiming:
+    """
+    A value object holding how long the client itself delayed a request, in milliseconds.
+    Large values mean the load generator, not the target, is the bottleneck.
+    """
+    scheduling_lag: float
+    processing_lag: float
@@ -0,0 +1,11 @@
+from enum import Enum
+
+class HTTPVersion(Enum):
+    """
+    An enumeration of the HTTP versions a Request can ask for. HTTP_2 is negotiated
+    through TLS (ALPN) and falls back to HTTP/1.1; HTTP_2_PRIOR_KNOWLEDGE speaks
+    HTTP/2 straight away, which is how cleartext (h2c) servers are reached.
+    """
+    HTTP_1_1 = "1.1"
+    HTTP_2 = "2"
+    HTTP_2_PRIOR_KNOWLEDGE = "2-prior-knowledge"
@@ -7,11 +7,11 @@ class Latency:
     A value object holding detailed timing information for a successful request.
     All values are in milliseconds.
     """
-    queue: int
-    dns: int
-    connect: int
-    tls: int
-    send_first_byte: int
-    send_last_byte: int
-    receive_first_byte: int
-    total: int
+    queue: float
+    dns: float
+    connect: float
+    tls: float
+    send_first_byte: float
+    send_last_byte: float
+    receive_first_byte: float
+    total: float
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """
+    A value object holding when a request was meant to be sent and when it was actually sent.
+    All values are in milliseconds since the start of the Test.
+    """
+    intended_start: float
+    actual_start: float
+
+    @property
+    def queueing_delay(self) -> float:
+        """
+        Time the request waited past its intended send time, e.g. behind a stalled server.
+        """
+        return max(self.actual_start - self.intended_start, 0.0)
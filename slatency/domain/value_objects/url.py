@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 from typing import Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
 
 @dataclass(frozen=True)
 class URL:
@@ -17,3 +20,27 @@ class URL:
             raise ValueError("Protocol must be 'http' or 'https'")
         if not (0 <= self.port <= 65535):
             raise ValueError("Port must be between 0 and 65535")
+
+    @classmethod
+    def from_string(cls, value: str) -> "URL":
+        """
+        Builds a URL from its textual form, filling in the default port for the protocol.
+        """
+        parts = urlsplit(value)
+        protocol = parts.scheme.lower()
+        return cls(
+            protocol=protocol,
+            host=parts.hostname or "",
+            port=parts.port if parts.port is not None else DEFAULT_PORTS.get(protocol, 0),
+            path=parts.path or "/",
+            query_params=dict(parse_qsl(parts.query, keep_blank_values=True)),
+        )
+
+    def to_string(self) -> str:
+        """
+        Returns the textual form of the URL, omitting the port when it is the protocol default.
+        """
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        netloc = host if DEFAULT_PORTS.get(self.protocol) == self.port else f"{host}:{self.port}"
+        query = f"?{urlencode(self.query_params)}" if self.query_params else ""
+        return f"{self.protocol}://{netloc}{self.path}{query}"
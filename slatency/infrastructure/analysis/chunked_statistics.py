@@ -0,0 +1,180 @@
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+
+QUANTILES = [0.50, 0.90, 0.95, 0.99]
+
+
+@dataclass(frozen=True)
+class MetricSummary:
+    """
+    Exact statistics of one metric, matching pandas' count/mean/std/min/max/quantile.
+    """
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    quantiles: Dict[float, float]
+
+
+class ChunkedStatistics:
+    """
+    Exact statistics for many metrics over data that arrives in chunks of a 2-D array
+    (rows x metrics), in memory independent of the number of rows. NaNs are ignored.
+
+    Pass 1 (`update`) folds every chunk into per-metric moments and log-bucket counts
+    in a few vectorized calls. `plan` then finds the buckets holding the order
+    statistics needed for the requested quantiles, and pass 2 (`refine`) keeps only
+    the distinct values of those buckets, from which the quantiles are resolved exactly
+    with pandas' linear interpolation.
+    """
+    def __init__(self, metrics: Sequence[str], quantiles: Sequence[float] = QUANTILES,
+                 relative_accuracy: float = 0.01, min_value: float = 1e-3, max_value: float = 1e9):
+        self.metrics = list(metrics)
+        self.quantiles = list(quantiles)
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._low = math.ceil(math.log(min_value) / self._log_gamma)
+        self._buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._low + 1
+        self._min_value = min_value
+        width = len(self.metrics)
+        self._count = np.zeros(width, dtype=np.int64)
+        self._mean = np.zeros(width)
+        self._m2 = np.zeros(width)
+        self._min = np.full(width, np.inf)
+        self._max = np.full(width, -np.inf)
+        self._bucket_counts = np.zeros((width, self._buckets), dtype=np.int64)
+        self._targets: List[Dict[int, List[int]]] = []
+        self._values: List[Dict[int, Counter]] = []
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Pass 1: folds a chunk (rows x metrics) into the moments and bucket counts.
+        """
+        if values.shape[0] == 0:
+            return
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        present = count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            chunk_sum = np.where(valid, values, 0.0).sum(axis=0)
+            chunk_mean = np.where(present, chunk_sum / np.maximum(count, 1), 0.0)
+            chunk_m2 = np.where(valid, (values - chunk_mean) ** 2, 0.0).sum(axis=0)
+        # Chan et al. parallel combination of mean and sum of squared deviations
+        total = self._count + count
+        delta = chunk_mean - self._mean
+        safe_total = np.maximum(total, 1)
+        self._m2 += chunk_m2 + delta ** 2 * self._count * count / safe_total
+        self._mean += delta * count / safe_total
+        self._count = total
+        self._min = np.fmin(self._min, np.where(present, np.nanmin(np.where(valid, values, np.inf), axis=0), np.inf))
+        self._max = np.fmax(self._max, np.where(present, np.nanmax(np.where(valid, values, -np.inf), axis=0), -np.inf))
+
+        buckets = self._bucket_indices(values)
+        offsets = np.arange(len(self.metrics)) * (self._buckets + 1)
+        flat = np.bincount((buckets + offsets).ravel(), minlength=len(self.metrics) * (self._buckets + 1))
+        self._bucket_counts += flat.reshape(len(self.metrics), self._buckets + 1)[:, :self._buckets]
+
+    def plan(self) -> None:
+        """
+        Chooses, for every metric, the buckets pass 2 has to look into.
+        """
+        self._targets = []
+        for m in range(len(self.metrics)):
+            cumulative = np.cumsum(self._bucket_counts[m])
+            targets: Dict[int, List[int]] = {}
+            for rank in self._ranks(int(self._count[m])):
+                bucket = int(np.searchsorted(cumulative, rank, side="right"))
+                targets.setdefault(bucket, []).append(rank)
+            self._targets.append(targets)
+        self._values = [{bucket: Counter() for bucket in targets} for targets in self._targets]
+
+    def refine(self, values: np.ndarray) -> None:
+        """
+        Pass 2: keeps the distinct values, with their counts, of the planned buckets.
+        """
+        if values.shape[0] == 0:
+            return
+        buckets = self._bucket_indices(values)
+        for m, targets in enumerate(self._targets):
+            if not targets:
+                continue
+            column_buckets = buckets[:, m]
+            selected = np.isin(column_buckets, list(targets))
+            if not selected.any():
+                continue
+            chosen_values = values[selected, m]
+            chosen_buckets = column_buckets[selected]
+            for bucket in targets:
+                distinct, counts = np.unique(chosen_values[chosen_buckets == bucket], return_counts=True)
+                self._values[m][bucket].update(dict(zip(distinct.tolist(), counts.tolist())))
+
+    def summaries(self) -> Dict[str, MetricSummary]:
+        results = {}
+        for m, metric in enumerate(self.metrics):
+            count = int(self._count[m])
+            if count == 0:
+                continue
+            order_statistics = self._order_statistics(m)
+            quantiles = {}
+            for q in self.quantiles:
+                position = q * (count - 1)
+                lower = order_statistics[math.floor(position)]
+                upper = order_statistics[math.ceil(position)]
+                quantiles[q] = _lerp(lower, upper, position - math.floor(position))
+            results[metric] = MetricSummary(
+                count=count,
+                mean=float(self._mean[m]),
+                std=math.sqrt(self._m2[m] / (count - 1)) if count > 1 else math.nan,
+                min=float(self._min[m]),
+                max=float(self._max[m]),
+                quantiles=quantiles,
+            )
+        return results
+
+    def _order_statistics(self, m: int) -> Dict[int, float]:
+        cumulative = np.cumsum(self._bucket_counts[m])
+        resolved = {}
+        for bucket, ranks in self._targets[m].items():
+            below = int(cumulative[bucket - 1]) if bucket > 0 else 0
+            distinct = sorted(self._values[m][bucket].items())
+            seen = below
+            index = 0
+            for rank in sorted(ranks):
+                while seen + distinct[index][1] <= rank:
+                    seen += distinct[index][1]
+                    index += 1
+                resolved[rank] = distinct[index][0]
+        return resolved
+
+    def _ranks(self, count: int) -> Set[int]:
+        if count == 0:
+            return set()
+        ranks = set()
+        for q in self.quantiles:
+            position = q * (count - 1)
+            ranks.update((math.floor(position), math.ceil(position)))
+        return ranks
+
+    def _bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        """
+        Maps values to bucket numbers; NaNs go to the extra bucket `self._buckets`.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            indices = np.ceil(np.log(np.maximum(values, self._min_value)) / self._log_gamma) - self._low
+        indices = np.clip(indices, 0, self._buckets - 1)
+        indices[np.isnan(values)] = self._buckets
+        return indices.astype(np.int64)
+
+
+def _lerp(lower: float, upper: float, fraction: float) -> float:
+    """
+    Linear interpolation as numpy computes it for quantiles.
+    """
+    if fraction >= 0.5:
+        return upper - (upper - lower) * (1 - fraction)
+    return lower + (upper - lower) * fraction
+
@@ -0,0 +1,154 @@
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from slatency.infrastructure.analysis.log_histogram import LogHistogram
+
+LAG_METRICS = ["scheduling_lag", "processing_lag", "callback", "queue"]
+# An idle client already shows a P99 lag of 1-2ms from select and wake-up jitter
+DEFAULT_LAG_THRESHOLD_MS = 5.0
+# Lag only points at a saturated client when the client is also busy
+DEFAULT_LAG_CPU_THRESHOLD = 0.5
+
+
+class ClientSaturationMonitor:
+    """
+    Instruments the client's own behaviour during a run, so that latency added by a
+    CPU-bound load generator is not mistaken for a slow server.
+
+    Per probe it records the scheduling lag (due or slot free until actually started),
+    the processing lag (transfer done until the runner processed it), the time spent in
+    the Python response callbacks and libcurl's QUEUE_TIME_T, all in milliseconds. Per
+    run it records CPU utilisation and the event-loop backlog: completions handled per
+    drain and, in open-loop mode, probes overdue at once.
+
+    Lags above `lag_threshold_ms` (P99) are only reported while the process used at
+    least `lag_cpu_threshold` of a core, CPU above `cpu_threshold` always is.
+
+    With `profile` set, runners wrap their hot-path sections with `timed` and the
+    accumulated time per section can be written with `dump_profile`.
+    """
+    def __init__(self, lag_threshold_ms: float = DEFAULT_LAG_THRESHOLD_MS, cpu_threshold: float = 0.9,
+                 lag_cpu_threshold: float = DEFAULT_LAG_CPU_THRESHOLD, profile: bool = False):
+        self.lag_threshold_ms = lag_threshold_ms
+        self.cpu_threshold = cpu_threshold
+        self.lag_cpu_threshold = lag_cpu_threshold
+        self.profile = profile
+        self.histograms: Dict[str, LogHistogram] = {metric: LogHistogram() for metric in LAG_METRICS}
+        self.drains = 0
+        self.drained = 0
+        self.max_drained = 0
+        self.max_overdue = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.sections: Dict[str, List[float]] = {}
+        self._wall_start: Optional[float] = None
+        self._cpu_start = 0.0
+
+    def start(self) -> None:
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def stop(self) -> None:
+        if self._wall_start is None:
+            return
+        self.wall_seconds += time.perf_counter() - self._wall_start
+        self.cpu_seconds += time.process_time() - self._cpu_start
+        self._wall_start = None
+
+    def record_probe(self, queue_ms: Optional[float], scheduling_lag_ms: Optional[float] = None,
+                     processing_lag_ms: Optional[float] = None) -> None:
+        if queue_ms is not None:
+            self.histograms["queue"].record(queue_ms)
+        if scheduling_lag_ms is not None:
+            self.histograms["scheduling_lag"].record(scheduling_lag_ms)
+        if processing_lag_ms is not None:
+            self.histograms["processing_lag"].record(processing_lag_ms)
+
+    def record_callback(self, seconds: float) -> None:
+        self.histograms["callback"].record(seconds * 1000.0)
+        if self.profile:
+            self._add_section("callback", seconds)
+
+    def record_drain(self, completions: int) -> None:
+        self.drains += 1
+        self.drained += completions
+        self.max_drained = max(self.max_drained, completions)
+
+    def record_overdue(self, probes: int) -> None:
+        self.max_overdue = max(self.max_overdue, probes)
+
+    def timed(self, section: str, function: Callable) -> Callable:
+        """
+        Wraps `function` so that its calls are counted and timed under `section`.
+        """
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._add_section(section, time.perf_counter() - start)
+        return wrapper
+
+    @property
+    def cpu_utilisation(self) -> float:
+        """
+        Process CPU time over wall time; 1.0 is one fully busy core.
+        """
+        return self.cpu_seconds / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "cpu_utilisation": self.cpu_utilisation,
+            "cpu_seconds": self.cpu_seconds,
+            "wall_seconds": self.wall_seconds,
+            "completions_per_drain": {"mean": self.drained / self.drains if self.drains else 0.0,
+                                      "max": self.max_drained},
+            "max_overdue": self.max_overdue,
+        }
+        for metric, histogram in self.histograms.items():
+            if histogram.count:
+                summary[f"{metric}_ms"] = {"p50": histogram.quantile(0.5), "p99": histogram.quantile(0.99),
+                                           "max": histogram.max}
+        return summary
+
+    def warnings(self) -> List[str]:
+        """
+        Describes every sign that the client, not the target, limited the run.
+        """
+        warnings = []
+        if self.cpu_utilisation >= self.cpu_threshold:
+            warnings.append(f"Client CPU at {100.0 * self.cpu_utilisation:.0f}% of one core: the Python process "
+                            f"is likely the bottleneck; use --workers to spread the load.")
+        if self.cpu_utilisation < self.lag_cpu_threshold:
+            return warnings
+        messages = {
+            "scheduling_lag": "Probes started {p99:.3f}ms (P99) after they were due or a slot was free.",
+            "processing_lag": "Finished transfers waited {p99:.3f}ms (P99) before being processed; "
+                              "timings of probes in flight meanwhile include this client delay.",
+            "callback": "Response callbacks took {p99:.3f}ms (P99) each, blocking the event loop.",
+            "queue": "libcurl queued transfers for {p99:.3f}ms (P99) before starting them.",
+        }
+        for metric, message in messages.items():
+            histogram = self.histograms[metric]
+            if histogram.count and histogram.quantile(0.99) > self.lag_threshold_ms:
+                warnings.append(message.format(p99=histogram.quantile(0.99)))
+        return warnings
+
+    def profile_report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            section: {"calls": calls, "seconds": seconds, "share_of_wall": seconds / self.wall_seconds
+                      if self.wall_seconds > 0 else 0.0}
+            for section, (calls, seconds) in sorted(self.sections.items(), key=lambda item: -item[1][1])
+        }
+
+    def dump_profile(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "sections": self.profile_report()}, f, indent=4)
+
+    def _add_section(self, section: str, seconds: float) -> None:
+        totals = self.sections.get(section)
+        if totals is None:
+            totals = self.sections[section] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += seconds
@@ -0,0 +1,129 @@
+import math
+from typing import Any, Dict, List, Optional
+
+
+class LogHistogram:
+    """
+    A mergeable, log-bucketed histogram for non-negative latencies in milliseconds.
+
+    Bucket i covers (gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a), where `a`
+    is the relative accuracy. Any quantile is returned within a relative error of `a`
+    of the exact value (e.g. 1% for the default accuracy), values at or below
+    `min_value` are counted as zero. Memory only depends on the range of values, not
+    on how many were recorded, and histograms with the same accuracy merge losslessly
+    by adding their bucket counts.
+    """
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = 0
+        self._counts: List[int] = []
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float, count: int = 1) -> None:
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._grow(index, index)
+        self._counts[index - self._offset] += count
+
+    def merge(self, other: "LogHistogram") -> None:
+        """
+        Adds the counts of another histogram with the same accuracy to this one.
+        """
+        if other._gamma != self._gamma or other.min_value != self.min_value:
+            raise ValueError("Only histograms with the same accuracy and minimum value can be merged")
+        if other.count == 0:
+            return
+        if other._counts:
+            self._grow(other._offset, other._offset + len(other._counts) - 1)
+            start = other._offset - self._offset
+            for i, bucket_count in enumerate(other._counts):
+                self._counts[start + i] += bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        Returns the value at quantile `q` (0..1), or NaN when nothing was recorded.
+        """
+        if self.count == 0:
+            return math.nan
+        return self.value_at_rank(q * (self.count - 1))
+
+    def value_at_rank(self, rank: float) -> float:
+        """
+        Returns the value of the order statistic at the 0-based `rank`, which must be
+        below `count`; fractional ranks fall into the bucket of their integer part.
+        """
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for i, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if rank < seen:
+                # The bucket midpoint in relative terms keeps the error within the accuracy
+                value = 2 * self._gamma ** (i + self._offset) / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else math.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "offset": self._offset,
+            "counts": list(self._counts),
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogHistogram":
+        histogram = cls(data["relative_accuracy"], data["min_value"])
+        histogram._offset = data["offset"]
+        histogram._counts = list(data["counts"])
+        histogram.zero_count = data["zero_count"]
+        histogram.count = data["count"]
+        histogram.sum = data["sum"]
+        histogram.min = _or_default(data["min"], math.inf)
+        histogram.max = _or_default(data["max"], -math.inf)
+        return histogram
+
+    def _grow(self, low: int, high: int) -> None:
+        if not self._counts:
+            self._offset = low
+            self._counts = [0] * (high - low + 1)
+            return
+        if low < self._offset:
+            self._counts[:0] = [0] * (self._offset - low)
+            self._offset = low
+        top = self._offset + len(self._counts) - 1
+        if high > top:
+            self._counts.extend([0] * (high - top))
+
+
+def _or_default(value: Optional[float], default: float) -> float:
+    return default if value is None else value
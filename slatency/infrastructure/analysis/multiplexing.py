@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Groups of streams by how many streams were in flight on their connection when they
+# were sent, themselves included: (label, lowest count, highest count)
+CONCURRENCY_GROUPS = [("1", 1, 1), ("2-4", 2, 4), ("5-16", 5, 16), ("17-64", 17, 64), ("65+", 65, np.inf)]
+
+
+@dataclass(frozen=True)
+class StreamStatistics:
+    """
+    Total and server time percentiles, in milliseconds, of a group of streams.
+    """
+    label: str
+    streams: int
+    total_p50: float
+    total_p99: float
+    server_p50: float
+    server_p99: float
+
+
+@dataclass(frozen=True)
+class ConnectionStatistics:
+    """
+    The streams one connection carried: how many, how many at once at most, what
+    opening it cost (DNS, TCP and TLS up to the first stream's request, NaN if the
+    opening stream failed) and the percentiles of its streams.
+    """
+    connection: str
+    peak_streams: int
+    setup_ms: float
+    streams: StreamStatistics
+
+
+@dataclass(frozen=True)
+class MultiplexingReport:
+    """
+    Per-connection and per-stream statistics of a multiplexed run. `by_concurrency`
+    groups the streams by the number of streams in flight on their connection when
+    they were sent, which exposes head-of-line blocking and the server's concurrency
+    limits; `opening` and `multiplexed` split the streams that opened a connection
+    from those that rode on an open one.
+    """
+    connections: List[ConnectionStatistics]
+    by_concurrency: List[StreamStatistics]
+    opening: StreamStatistics
+    multiplexed: StreamStatistics
+
+    @property
+    def peak_streams(self) -> int:
+        return max((connection.peak_streams for connection in self.connections), default=0)
+
+
+class MultiplexingRecorder:
+    """
+    Collects what the MultiplexingReport needs from the result dictionaries of a run,
+    a few numbers per successful probe. Streams are attributed to connections by
+    their Flow (local and remote address), failed probes have none and are left out.
+    """
+    def __init__(self):
+        self._connections: Dict[str, int] = {}
+        self._connection: List[int] = []
+        self._start: List[float] = []
+        self._total: List[float] = []
+        self._server: List[float] = []
+        self._setup: List[float] = []
+        self._reused: List[bool] = []
+
+    def record(self, result: Dict[str, Any]) -> None:
+        if "error" in result or "timestamp" not in result or result.get("localPort") in (None, "N/A"):
+            return
+        name = f"{result['localIP']}:{result['localPort']} -> {result['remoteIP']}:{result['remotePort']}"
+        self._connection.append(self._connections.setdefault(name, len(self._connections)))
+        # A stream occupies its connection from its request being sent, not from the
+        # moment it was queued waiting for a free stream
+        self._start.append(result["timestamp"] + result["pretransferTime_ms"] / 1000.0)
+        self._total.append(result["totalTime_ms"])
+        self._server.append(max(result["startTransferTime_ms"] - result["pretransferTime_ms"], 0.0))
+        self._setup.append(result["pretransferTime_ms"])
+        self._reused.append(bool(result.get("connectionReused")))
+
+    def report(self) -> MultiplexingReport:
+        connection = np.asarray(self._connection, dtype=np.int64)
+        start = np.asarray(self._start, dtype=np.float64)
+        total = np.asarray(self._total, dtype=np.float64)
+        server = np.asarray(self._server, dtype=np.float64)
+        setup = np.asarray(self._setup, dtype=np.float64)
+        reused = np.asarray(self._reused, dtype=bool)
+        in_flight = streams_in_flight(connection, start, start + (total - setup) / 1000.0)
+
+        connections = []
+        for name, index in self._connections.items():
+            streams = connection == index
+            opening = streams & ~reused
+            connections.append(ConnectionStatistics(
+                connection=name,
+                peak_streams=int(in_flight[streams].max()),
+                setup_ms=float(setup[opening][np.argmin(start[opening])]) if opening.any() else np.nan,
+                streams=_statistics("", total[streams], server[streams]),
+            ))
+        by_concurrency = [
+            _statistics(label, total[group], server[group])
+            for label, low, high in CONCURRENCY_GROUPS
+            for group in [(in_flight >= low) & (in_flight <= high)]
+            if group.any()
+        ]
+        return MultiplexingReport(
+            connections=connections,
+            by_concurrency=by_concurrency,
+            opening=_statistics("opened a connection", total[~reused], server[~reused]),
+            multiplexed=_statistics("rode on an open connection", total[reused], server[reused]),
+        )
+
+
+def streams_in_flight(connection: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """
+    For every stream, the number of streams of the same connection in flight when it
+    was sent, itself included: those sent by then minus those finished by then.
+    """
+    in_flight = np.zeros(len(start), dtype=np.int64)
+    for index in np.unique(connection):
+        streams = np.flatnonzero(connection == index)
+        starts, ends = np.sort(start[streams]), np.sort(end[streams])
+        begun = np.searchsorted(starts, start[streams], side="right")
+        finished = np.searchsorted(ends, start[streams], side="right")
+        in_flight[streams] = begun - finished
+    return in_flight
+
+
+def _statistics(label: str, total: np.ndarray, server: np.ndarray) -> StreamStatistics:
+    if not len(total):
+        return StreamStatistics(label, 0, np.nan, np.nan, np.nan, np.nan)
+    total_p50, total_p99 = np.percentile(total, [50, 99])
+    server_p50, server_p99 = np.percentile(server, [50, 99])
+    return StreamStatistics(label, len(total), float(total_p50), float(total_p99), float(server_p50),
+                            float(server_p99))
@@ -0,0 +1,118 @@
+import math
+import re
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Tuple
+
+from slatency.infrastructure.analysis.log_histogram import LogHistogram
+
+
+@dataclass(frozen=True)
+class PercentileInterval:
+    """
+    The estimate of one percentile of one phase, in milliseconds, with its confidence
+    interval after `count` successful probes. Bounds are NaN while there are too few
+    probes for the interval to be bounded on both sides.
+    """
+    phase: str
+    quantile: float
+    estimate: float
+    lower: float
+    upper: float
+    count: int
+
+    @property
+    def relative_half_width(self) -> float:
+        """
+        The larger distance from the estimate to a bound, relative to the estimate.
+        """
+        if math.isnan(self.lower) or math.isnan(self.upper):
+            return math.inf
+        if self.estimate == 0:
+            return 0.0 if self.upper == 0 else math.inf
+        return max(self.upper - self.estimate, self.estimate - self.lower) / self.estimate
+
+    @property
+    def label(self) -> str:
+        return f"{self.phase} p{self.quantile * 100:g}"
+
+
+class PercentileConvergence:
+    """
+    Tracks confidence intervals of chosen percentiles while a run is in progress, to
+    stop it once they are precise enough instead of after a fixed number of probes.
+
+    Every `targets` entry is a (phase, quantile) pair, e.g. ("total", 0.99). The
+    interval of quantile q after n probes is distribution-free: it spans the order
+    statistics at ranks n*q -/+ z*sqrt(n*q*(1-q)), z being the normal quantile of
+    `confidence`. Values are kept in one LogHistogram per phase, so memory does not
+    grow with the run and checking costs the same at any probe count; the histogram's
+    `relative_accuracy` is the floor of any achievable precision.
+
+    The run has `converged` once at least `min_probes` successful probes were recorded
+    and every interval lies within `precision` (relative) of its estimate. Intervals
+    are re-evaluated every `check_every` probes.
+    """
+    def __init__(self, targets: Sequence[Tuple[str, float]], precision: float = 0.05, confidence: float = 0.95,
+                 min_probes: int = 100, check_every: int = 10, relative_accuracy: float = 0.005):
+        if not targets:
+            raise ValueError("At least one percentile must be tracked")
+        if not 0 < confidence < 1:
+            raise ValueError("Confidence must be between 0 and 1")
+        if precision <= relative_accuracy:
+            raise ValueError(f"Precision must be above the histogram accuracy of {relative_accuracy:g}")
+        self.targets = list(targets)
+        self.precision = precision
+        self.confidence = confidence
+        self.min_probes = min_probes
+        self.check_every = check_every
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.histograms: Dict[str, LogHistogram] = {
+            phase: LogHistogram(relative_accuracy) for phase in dict.fromkeys(phase for phase, _ in self.targets)
+        }
+        self.count = 0
+        self._converged = False
+
+    def record(self, phases: Dict[str, float]) -> None:
+        """
+        Records the phase durations of one successful probe.
+        """
+        for phase, histogram in self.histograms.items():
+            histogram.record(phases[phase])
+        self.count += 1
+        if self.count >= self.min_probes and self.count % self.check_every == 0:
+            self._converged = all(interval.relative_half_width <= self.precision for interval in self.intervals())
+
+    @property
+    def converged(self) -> bool:
+        return self._converged
+
+    def intervals(self) -> List[PercentileInterval]:
+        return [self._interval(phase, quantile) for phase, quantile in self.targets]
+
+    def _interval(self, phase: str, quantile: float) -> PercentileInterval:
+        histogram = self.histograms[phase]
+        n = histogram.count
+        estimate = histogram.quantile(quantile)
+        spread = self._z * math.sqrt(n * quantile * (1 - quantile))
+        # 1-based ranks of the bounds; the interval is unbounded until both exist
+        lower_rank = math.floor(n * quantile - spread)
+        upper_rank = math.ceil(n * quantile + spread)
+        if lower_rank < 1 or upper_rank > n:
+            return PercentileInterval(phase, quantile, estimate, math.nan, math.nan, n)
+        return PercentileInterval(phase, quantile, estimate, histogram.value_at_rank(lower_rank - 1),
+                                  histogram.value_at_rank(upper_rank - 1), n)
+
+
+def parse_percentile_targets(text: str, phases: Sequence[str]) -> List[Tuple[str, float]]:
+    """
+    Parses a comma-separated list such as 'total:p99,tls:p95' into (phase, quantile) pairs.
+    """
+    targets = []
+    for item in text.split(","):
+        match = re.fullmatch(r"\s*(\w+):p(\d+(?:\.\d+)?)\s*", item)
+        if match is None or match.group(1) not in phases or not 0 < float(match.group(2)) < 100:
+            raise ValueError(f"Invalid percentile '{item}', expected PHASE:pNN with PHASE one of "
+                             f"{', '.join(phases)}, e.g. total:p99")
+        targets.append((match.group(1), float(match.group(2)) / 100))
+    return targets
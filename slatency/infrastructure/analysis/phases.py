@@ -0,0 +1,38 @@
+from typing import Any, Dict, Mapping
+
+# Phase durations derived from the cumulative libcurl timings of the result dictionaries
+PHASES = ["dns", "connect", "tls", "server", "total"]
+
+
+def result_phases(result: Dict[str, Any]) -> Dict[str, float]:
+    namelookup = result.get("namelookupTime_ms", 0.0)
+    connect = result.get("connectTime_ms", 0.0)
+    appconnect = result.get("appconnectTime_ms", 0.0)
+    pretransfer = result.get("pretransferTime_ms", 0.0)
+    return {
+        "dns": namelookup,
+        "connect": max(connect - namelookup, 0.0),
+        "tls": max(appconnect - connect, 0.0) if appconnect > 0 else 0.0,
+        "server": max(result.get("startTransferTime_ms", 0.0) - pretransfer, 0.0),
+        "total": result.get("totalTime_ms", 0.0),
+    }
+
+
+def phase_arrays(columns: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Derives the dns/connect/tls/server/total durations from the cumulative libcurl
+    timing columns of the results files, vectorized over all rows.
+    """
+    # Only analysis needs numpy, the live progress view of a run must not load it
+    import numpy as np
+    namelookup = columns["namelookupTime_ms"]
+    connect = columns["connectTime_ms"]
+    appconnect = columns["appconnectTime_ms"]
+    pretransfer = columns["pretransferTime_ms"]
+    return {
+        "dns": np.asarray(namelookup, dtype=np.float64),
+        "connect": np.maximum(connect - namelookup, 0.0),
+        "tls": np.where(appconnect > 0, np.maximum(appconnect - connect, 0.0), 0.0),
+        "server": np.maximum(columns["startTransferTime_ms"] - pretransfer, 0.0),
+        "total": np.asarray(columns["totalTime_ms"], dtype=np.float64),
+    }
@@ -0,0 +1,604 @@
+import json
+import sys # For sys.exit
+
+import numpy as np
+import pandas as pd
+
+from slatency.infrastructure.analysis.chunked_statistics import QUANTILES, ChunkedStatistics, MetricSummary
+from slatency.infrastructure.analysis.client_saturation_monitor import DEFAULT_LAG_THRESHOLD_MS
+from slatency.infrastructure.analysis.phases import PHASES, phase_arrays
+from slatency.infrastructure.analysis.time_windows import WINDOW_QUANTILES, compute_windows, find_deviations
+from slatency.infrastructure.columnar.columnar_format import is_columnar, open_columns
+
+# Define the base timing columns (in milliseconds in the results file)
+BASE_TIME_COLS_MS = ['queueTime_ms', 'namelookupTime_ms', 'connectTime_ms',
+                     'appconnectTime_ms', 'pretransferTime_ms',
+                     'startTransferTime_ms', 'totalTime_ms', 'redirectTime_ms']
+# Only single probes of main.py record a redirect time; the runners do not follow redirects
+OPTIONAL_TIME_COLS_MS = ['redirectTime_ms']
+# Open-loop runs (--rate) also record the delay behind the intended send time.
+# Latency measured from the intended start is what users of a stalled server see.
+SCHEDULE_METRICS_MS = ['queueingDelay_ms', 'totalTimeFromIntended_ms']
+# Runs with client instrumentation record how late the client started each probe
+# and how long a finished transfer waited for it; high values mean the client saturated.
+CLIENT_METRICS_MS = ['schedulingLag_ms', 'processingLag_ms']
+DERIVED_METRICS_MS = ['time_to_connect_ms', 'time_to_tls_ms', 'ttfb_setup_ms',
+                      'server_processing_ms', 'response_download_ms']
+# Runs with a body policy other than 'discard' record the body size; the download
+# throughput is derived from it and response_download_ms
+TRANSFER_METRICS = {'downloadSize_bytes': 'bytes', 'download_throughput_MBps': 'MB/s'}
+# Windows printed in full; longer runs only print the flagged windows
+MAX_WINDOW_ROWS = 60
+
+def calculate_derived_timings(df):
+    """
+    Calculates derived timing metrics in milliseconds and adds them as new columns.
+    Assumes input columns from the DataFrame are already in milliseconds.
+    """
+    # Time to connect = connectTime_ms - namelookupTime_ms
+    if 'connectTime_ms' in df.columns and 'namelookupTime_ms' in df.columns:
+        df['time_to_connect_ms'] = df['connectTime_ms'] - df['namelookupTime_ms']
+        # Ensure non-negative, as namelookup can sometimes be slightly larger due to resolution or system effects
+        df.loc[df['time_to_connect_ms'] < 0, 'time_to_connect_ms'] = 0.0
+
+
+    # Time to TLS = appconnectTime_ms - connectTime_ms
+    # appconnectTime_ms is 0 for HTTP or if SSL negotiation didn't happen/complete
+    if 'appconnectTime_ms' in df.columns and 'connectTime_ms' in df.columns:
+        df['time_to_tls_ms'] = df['appconnectTime_ms'] - df['connectTime_ms']
+        df.loc[df['appconnectTime_ms'] == 0, 'time_to_tls_ms'] = 0.0 # If no appconnect, TLS time is 0
+        df.loc[df['time_to_tls_ms'] < 0, 'time_to_tls_ms'] = 0.0
+
+
+    # Time to first byte setup (TTFB setup) = pretransferTime_ms - (appconnectTime_ms or connectTime_ms)
+    if 'pretransferTime_ms' in df.columns:
+        base_for_ttfb_setup_ms = np.where(df['appconnectTime_ms'] > 0, df['appconnectTime_ms'], df.get('connectTime_ms', 0.0))
+        df['ttfb_setup_ms'] = df['pretransferTime_ms'] - base_for_ttfb_setup_ms
+        df.loc[df['ttfb_setup_ms'] < 0, 'ttfb_setup_ms'] = 0.0
+
+
+    # Server processing time = startTransferTime_ms - pretransferTime_ms
+    if 'startTransferTime_ms' in df.columns and 'pretransferTime_ms' in df.columns:
+        df['server_processing_ms'] = df['startTransferTime_ms'] - df['pretransferTime_ms']
+        df.loc[df['server_processing_ms'] < 0, 'server_processing_ms'] = 0.0
+
+    # Response download time = totalTime_ms - startTransferTime_ms
+    if 'totalTime_ms' in df.columns and 'startTransferTime_ms' in df.columns:
+        df['response_download_ms'] = df['totalTime_ms'] - df['startTransferTime_ms']
+        df.loc[df['response_download_ms'] < 0, 'response_download_ms'] = 0.0
+
+    # Download throughput = downloadSize_bytes / response_download_ms, in MB/s
+    # Bodies that arrived with the first byte took no measurable download time and have none
+    if 'downloadSize_bytes' in df.columns and 'response_download_ms' in df.columns:
+        download_ms = df['response_download_ms'].where(df['response_download_ms'] > 0)
+        df['download_throughput_MBps'] = pd.to_numeric(df['downloadSize_bytes'], errors='coerce') / download_ms / 1000.0
+
+    return df
+
+def is_json_lines(input_file_path):
+    """
+    Tells a JSON Lines file (one object per line) from a JSON array by its first non-blank character.
+    """
+    with open(input_file_path, 'r') as f:
+        for line in f:
+            stripped = line.lstrip()
+            if stripped:
+                return stripped.startswith('{')
+    return False
+
+def iter_json_lines(input_file_path, chunk_size=100_000):
+    """
+    Reads a JSON Lines results file incrementally, yielding one DataFrame per chunk.
+    A truncated last line, left behind by an interrupted run, is skipped.
+    """
+    records = []
+    with open(input_file_path, 'r') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise ValueError(f"Malformed JSON on line {line_number}")
+                print(f"Warning: Skipping truncated last line {line_number}.")
+                continue
+            if len(records) >= chunk_size:
+                yield pd.DataFrame.from_records(records)
+                records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+def read_json_lines(input_file_path, chunk_size=100_000):
+    """Reads a JSON Lines results file, building the DataFrame chunk by chunk."""
+    chunks = list(iter_json_lines(input_file_path, chunk_size))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+def read_json_array(input_file_path):
+    """Reads a JSON array results file; 'timestamp' stays in epoch seconds instead of becoming a datetime."""
+    return pd.read_json(input_file_path, convert_dates=False, keep_default_dates=False)
+
+def read_columnar(input_file_path):
+    """
+    Opens a columnar results file memory-mapped; the numeric columns of the returned
+    DataFrame are views of the file, nothing is parsed or copied.
+    """
+    columns, errors = open_columns(input_file_path)
+    error_codes = columns.pop('error')
+    if errors:
+        # Code -1 (no error) becomes NaN, matching a missing 'error' key in the JSON formats
+        columns['error'] = pd.Categorical.from_codes(error_codes, categories=errors)
+    return pd.DataFrame(columns, copy=False)
+
+def load_results(input_file_path):
+    """Loads a results file written by main.py: a JSON array, JSON Lines or the columnar format."""
+    if is_columnar(input_file_path):
+        return read_columnar(input_file_path)
+    if is_json_lines(input_file_path):
+        return read_json_lines(input_file_path)
+    return read_json_array(input_file_path)
+
+def iter_results(input_file_path, chunk_size):
+    """
+    Yields a results file as DataFrames of at most `chunk_size` rows. Columnar files are
+    sliced from the memory map and JSON Lines files are parsed chunk by chunk; a JSON
+    array cannot be parsed incrementally and is loaded whole first.
+    """
+    if is_columnar(input_file_path):
+        df = read_columnar(input_file_path)
+    elif is_json_lines(input_file_path):
+        yield from iter_json_lines(input_file_path, chunk_size)
+        return
+    else:
+        df = read_json_array(input_file_path)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def success_conditions(df):
+    """Returns the mask of successful requests: an HTTP 2xx/3xx code and no logged error."""
+    # Base conditions for a successful request based on http_code
+    conditions = (
+        df['http_code'].notna() & 
+        (df['http_code'] >= 200) & 
+        (df['http_code'] < 400)
+    )
+    # If the 'error' column exists, a successful request must also have a null value in this column.
+    # If the 'error' column doesn't exist, it implies no errors were logged in this field for any request.
+    if 'error' in df.columns:
+        conditions &= df['error'].isnull()
+    return conditions
+
+def error_conditions(df):
+    """Returns the mask of errors: an http_code outside 200-399 (or NaN), or a logged error."""
+    # Note: http_code should always exist as per main.py logic (value or -1).
+    error_http_conditions = ~(
+        df['http_code'].notna() &
+        (df['http_code'] >= 200) & 
+        (df['http_code'] < 400)
+    )
+    if 'error' in df.columns:
+        # If 'error' column exists, an error is also when df['error'] is not null.
+        return error_http_conditions | df['error'].notna()
+    # If 'error' column doesn't exist, errors are determined solely by http_code.
+    return error_http_conditions
+
+def print_metric_summary(summary, metric_name, unit='ms'):
+    """Prints the statistics of one metric in the report format."""
+    print(f"  {metric_name}:")
+    print(f"    Count:  {summary.count}")
+    print(f"    Mean:   {summary.mean:.3f} {unit}")
+    print(f"    Median: {summary.quantiles[0.50]:.3f} {unit}")
+    print(f"    StdDev: {summary.std:.3f} {unit}")
+    print(f"    Min:    {summary.min:.3f} {unit}")
+    print(f"    Max:    {summary.max:.3f} {unit}")
+    print(f"    P50:    {summary.quantiles[0.50]:.3f} {unit} (Median)")
+    print(f"    P90:    {summary.quantiles[0.90]:.3f} {unit}")
+    print(f"    P95:    {summary.quantiles[0.95]:.3f} {unit}")
+    print(f"    P99:    {summary.quantiles[0.99]:.3f} {unit}")
+
+def print_statistics(series, metric_name, unit='ms'):
+    """Prints common statistics for a pandas Series."""
+    if series.empty or series.isnull().all():
+        print(f"  No valid data for {metric_name} to calculate statistics.")
+        return
+    
+    # Ensure series is numeric and drop NaNs for calculations
+    numeric_series = pd.to_numeric(series, errors='coerce').dropna()
+    if numeric_series.empty:
+        print(f"  No numeric data for {metric_name} after coercion.")
+        return
+
+    # All percentiles are evaluated in a single call
+    quantiles = numeric_series.quantile(QUANTILES)
+    print_metric_summary(MetricSummary(
+        count=numeric_series.count(),
+        mean=numeric_series.mean(),
+        std=numeric_series.std(),
+        min=numeric_series.min(),
+        max=numeric_series.max(),
+        quantiles={q: quantiles[q] for q in QUANTILES},
+    ), metric_name, unit)
+
+def successful_metric_matrix(successful_df, metrics):
+    """
+    Stacks the metrics of a chunk of successful requests into one (rows x metrics)
+    float array; metrics missing from the chunk are NaN.
+    """
+    successful_df = calculate_derived_timings(successful_df.copy())
+    reused = successful_df['connectionReused'].fillna(False).astype(bool) if 'connectionReused' in successful_df.columns else None
+    columns = []
+    for metric in metrics:
+        if metric.startswith('totalTime_ms ('):
+            # Cold/reused groups are totalTime_ms masked to the rows of the group
+            in_group = reused if metric == 'totalTime_ms (reused)' else ~reused if reused is not None else None
+            if in_group is None or 'totalTime_ms' not in successful_df.columns:
+                columns.append(np.full(len(successful_df), np.nan))
+            else:
+                columns.append(pd.to_numeric(successful_df['totalTime_ms'], errors='coerce').where(in_group).to_numpy(dtype=float))
+        elif metric in successful_df.columns:
+            columns.append(pd.to_numeric(successful_df[metric], errors='coerce').to_numpy(dtype=float))
+        else:
+            columns.append(np.full(len(successful_df), np.nan))
+    return np.column_stack(columns) if columns else np.empty((len(successful_df), 0))
+
+def print_value_counts(counts, name):
+    """Prints accumulated counts the way pandas prints value_counts()."""
+    series = pd.Series(list(counts.values()), index=pd.Index(list(counts.keys()), name=name), name='count')
+    print(series.sort_values(ascending=False, kind='stable'))
+
+def print_client_saturation(p99_by_metric, lag_threshold_ms=DEFAULT_LAG_THRESHOLD_MS):
+    """
+    Warns when the client's own lag was high enough to distort the measured latencies.
+    """
+    saturated = {metric_ms: p99 for metric_ms, p99 in p99_by_metric.items() if p99 > lag_threshold_ms}
+    if saturated:
+        print("\n!!! CLIENT SATURATED: reported latencies may include client-side delay !!!")
+        for metric_ms, p99 in saturated.items():
+            print(f"  - {metric_ms} P99 is {p99:.3f}ms (over {lag_threshold_ms:.3f}ms)")
+
+def analyze_in_chunks(input_file_path, chunk_size, lag_threshold_ms=DEFAULT_LAG_THRESHOLD_MS):
+    """
+    Prints the same statistics as the in-memory analysis while only ever holding one
+    chunk of the file: every chunk goes through one vectorized pass over all metrics
+    (ChunkedStatistics), and a second pass resolves the exact percentiles.
+    """
+    group_metrics = ['totalTime_ms (cold)', 'totalTime_ms (reused)']
+    metrics = (BASE_TIME_COLS_MS + SCHEDULE_METRICS_MS + CLIENT_METRICS_MS + DERIVED_METRICS_MS + list(TRANSFER_METRICS)
+               + group_metrics)
+    statistics = ChunkedStatistics(metrics)
+    seen_columns = set()
+    total = successful = reused_count = 0
+    error_total = 0
+    error_counts = {}
+    http_code_counts = {}
+
+    for chunk in iter_results(input_file_path, chunk_size):
+        total += len(chunk)
+        seen_columns.update(chunk.columns)
+        success = success_conditions(chunk)
+        successful_chunk = chunk[success]
+        successful += len(successful_chunk)
+        if 'connectionReused' in successful_chunk.columns:
+            reused_count += int(successful_chunk['connectionReused'].fillna(False).astype(bool).sum())
+        statistics.update(successful_metric_matrix(successful_chunk, metrics))
+
+        error_chunk = chunk[error_conditions(chunk)]
+        error_total += len(error_chunk)
+        if 'error' in error_chunk.columns:
+            for key, count in error_chunk['error'].dropna().value_counts().items():
+                error_counts[key] = error_counts.get(key, 0) + count
+        for key, count in error_chunk['http_code'].value_counts().items():
+            http_code_counts[key] = http_code_counts.get(key, 0) + count
+
+    if total == 0:
+        print("The input file was empty or contained no data. Exiting.")
+        sys.exit(0)
+    print(f"Data analyzed in chunks of {chunk_size} rows from '{input_file_path}'.")
+
+    statistics.plan()
+    if successful:
+        for chunk in iter_results(input_file_path, chunk_size):
+            statistics.refine(successful_metric_matrix(chunk[success_conditions(chunk)], metrics))
+    summaries = statistics.summaries()
+
+    def print_metric(metric_ms):
+        if metric_ms in summaries:
+            print_metric_summary(summaries[metric_ms], metric_ms)
+        else:
+            print(f"  No valid data for {metric_ms} to calculate statistics.")
+
+    print("\n--- Analysis of Successful Requests (HTTP 2xx/3xx) ---")
+    if not successful:
+        print("No successful requests found in the data for detailed statistical analysis.")
+    else:
+        print(f"\nFound {successful} successful requests out of {total} total entries.")
+        for col_ms in BASE_TIME_COLS_MS:
+            if col_ms not in seen_columns and col_ms not in OPTIONAL_TIME_COLS_MS:
+                print(f"Warning: Column {col_ms} not found in successful_df.")
+        derived_columns = set(calculate_derived_timings(pd.DataFrame(columns=sorted(seen_columns), dtype=float)).columns)
+
+        print("\n--- Statistics for Successful Requests (Times in Milliseconds) ---")
+        for metric_ms in BASE_TIME_COLS_MS + SCHEDULE_METRICS_MS:
+            if metric_ms in seen_columns:
+                print_metric(metric_ms)
+        for metric_ms in DERIVED_METRICS_MS:
+            if metric_ms in derived_columns:
+                print_metric(metric_ms)
+            else:
+                print(f"  Metric {metric_ms} not calculated or not available.")
+
+        transfer_metrics = [metric for metric in TRANSFER_METRICS if metric in summaries]
+        if transfer_metrics:
+            print("\n--- Response Size and Download Throughput ---")
+            for metric in transfer_metrics:
+                print_metric_summary(summaries[metric], metric, TRANSFER_METRICS[metric])
+
+        if 'connectionReused' in seen_columns:
+            print("\n--- Cold vs Reused Connections (Times in Milliseconds) ---")
+            print(f"  Cold probes:   {successful - reused_count}")
+            print(f"  Reused probes: {reused_count}")
+            for metric_ms in group_metrics:
+                if metric_ms in summaries:
+                    print_metric_summary(summaries[metric_ms], metric_ms)
+
+        client_metrics = [metric_ms for metric_ms in CLIENT_METRICS_MS if metric_ms in summaries]
+        if client_metrics:
+            print("\n--- Client-Side Lag (Times in Milliseconds) ---")
+            for metric_ms in client_metrics:
+                print_metric_summary(summaries[metric_ms], metric_ms)
+            print_client_saturation({metric_ms: summaries[metric_ms].quantiles[0.99] for metric_ms in client_metrics},
+                                    lag_threshold_ms)
+
+    print("\n--- Analysis of Errors ---")
+    if not error_total:
+        print("No errors found in the data.")
+    else:
+        print(f"\nFound {error_total} entries with errors or non-successful HTTP codes.")
+        print("\nError Summary:")
+        if error_counts:
+            print_value_counts(error_counts, 'error')
+        print("\nHTTP Code Counts for Errors/Non-Successful:")
+        print_value_counts(http_code_counts, 'http_code')
+
+    print("\nAnalysis complete.")
+
+def analyze_in_memory(input_file_path, lag_threshold_ms=DEFAULT_LAG_THRESHOLD_MS):
+    """
+    Loads the whole results file into a DataFrame and prints the full analysis,
+    including the DataFrame previews.
+    """
+    try:
+        # Load the JSON data directly into a DataFrame
+        df = load_results(input_file_path)
+        print(f"Data loaded successfully from '{input_file_path}'.")
+    except FileNotFoundError:
+        print(f"Error: Input file '{input_file_path}' not found.")
+        sys.exit(1)
+    except ValueError as e:
+        # This can happen if JSON is malformed or empty
+        print(f"Error reading JSON file '{input_file_path}': {e}")
+        print("The file might be empty or not a valid JSON array of objects.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An unexpected error occurred while reading '{input_file_path}': {e}")
+        sys.exit(1)
+
+    if df.empty:
+        print("The JSON file was empty or contained no data. Exiting.")
+        sys.exit(0)
+
+    print("\n--- DataFrame Info ---")
+    df.info(verbose=True, show_counts=True)
+
+    print("\n--- Initial Data Head ---")
+    print(df.head())
+
+    # --- Analysis of Successful Requests ---
+    print("\n--- Analysis of Successful Requests (HTTP 2xx/3xx) ---")
+    successful_df = df[success_conditions(df)].copy() # Use .copy() to avoid SettingWithCopyWarning
+
+    if successful_df.empty:
+        print("No successful requests found in the data for detailed statistical analysis.")
+    else:
+        print(f"\nFound {len(successful_df)} successful requests out of {len(df)} total entries.")
+
+        # Ensure all expected base time columns exist, if not, print a warning (they should exist if main.py ran correctly)
+        for col_ms in BASE_TIME_COLS_MS:
+            if col_ms not in successful_df.columns and col_ms not in OPTIONAL_TIME_COLS_MS:
+                print(f"Warning: Column {col_ms} not found in successful_df.")
+
+        # Calculate derived timing metrics
+        successful_df = calculate_derived_timings(successful_df)
+
+        print("\n--- Statistics for Successful Requests (Times in Milliseconds) ---")
+        
+        # Print stats for base timings in milliseconds
+        for metric_ms in BASE_TIME_COLS_MS:
+            if metric_ms in successful_df.columns:
+                print_statistics(successful_df[metric_ms], metric_ms)
+        
+        for metric_ms in SCHEDULE_METRICS_MS:
+            if metric_ms in successful_df.columns:
+                print_statistics(successful_df[metric_ms], metric_ms)
+
+        # Print stats for derived timings in milliseconds
+        for metric_ms in DERIVED_METRICS_MS:
+            if metric_ms in successful_df.columns:
+                print_statistics(successful_df[metric_ms], metric_ms)
+            else:
+                print(f"  Metric {metric_ms} not calculated or not available.")
+
+        transfer_metrics = [metric for metric in TRANSFER_METRICS if metric in successful_df.columns]
+        if transfer_metrics:
+            print("\n--- Response Size and Download Throughput ---")
+            for metric in transfer_metrics:
+                print_statistics(successful_df[metric], metric, TRANSFER_METRICS[metric])
+
+        if 'connectionReused' in successful_df.columns:
+            print("\n--- Cold vs Reused Connections (Times in Milliseconds) ---")
+            reused = successful_df['connectionReused'].fillna(False).astype(bool)
+            print(f"  Cold probes:   {(~reused).sum()}")
+            print(f"  Reused probes: {reused.sum()}")
+            for label, group_df in (("cold", successful_df[~reused]), ("reused", successful_df[reused])):
+                if not group_df.empty:
+                    print_statistics(group_df['totalTime_ms'], f"totalTime_ms ({label})")
+
+        client_metrics = [metric_ms for metric_ms in CLIENT_METRICS_MS if metric_ms in successful_df.columns]
+        if client_metrics:
+            print("\n--- Client-Side Lag (Times in Milliseconds) ---")
+            for metric_ms in client_metrics:
+                print_statistics(successful_df[metric_ms], metric_ms)
+            print_client_saturation({metric_ms: successful_df[metric_ms].quantile(0.99) for metric_ms in client_metrics},
+                                    lag_threshold_ms)
+
+        print("\n--- Successful Requests DataFrame Head (with calculated milliseconds) ---")
+        display_cols = BASE_TIME_COLS_MS + SCHEDULE_METRICS_MS + DERIVED_METRICS_MS
+        # Filter display_cols to only those present in successful_df to avoid KeyError
+        display_cols = [col for col in display_cols if col in successful_df.columns]
+        print(successful_df[display_cols].head())
+
+
+    # --- Analysis of Errors ---
+    print("\n--- Analysis of Errors ---")
+    # An error is an http_code outside the 200-399 range (or NaN), or a logged error message.
+    error_df = df[error_conditions(df)].copy()
+
+    if error_df.empty:
+        print("No errors found in the data.")
+    else:
+        print(f"\nFound {len(error_df)} entries with errors or non-successful HTTP codes.")
+        print("\nError Summary:")
+        if 'error' in error_df.columns and not error_df['error'].dropna().empty:
+            print(error_df['error'].value_counts())
+        if 'http_code' in error_df.columns:
+            print("\nHTTP Code Counts for Errors/Non-Successful:")
+            print(error_df['http_code'].value_counts())
+        
+        print("\n--- Error DataFrame Head ---")
+        print(error_df.head())
+
+    print("\nAnalysis complete.")
+
+def load_window_columns(input_file_path, chunk_size=100_000):
+    """
+    Reads only what the time-window analysis needs: the probe timestamps, the success
+    mask and the phase durations. Columnar files are read from the memory map,
+    other formats chunk by chunk, so no DataFrame of the whole run is built.
+    """
+    if is_columnar(input_file_path):
+        columns, _ = open_columns(input_file_path)
+        if 'timestamp' not in columns:
+            raise ValueError("the file has no 'timestamp' column; record the run again with this version of slatency")
+        codes = columns['http_code']
+        success = (columns['error'] < 0) & (codes >= 200) & (codes < 400)
+        return np.asarray(columns['timestamp'], dtype=float), success, phase_arrays(columns)
+
+    timestamps, successes, phases = [], [], {phase: [] for phase in PHASES}
+    for chunk in iter_results(input_file_path, chunk_size):
+        if 'timestamp' not in chunk.columns:
+            raise ValueError("the results have no 'timestamp' field; record the run again with this version of slatency")
+        timestamps.append(pd.to_numeric(chunk['timestamp'], errors='coerce').to_numpy(dtype=float))
+        successes.append(success_conditions(chunk).to_numpy(dtype=bool))
+        columns = {name: pd.to_numeric(chunk[name], errors='coerce').to_numpy(dtype=float) if name in chunk.columns
+                   else np.full(len(chunk), np.nan) for name in BASE_TIME_COLS_MS}
+        for phase, values in phase_arrays(columns).items():
+            phases[phase].append(values)
+    if not timestamps:
+        return np.empty(0), np.empty(0, dtype=bool), {phase: np.empty(0) for phase in PHASES}
+    return (np.concatenate(timestamps), np.concatenate(successes),
+            {phase: np.concatenate(values) for phase, values in phases.items()})
+
+def format_offset(seconds, window_seconds):
+    """Formats an offset from the start of the run as +H:MM:SS, with milliseconds for sub-second windows."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if window_seconds < 1:
+        return f"+{int(hours)}:{int(minutes):02d}:{seconds:06.3f}"
+    return f"+{int(hours)}:{int(minutes):02d}:{int(round(seconds)):02d}"
+
+def format_deviations(deviations):
+    """Describes the deviations of one window, the percentiles of a phase on one line."""
+    notes, phases = [], {}
+    for deviation in deviations:
+        if deviation.metric == 'error rate':
+            notes.append(f"error rate {100 * deviation.value:.1f}% (run {100 * deviation.baseline:.1f}%)")
+        elif deviation.metric == 'throughput':
+            notes.append(f"throughput {deviation.value:.1f}/s (baseline {deviation.baseline:.1f}/s)")
+        else:
+            phase, quantile = deviation.metric.split(' ')
+            phases.setdefault(phase, []).append((quantile, deviation))
+    for phase, flagged in phases.items():
+        quantiles = "/".join(quantile for quantile, _ in flagged)
+        values = "/".join(f"{deviation.value:.3f}" for _, deviation in flagged)
+        baselines = "/".join(f"{deviation.baseline:.3f}" for _, deviation in flagged)
+        notes.append(f"{phase} {quantiles} {values}ms (baseline {baselines}ms)")
+    return "; ".join(notes)
+
+def print_time_windows(windows, deviations):
+    """Prints the per-window table of one window length, and the windows that deviate."""
+    total_quantiles = windows.percentiles['total']
+    flagged = {}
+    for deviation in deviations:
+        flagged.setdefault(deviation.window, []).append(deviation)
+    label = f"{windows.window_seconds:g}s"
+    print(f"\n--- Time Windows of {label} ({len(windows)} windows, {len(flagged)} flagged) ---")
+    print(f"Run started at {pd.Timestamp(windows.start, unit='s'):%Y-%m-%d %H:%M:%S.%f} UTC.")
+    rows = range(len(windows)) if len(windows) <= MAX_WINDOW_ROWS else sorted(flagged)
+    if len(windows) > MAX_WINDOW_ROWS:
+        print(f"Only the flagged windows are listed; use --windows-csv for all {len(windows)}.")
+    quantile_labels = [f"P{round(q * 100)}" for q in WINDOW_QUANTILES]
+    print(f"{'Offset':<14} {'Requests':>9} {'Req/s':>9} {'Errors':>7} "
+          + " ".join(f"{'Total ' + q:>10}" for q in quantile_labels) + "  Deviations")
+    partial = windows.partial
+    for window in rows:
+        offset = format_offset(window * windows.window_seconds, windows.window_seconds) + ("*" if partial[window] else "")
+        error_rate = windows.error_rate[window]
+        errors = f"{100 * error_rate:.1f}%" if not np.isnan(error_rate) else "-"
+        quantiles = " ".join(f"{value:>10.3f}" if not np.isnan(value) else f"{'-':>10}"
+                             for value in total_quantiles[window])
+        notes = format_deviations(flagged.get(window, []))
+        print(f"{offset:<14} {windows.counts[window]:>9} {windows.throughput[window]:>9.1f} {errors:>7} {quantiles}"
+              + (f"  {notes}" if notes else ""))
+    if partial.any():
+        print("* The last window is cut short by the end of the run and is not judged for throughput or latency.")
+
+def windows_frame(windows):
+    """All statistics of one window length as a DataFrame, one row per window."""
+    frame = pd.DataFrame({
+        'window_s': windows.window_seconds,
+        'start': windows.start + np.arange(len(windows)) * windows.window_seconds,
+        'offset_s': np.arange(len(windows)) * windows.window_seconds,
+        'requests': windows.counts,
+        'failures': windows.failures,
+        'throughput': windows.throughput,
+        'error_rate': windows.error_rate,
+        'partial': windows.partial,
+    })
+    for phase, values in windows.percentiles.items():
+        for column, q in enumerate(WINDOW_QUANTILES):
+            frame[f"{phase}_p{round(q * 100)}_ms"] = values[:, column]
+    return frame
+
+def analyze_time_windows(input_file_path, window_lengths, chunk_size=100_000, threshold=3.5, csv_path=None):
+    """
+    Splits the run into consecutive windows of each length and prints the throughput,
+    error rate and latency percentiles of every window, flagging the windows that
+    deviate from the rest of the run (see `find_deviations`).
+    """
+    timestamps, success, phases = load_window_columns(input_file_path, chunk_size)
+    if not len(timestamps):
+        print("The input file was empty or contained no data. Exiting.")
+        sys.exit(0)
+    print(f"Time-window analysis of {len(timestamps)} probes from '{input_file_path}'.")
+    frames = []
+    for window_seconds in window_lengths:
+        windows = compute_windows(timestamps, success, phases, window_seconds)
+        print_time_windows(windows, find_deviations(windows, threshold=threshold))
+        if csv_path is not None:
+            frames.append(windows_frame(windows))
+    if csv_path is not None:
+        pd.concat(frames, ignore_index=True).to_csv(csv_path, index=False, float_format='%.6f')
+        print(f"\nWindow statistics saved to {csv_path}")
+    print("\nAnalysis complete.")
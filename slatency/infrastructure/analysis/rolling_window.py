@@ -0,0 +1,87 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+from slatency.infrastructure.analysis.log_histogram import LogHistogram
+
+
+@dataclass(frozen=True)
+class WindowSnapshot:
+    """
+    What happened during the last `seconds` of a run.
+    """
+    seconds: float
+    successes: int
+    failures: int
+    histograms: Dict[str, LogHistogram]
+
+    @property
+    def throughput(self) -> float:
+        return (self.successes + self.failures) / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        total = self.successes + self.failures
+        return self.failures / total if total else 0.0
+
+
+class RollingWindow:
+    """
+    Sliding-window latency statistics in constant memory: the window is a ring of
+    `slots` time slots, each with its own LogHistogram per metric and its success and
+    failure counts. Recording touches one slot; a snapshot merges the live slots.
+    """
+    def __init__(self, metrics: Sequence[str], window_seconds: float = 10.0, slots: int = 10,
+                 relative_accuracy: float = 0.01):
+        self.metrics = list(metrics)
+        self.slot_seconds = window_seconds / slots
+        self.relative_accuracy = relative_accuracy
+        self._slot_ids: List[int] = [-1] * slots
+        self._successes: List[int] = [0] * slots
+        self._failures: List[int] = [0] * slots
+        self._histograms: List[Dict[str, LogHistogram]] = [self._new_histograms() for _ in range(slots)]
+
+    def record(self, now: float, values: Dict[str, float]) -> None:
+        """
+        Records a successful probe finished at `now` (seconds) with its metric values (ms).
+        """
+        slot = self._slot(now)
+        self._successes[slot] += 1
+        histograms = self._histograms[slot]
+        for metric, value in values.items():
+            histograms[metric].record(value)
+
+    def record_failure(self, now: float) -> None:
+        self._failures[self._slot(now)] += 1
+
+    def snapshot(self, now: float, elapsed: float) -> WindowSnapshot:
+        """
+        Merges the slots still inside the window; `elapsed` caps the window length at
+        the start of a run.
+        """
+        current = math.floor(now / self.slot_seconds)
+        oldest = current - len(self._slot_ids) + 1
+        merged = self._new_histograms()
+        successes = failures = 0
+        for slot, slot_id in enumerate(self._slot_ids):
+            if slot_id < oldest:
+                continue
+            successes += self._successes[slot]
+            failures += self._failures[slot]
+            for metric, histogram in self._histograms[slot].items():
+                merged[metric].merge(histogram)
+        seconds = min(elapsed, len(self._slot_ids) * self.slot_seconds)
+        return WindowSnapshot(seconds=seconds, successes=successes, failures=failures, histograms=merged)
+
+    def _slot(self, now: float) -> int:
+        slot_id = math.floor(now / self.slot_seconds)
+        slot = slot_id % len(self._slot_ids)
+        if self._slot_ids[slot] != slot_id:
+            self._slot_ids[slot] = slot_id
+            self._successes[slot] = 0
+            self._failures[slot] = 0
+            self._histograms[slot] = self._new_histograms()
+        return slot
+
+    def _new_histograms(self) -> Dict[str, LogHistogram]:
+        return {metric: LogHistogram(self.relative_accuracy) for metric in self.metrics}
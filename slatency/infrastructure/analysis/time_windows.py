@@ -0,0 +1,186 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from slatency.infrastructure.analysis.phases import PHASES
+
+WINDOW_QUANTILES = [0.50, 0.95, 0.99]
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+# Scales the median absolute deviation (and the mean absolute deviation) to a
+# standard deviation for normally distributed data
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 0.7979
+MAX_WINDOWS = 10_000_000
+
+
+def parse_duration(text: str) -> float:
+    """
+    Parses a window length such as '500ms', '1s', '10s', '1m' or '1h' (a bare number
+    is in seconds) and returns it in seconds.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*", text)
+    if match is None or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid window length '{text}', expected e.g. 1s, 10s or 1m")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+
+
+@dataclass
+class TimeWindows:
+    """
+    Per-window statistics of a run split into consecutive windows of `window_seconds`,
+    the first one starting with the first probe. Windows without any probe are kept,
+    a stall shows up as a window with zero throughput. The last window is cut short
+    by the end of the run and is marked `partial`.
+
+    `percentiles[phase]` holds one row per window and one column per WINDOW_QUANTILES
+    entry, computed over the successful probes started in the window (NaN if none).
+    """
+    window_seconds: float
+    start: float
+    counts: np.ndarray
+    failures: np.ndarray
+    successes: np.ndarray
+    percentiles: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def throughput(self) -> np.ndarray:
+        return self.counts / self.window_seconds
+
+    @property
+    def error_rate(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.counts > 0, self.failures / self.counts, np.nan)
+
+    @property
+    def partial(self) -> np.ndarray:
+        partial = np.zeros(len(self), dtype=bool)
+        if len(self) > 1:
+            partial[-1] = True
+        return partial
+
+
+@dataclass(frozen=True)
+class Deviation:
+    """
+    A window whose `metric` (e.g. 'throughput', 'error rate' or 'tls p99') deviates
+    from the `baseline` of the run by `score` robust standard deviations.
+    """
+    window: int
+    metric: str
+    value: float
+    baseline: float
+    score: float
+
+
+def compute_windows(timestamps: np.ndarray, success: np.ndarray, phases: Mapping[str, np.ndarray],
+                    window_seconds: float, quantiles: Sequence[float] = WINDOW_QUANTILES) -> TimeWindows:
+    """
+    Buckets the probes by start time and computes every window's counts and per-phase
+    percentiles in a few vectorized passes, without a Python loop over windows.
+    Probes without a timestamp are ignored.
+    """
+    known = ~np.isnan(timestamps)
+    timestamps, success = timestamps[known], success[known]
+    if not len(timestamps):
+        raise ValueError("No probe has a timestamp; record the run again with this version of slatency")
+    start = float(timestamps.min())
+    if (timestamps.max() - start) / window_seconds >= MAX_WINDOWS:
+        raise ValueError(f"A window of {window_seconds:g}s splits the run into more than {MAX_WINDOWS} windows")
+    windows = ((timestamps - start) // window_seconds).astype(np.int64)
+    size = int(windows.max()) + 1
+    counts = np.bincount(windows, minlength=size)
+    successes = np.bincount(windows[success], minlength=size)
+    percentiles = {
+        phase: grouped_percentiles(windows[success], values[known][success], size, quantiles)
+        for phase, values in phases.items()
+    }
+    return TimeWindows(window_seconds=window_seconds, start=start, counts=counts, failures=counts - successes,
+                       successes=successes, percentiles=percentiles)
+
+
+def grouped_percentiles(groups: np.ndarray, values: np.ndarray, size: int, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Percentiles of `values` per group (0 .. size-1), with pandas' linear interpolation.
+    One sort by (group, value) lines every group up as a sorted run, so each percentile
+    is a vectorized gather at the run's offsets.
+    """
+    valid = ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=size)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    result = np.full((size, len(quantiles)), np.nan)
+    filled = counts > 0
+    first, count = offsets[filled], counts[filled]
+    for column, q in enumerate(quantiles):
+        position = first + q * (count - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, first + count - 1)
+        result[filled, column] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+    return result
+
+
+def find_deviations(windows: TimeWindows, threshold: float = 3.5, min_change: float = 0.2,
+                    min_samples: int = 20, quantiles: Sequence[float] = WINDOW_QUANTILES) -> List[Deviation]:
+    """
+    Flags the windows that deviate significantly from the rest of the run.
+
+    The baseline of throughput and of every phase percentile is the median over the
+    complete windows, and a window is flagged when its robust z-score (distance to the
+    median in units of the scaled median absolute deviation) exceeds `threshold` and
+    the value differs from the median by more than `min_change` (relative), so steady
+    runs with almost no spread are not flagged for noise. Percentiles of windows with
+    fewer than `min_samples` successful probes are not judged. The error rate is
+    flagged when it is significantly above the run's overall error rate (one-sided
+    binomial z-test).
+    """
+    deviations: List[Deviation] = []
+    complete = ~windows.partial
+    deviations += _robust_deviations("throughput", windows.throughput, complete, threshold, min_change)
+    for phase in PHASES:
+        if phase not in windows.percentiles:
+            continue
+        judged = complete & (windows.successes >= min_samples)
+        for column, q in enumerate(quantiles):
+            metric = f"{phase} p{round(q * 100)}"
+            deviations += _robust_deviations(metric, windows.percentiles[phase][:, column], judged, threshold,
+                                             min_change)
+
+    total = int(windows.counts.sum())
+    baseline = windows.failures.sum() / total
+    # A run without failures still flags a window with a burst of them
+    variance = max(baseline * (1 - baseline), 1.0 / total)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = (windows.error_rate - baseline) / np.sqrt(variance / windows.counts)
+    flagged = (windows.counts > 0) & (scores > threshold) & (windows.error_rate - baseline > min_change * baseline)
+    for window in np.flatnonzero(flagged):
+        deviations.append(Deviation(window=int(window), metric="error rate", value=float(windows.error_rate[window]),
+                                    baseline=float(baseline), score=float(scores[window])))
+    deviations.sort(key=lambda deviation: deviation.window)
+    return deviations
+
+
+def _robust_deviations(metric: str, values: np.ndarray, judged: np.ndarray, threshold: float,
+                       min_change: float) -> List[Deviation]:
+    sample = values[judged & ~np.isnan(values)]
+    if len(sample) < 3:
+        return []
+    median = float(np.median(sample))
+    spread = float(np.median(np.abs(sample - median))) / MAD_SCALE
+    if spread == 0:
+        # More than half the windows agree exactly, fall back to the mean absolute deviation
+        spread = float(np.mean(np.abs(sample - median))) / MEAN_AD_SCALE
+    if spread == 0:
+        return []
+    with np.errstate(invalid="ignore"):
+        scores = (values - median) / spread
+        flagged = judged & (np.abs(scores) > threshold) & (np.abs(values - median) > min_change * abs(median))
+    return [Deviation(window=int(window), metric=metric, value=float(values[window]), baseline=median,
+                      score=float(scores[window]))
+            for window in np.flatnonzero(flagged)]
@@ -0,0 +1,107 @@
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+class TargetServer(ThreadingHTTPServer):
+    """
+    A local stand-in for the service under test, used to benchmark slatency itself.
+
+    Every GET/HEAD/POST is answered after `delay_ms` with a body of `body_size` bytes
+    over keep-alive HTTP/1.1; `error_rate` is the fraction of requests answered with
+    a 500 instead. The query parameters `delay`, `size`, `error_rate` and `status`
+    override these per request. With `tls` set the server speaks HTTPS with a
+    throwaway self-signed certificate for 127.0.0.1/localhost, whose path is
+    `certificate` so clients can trust it.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay_ms: float = 0.0, body_size: int = 0,
+                 error_rate: float = 0.0, tls: bool = False):
+        self.delay_ms = delay_ms
+        self.body_size = body_size
+        self.error_rate = error_rate
+        self.certificate: Optional[str] = None
+        super().__init__((host, port), _TargetHandler)
+        if tls:
+            self.certificate, key = create_self_signed_certificate()
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.certificate, key)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.certificate:
+            shutil.rmtree(os.path.dirname(self.certificate), ignore_errors=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    @property
+    def url(self) -> str:
+        host, port = self.address
+        return f"{'https' if self.certificate else 'http'}://{host}:{port}/"
+
+
+class _TargetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; Nagle would hold the body back until
+    # the client's delayed ACK and add ~40ms to every response
+    disable_nagle_algorithm = True
+    server: TargetServer
+
+    def do_GET(self) -> None:
+        self._answer(send_body=True)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        self._answer(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._answer(send_body=False)
+
+    def _answer(self, send_body: bool) -> None:
+        query = dict(parse_qsl(urlsplit(self.path).query))
+        delay_ms = float(query.get("delay", self.server.delay_ms))
+        body_size = int(query.get("size", self.server.body_size))
+        error_rate = float(query.get("error_rate", self.server.error_rate))
+        status = int(query.get("status", 500 if random.random() < error_rate else 200))
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        self.send_response(status)
+        self.send_header("Content-Length", str(body_size))
+        self.end_headers()
+        if send_body and body_size:
+            self.wfile.write(b"x" * body_size)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def create_self_signed_certificate() -> Tuple[str, str]:
+    """
+    Creates a self-signed certificate and key for 127.0.0.1 and localhost with the
+    openssl command line tool, returning their paths.
+    """
+    directory = tempfile.mkdtemp(prefix="slatency-target-")
+    certificate = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", certificate, "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    return certificate, key
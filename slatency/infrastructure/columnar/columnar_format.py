@@ -0,0 +1,85 @@
+import json
+import struct
+from typing import Any, Dict, List, Tuple
+
+# File layout, all integers little-endian:
+#   header   MAGIC, then capacity, rows, trailer_offset and trailer_length as uint64, padded to HEADER_SIZE
+#   columns  one fixed-width block of `capacity` values per column, each block aligned to COLUMN_ALIGNMENT
+#   trailer  JSON with the column names/dtypes and the error dictionary
+# Only the first `rows` values of every column are meaningful, which lets a run be
+# written in place and read back memory-mapped without any parsing.
+# numpy is only imported by the functions that lay out or map columns, so checking
+# for a columnar file stays cheap for the numpy-free report of JSON files.
+MAGIC = b"SLATCOL1"
+HEADER_FORMAT = "<8sQQQQ"
+HEADER_SIZE = 64
+COLUMN_ALIGNMENT = 8
+
+TIMING_COLUMNS = ["queueTime_ms", "namelookupTime_ms", "connectTime_ms", "appconnectTime_ms",
+                  "pretransferTime_ms", "startTransferTime_ms", "totalTime_ms"]
+SCHEDULE_COLUMNS = ["queueingDelay_ms", "totalTimeFromIntended_ms"]
+# Body checksums and heads are text, only the size and speed are kept in columns
+BODY_COLUMNS = ["downloadSize_bytes", "downloadSpeed_Bps"]
+# Code stored in the error column for results without an error
+NO_ERROR = -1
+
+
+def column_layout(include_schedule: bool = False, include_body: bool = False) -> List[Tuple[str, str]]:
+    """
+    Returns the (name, numpy dtype) pairs of a columnar file, widest dtypes first.
+    """
+    columns = [("timestamp", "<f8")] + [(name, "<f8") for name in TIMING_COLUMNS]
+    if include_schedule:
+        columns += [(name, "<f8") for name in SCHEDULE_COLUMNS]
+    if include_body:
+        columns += [(name, "<f8") for name in BODY_COLUMNS]
+    columns += [("http_code", "<i4"), ("error", "<i4"), ("connectionReused", "|i1")]
+    return columns
+
+
+def column_offsets(columns: List[Tuple[str, str]], capacity: int) -> Tuple[Dict[str, int], int]:
+    """
+    Returns the byte offset of every column block and the offset right after the last one.
+    """
+    import numpy as np
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, dtype in columns:
+        offsets[name] = offset
+        offset += capacity * np.dtype(dtype).itemsize
+        offset += -offset % COLUMN_ALIGNMENT
+    return offsets, offset
+
+
+def pack_header(capacity: int, rows: int, trailer_offset: int, trailer_length: int) -> bytes:
+    return struct.pack(HEADER_FORMAT, MAGIC, capacity, rows, trailer_offset, trailer_length).ljust(HEADER_SIZE, b"\0")
+
+
+def pack_trailer(columns: List[Tuple[str, str]], errors: List[str]) -> bytes:
+    return json.dumps({"columns": columns, "errors": errors}, separators=(",", ":")).encode("utf-8")
+
+
+def is_columnar(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def open_columns(path: str) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Memory-maps a columnar results file and returns zero-copy views of its columns,
+    truncated to the rows written so far, together with the error dictionary.
+    """
+    import numpy as np
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, capacity, rows, trailer_offset, trailer_length = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError(f"'{path}' is not a slatency columnar file")
+    trailer = json.loads(bytes(data[trailer_offset:trailer_offset + trailer_length]))
+    columns = [(name, dtype) for name, dtype in trailer["columns"]]
+    offsets, _ = column_offsets(columns, capacity)
+    views = {}
+    for name, dtype in columns:
+        itemsize = np.dtype(dtype).itemsize
+        start = offsets[name]
+        views[name] = data[start:start + rows * itemsize].view(dtype)
+    return views, trailer["errors"]
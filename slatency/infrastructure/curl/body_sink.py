@@ -0,0 +1,64 @@
+import hashlib
+from typing import Optional, Tuple
+
+import pycurl
+
+from slatency.domain.value_objects.body_policy import BodyPolicy
+
+
+class BodySink:
+    """
+    Receives the response body of one handle chunk by chunk, as libcurl delivers it,
+    and keeps only what the BodyPolicy asks for: nothing, a running SHA-256, or the
+    first bytes. With 'hash' the handle writes straight into the hash object, so no
+    Python code runs per chunk beyond the digest update.
+
+    `take` returns what the last transfer left and re-arms the sink, so warm handles
+    can be reused for the next probe.
+    """
+    def __init__(self, handle: pycurl.Curl, policy: BodyPolicy):
+        self.handle = handle
+        self.policy = policy
+        self._hash = None
+        self._head = bytearray()
+        self._arm()
+
+    def take(self, keep_head: bool) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Returns the checksum and, if `keep_head`, the first bytes of the last body.
+        """
+        checksum = self._hash.hexdigest() if self._hash is not None else None
+        head = bytes(self._head) if keep_head and self._head else None
+        self._arm()
+        return checksum, head
+
+    def _arm(self) -> None:
+        if self.policy.mode == "hash":
+            self._hash = hashlib.sha256()
+            self.handle.setopt(pycurl.WRITEFUNCTION, self._hash.update)
+        elif self.policy.mode == "keep":
+            self._head = bytearray()
+            self.handle.setopt(pycurl.WRITEFUNCTION, self._keep)
+        else:
+            self.handle.setopt(pycurl.WRITEFUNCTION, discard_body)
+
+    def _keep(self, chunk: bytes) -> None:
+        room = self.policy.keep_bytes - len(self._head)
+        if room > 0:
+            self._head += chunk[:room]
+
+
+def attach_body_sink(handle: pycurl.Curl, policy: BodyPolicy) -> None:
+    """
+    Points the handle's WRITEFUNCTION at what the policy needs. Handles that record
+    their body carry their BodySink as `handle.body_sink`, read by `read_body`.
+    """
+    if policy.records_body:
+        handle.body_sink = BodySink(handle, policy)
+    else:
+        handle.body_sink = None
+        handle.setopt(pycurl.WRITEFUNCTION, discard_body)
+
+
+def discard_body(chunk: bytes) -> None:
+    return None
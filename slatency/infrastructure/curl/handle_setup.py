@@ -0,0 +1,121 @@
+from functools import lru_cache
+from typing import Optional
+
+import pycurl
+
+from slatency.domain.entities.request import Request
+from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.http_version import HTTPVersion
+from slatency.infrastructure.curl.body_sink import attach_body_sink
+
+CURL_HTTP_VERSIONS = {
+    HTTPVersion.HTTP_1_1: pycurl.CURL_HTTP_VERSION_1_1,
+    HTTPVersion.HTTP_2: pycurl.CURL_HTTP_VERSION_2TLS,
+    HTTPVersion.HTTP_2_PRIOR_KNOWLEDGE: pycurl.CURL_HTTP_VERSION_2_PRIOR_KNOWLEDGE,
+}
+
+
+@lru_cache(maxsize=None)
+def default_ca_info() -> str:
+    """
+    Returns certifi's CA bundle path. certifi is imported and queried once per
+    process, not once per handle.
+    """
+    import certifi
+    return certifi.where()
+
+
+def configure_handle(handle: pycurl.Curl, request: Request, ca_info: Optional[str] = None) -> None:
+    """
+    Applies the options described by a Request to a pycurl handle. The response
+    body is never buffered, the Request's BodyPolicy says what is kept of it.
+    """
+    handle.setopt(pycurl.URL, request.url.to_string())
+    attach_body_sink(handle, request.body_policy)
+    if ca_info is not None:
+        handle.setopt(pycurl.CAINFO, ca_info)
+
+    if request.connect_timeout is not None:
+        handle.setopt(pycurl.CONNECTTIMEOUT, request.connect_timeout)
+    handle.setopt(pycurl.TIMEOUT, request.timeout)
+
+    if request.method is HTTPMethod.HEAD:
+        handle.setopt(pycurl.NOBODY, True)
+    elif request.method is not HTTPMethod.GET:
+        handle.setopt(pycurl.CUSTOMREQUEST, request.method.value)
+    if request.body is not None:
+        handle.setopt(pycurl.POSTFIELDS, request.body)
+    if request.headers:
+        handle.setopt(pycurl.HTTPHEADER, [f"{name}: {value}" for name, value in request.headers.items()])
+    if request.resolve:
+        handle.setopt(pycurl.RESOLVE, list(request.resolve))
+    if request.http_version is not None:
+        handle.setopt(pycurl.HTTP_VERSION, CURL_HTTP_VERSIONS[request.http_version])
+
+
+def create_handle(request: Request, ca_info: Optional[str] = None,
+                  share: Optional[pycurl.CurlShare] = None, multiplexed: bool = False) -> pycurl.Curl:
+    """
+    Returns a handle configured for the Request: multiplexed over the connections of
+    its CurlMulti, warm when a share object is given, cold otherwise.
+    """
+    handle = pycurl.Curl()
+    configure_handle(handle, request, ca_info)
+    if multiplexed:
+        configure_multiplexed_handle(handle)
+    elif share is not None:
+        configure_warm_handle(handle, share)
+    else:
+        configure_cold_handle(handle)
+    return handle
+
+
+def create_share() -> pycurl.CurlShare:
+    """
+    Returns a share object holding the DNS cache, TLS sessions and connection pool of warm handles.
+    """
+    share = pycurl.CurlShare()
+    share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+    share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+    share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+    return share
+
+
+def configure_cold_handle(handle: pycurl.Curl) -> None:
+    """
+    Makes the handle pay for DNS, TCP and TLS on every transfer, even when the
+    CurlMulti driving it still holds a cached connection or DNS entry.
+    """
+    handle.setopt(pycurl.FRESH_CONNECT, True)
+    handle.setopt(pycurl.FORBID_REUSE, True)
+    handle.setopt(pycurl.DNS_CACHE_TIMEOUT, 0)
+    handle.setopt(pycurl.SSL_SESSIONID_CACHE, False)
+
+
+def configure_multiplexed_handle(handle: pycurl.Curl) -> None:
+    """
+    Makes the handle wait for a connection of its CurlMulti that can take another
+    HTTP/2 stream instead of opening a socket of its own (see `configure_multiplexed_multi`).
+    """
+    handle.setopt(pycurl.PIPEWAIT, 1)
+    handle.setopt(pycurl.TCP_KEEPALIVE, 1)
+
+
+def configure_multiplexed_multi(multi: pycurl.CurlMulti, connections: int, streams_per_connection: int) -> None:
+    """
+    Lets the CurlMulti multiplex HTTP/2 streams over at most `connections` connections
+    per host, with at most `streams_per_connection` streams in flight on each.
+    Transfers beyond that wait in libcurl's queue for a free stream.
+    """
+    multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+    multi.setopt(pycurl.M_MAX_HOST_CONNECTIONS, connections)
+    multi.setopt(pycurl.M_MAX_CONCURRENT_STREAMS, streams_per_connection)
+
+
+def configure_warm_handle(handle: pycurl.Curl, share: pycurl.CurlShare) -> None:
+    """
+    Lets the handle reuse kept-alive connections, cached DNS entries and TLS sessions
+    held by the share object.
+    """
+    handle.setopt(pycurl.SHARE, share)
+    handle.setopt(pycurl.TCP_KEEPALIVE, 1)
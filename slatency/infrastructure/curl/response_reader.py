@@ -0,0 +1,176 @@
+from typing import Optional
+
+import pycurl
+
+from slatency.domain.entities.response import FailedResponse, Response, SuccessfulResponse
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.flow import Flow
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.schedule import Schedule
+
+# Define a constant for microsecond to millisecond conversion
+US_TO_MS_DIVISOR = 1000.0
+
+# libcurl error codes whose failing phase is known without looking at the timings
+ERROR_PHASES = {
+    pycurl.E_COULDNT_RESOLVE_PROXY: FailurePhase.DNS,
+    pycurl.E_COULDNT_RESOLVE_HOST: FailurePhase.DNS,
+    pycurl.E_COULDNT_CONNECT: FailurePhase.TCP_CONNECTION,
+    pycurl.E_SSL_CONNECT_ERROR: FailurePhase.TLS_HANDSHAKE,
+    pycurl.E_PEER_FAILED_VERIFICATION: FailurePhase.TLS_HANDSHAKE,
+    pycurl.E_SSL_CERTPROBLEM: FailurePhase.TLS_HANDSHAKE,
+    pycurl.E_SSL_CIPHER: FailurePhase.TLS_HANDSHAKE,
+    pycurl.E_SSL_CACERT_BADFILE: FailurePhase.TLS_HANDSHAKE,
+    pycurl.E_SEND_ERROR: FailurePhase.REQUEST,
+    pycurl.E_GOT_NOTHING: FailurePhase.RESPONSE,
+    pycurl.E_RECV_ERROR: FailurePhase.RESPONSE,
+    pycurl.E_PARTIAL_FILE: FailurePhase.RESPONSE,
+}
+
+# libcurl's fixed description of the errors a probe commonly ends with, without the
+# hosts, addresses and durations its error buffer adds
+ERROR_TEXTS = {
+    pycurl.E_UNSUPPORTED_PROTOCOL: "Unsupported protocol",
+    pycurl.E_URL_MALFORMAT: "URL using bad/illegal format or missing URL",
+    pycurl.E_COULDNT_RESOLVE_PROXY: "Couldn't resolve proxy name",
+    pycurl.E_COULDNT_RESOLVE_HOST: "Couldn't resolve host name",
+    pycurl.E_COULDNT_CONNECT: "Couldn't connect to server",
+    pycurl.E_HTTP2: "Error in the HTTP2 framing layer",
+    pycurl.E_PARTIAL_FILE: "Transferred a partial file",
+    pycurl.E_OPERATION_TIMEDOUT: "Timeout was reached",
+    pycurl.E_SSL_CONNECT_ERROR: "SSL connect error",
+    pycurl.E_TOO_MANY_REDIRECTS: "Number of redirects hit maximum amount",
+    pycurl.E_GOT_NOTHING: "Server returned nothing (no headers, no data)",
+    pycurl.E_SEND_ERROR: "Failed sending data to the peer",
+    pycurl.E_RECV_ERROR: "Failure when receiving data from the peer",
+    pycurl.E_SSL_CERTPROBLEM: "Problem with the local SSL certificate",
+    pycurl.E_SSL_CIPHER: "Couldn't use specified SSL cipher",
+    pycurl.E_PEER_FAILED_VERIFICATION: "SSL peer certificate or SSH remote key was not OK",
+    pycurl.E_SSL_CACERT_BADFILE: "Problem with the SSL CA cert (path? access rights?)",
+}
+
+
+def read_response(handle: pycurl.Curl, errno: int = 0, errmsg: str = "", schedule: Optional[Schedule] = None,
+                  client_timing: Optional[ClientTiming] = None, started_at: Optional[float] = None) -> Response:
+    """
+    Builds the Response for a finished transfer from the handle's timing information.
+    A non-zero errno or an HTTP status outside 2xx/3xx yields a FailedResponse.
+    """
+    if errno:
+        return FailedResponse(
+            failure_phase=_failure_phase(handle, errno),
+            error_message=f"PycURL error: {errno} - {errmsg}",
+            latency=read_latency(handle),
+            flow=read_failed_flow(handle),
+            schedule=schedule,
+            client_timing=client_timing,
+            started_at=started_at,
+            body=read_body(handle, failed=True),
+        )
+
+    status_code = handle.getinfo(pycurl.RESPONSE_CODE)
+    if not 200 <= status_code < 400:
+        return FailedResponse(
+            failure_phase=FailurePhase.RESPONSE,
+            error_message=f"HTTP Error: {status_code}",
+            status_code=status_code,
+            latency=read_latency(handle),
+            flow=read_failed_flow(handle),
+            schedule=schedule,
+            client_timing=client_timing,
+            started_at=started_at,
+            body=read_body(handle, failed=True),
+        )
+
+    return SuccessfulResponse(
+        status_code=status_code,
+        latency=read_latency(handle),
+        flow=Flow(
+            source_ip=handle.getinfo(pycurl.LOCAL_IP),
+            source_port=handle.getinfo(pycurl.LOCAL_PORT),
+            destination_ip=handle.getinfo(pycurl.PRIMARY_IP),
+            destination_port=handle.getinfo(pycurl.PRIMARY_PORT),
+        ),
+        connection_reused=handle.getinfo(pycurl.NUM_CONNECTS) == 0,
+        schedule=schedule,
+        client_timing=client_timing,
+        started_at=started_at,
+        body=read_body(handle, failed=False),
+    )
+
+
+def read_body(handle: pycurl.Curl, failed: bool) -> Optional[Body]:
+    """
+    Describes the body of the finished transfer, or returns None if the handle's
+    BodyPolicy discards it. The first bytes are only kept for failed transfers.
+    """
+    sink = getattr(handle, "body_sink", None)
+    if sink is None:
+        return None
+    checksum, head = sink.take(keep_head=failed)
+    return Body(
+        size=handle.getinfo(pycurl.SIZE_DOWNLOAD_T),
+        download_speed=float(handle.getinfo(pycurl.SPEED_DOWNLOAD_T)),
+        checksum=checksum,
+        head=head,
+    )
+
+
+def read_failed_flow(handle: pycurl.Curl) -> Optional[Flow]:
+    """
+    Returns the addresses of a failed transfer's connection, or None if it failed
+    before it got one.
+    """
+    if not handle.getinfo(pycurl.PRIMARY_IP):
+        return None
+    return Flow(
+        source_ip=handle.getinfo(pycurl.LOCAL_IP),
+        source_port=handle.getinfo(pycurl.LOCAL_PORT),
+        destination_ip=handle.getinfo(pycurl.PRIMARY_IP),
+        destination_port=handle.getinfo(pycurl.PRIMARY_PORT),
+    )
+
+
+def read_latency(handle: pycurl.Curl) -> Latency:
+    """
+    Splits libcurl's cumulative timestamps into the per-phase durations of a Latency.
+    """
+    queue = handle.getinfo(pycurl.QUEUE_TIME_T)
+    namelookup = handle.getinfo(pycurl.NAMELOOKUP_TIME_T)
+    connect = handle.getinfo(pycurl.CONNECT_TIME_T)
+    appconnect = handle.getinfo(pycurl.APPCONNECT_TIME_T)
+    pretransfer = handle.getinfo(pycurl.PRETRANSFER_TIME_T)
+    posttransfer = handle.getinfo(pycurl.POSTTRANSFER_TIME_T)
+    starttransfer = handle.getinfo(pycurl.STARTTRANSFER_TIME_T)
+    total = handle.getinfo(pycurl.TOTAL_TIME_T)
+
+    # On a reused connection libcurl reports zero for the phases it skipped
+    connected = appconnect if appconnect > 0 else connect
+    sent = posttransfer if posttransfer > 0 else pretransfer
+    return Latency(
+        queue=queue / US_TO_MS_DIVISOR,
+        dns=max(namelookup - queue, 0) / US_TO_MS_DIVISOR,
+        connect=max(connect - namelookup, 0) / US_TO_MS_DIVISOR,
+        tls=max(appconnect - connect, 0) / US_TO_MS_DIVISOR,
+        send_first_byte=max(pretransfer - connected, 0) / US_TO_MS_DIVISOR,
+        send_last_byte=max(posttransfer - pretransfer, 0) / US_TO_MS_DIVISOR,
+        receive_first_byte=max(starttransfer - sent, 0) / US_TO_MS_DIVISOR,
+        total=total / US_TO_MS_DIVISOR,
+    )
+
+
+def _failure_phase(handle: pycurl.Curl, errno: int) -> FailurePhase:
+    if errno in ERROR_PHASES:
+        return ERROR_PHASES[errno]
+    # Timeouts and other generic errors: the first phase libcurl never completed
+    if handle.getinfo(pycurl.NAMELOOKUP_TIME_T) == 0:
+        return FailurePhase.DNS
+    if handle.getinfo(pycurl.CONNECT_TIME_T) == 0:
+        return FailurePhase.TCP_CONNECTION
+    if handle.getinfo(pycurl.PRETRANSFER_TIME_T) == 0:
+        return FailurePhase.TLS_HANDSHAKE
+    if handle.getinfo(pycurl.STARTTRANSFER_TIME_T) == 0:
+        return FailurePhase.REQUEST
+    return FailurePhase.RESPONSE
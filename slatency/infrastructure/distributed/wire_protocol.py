@@ -0,0 +1,53 @@
+import json
+import socket
+import struct
+import zlib
+from typing import Any, Optional, Tuple
+
+# Every frame is a 4-byte big-endian length, a 1-byte kind and a zlib-compressed
+# compact JSON payload. Responses travel as the positional tuples of `response_codec`,
+# so repeated keys are never sent and repeated values compress away.
+JOB = 1         # coordinator -> worker: {"request": ..., "expected_responses": n, "options": {...}}
+BATCH = 2       # worker -> coordinator: [encoded response, ...]
+AGGREGATE = 3   # worker -> coordinator: SketchLatencyAnalysisService dict of the responses since the last one
+DONE = 4        # worker -> coordinator: {"completed": n}
+ERROR = 5       # worker -> coordinator: {"message": "..."}
+HEARTBEAT = 6   # worker -> coordinator: {} every heartbeat interval while a job runs
+
+HEADER = struct.Struct(">IB")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def send_frame(sock: socket.socket, kind: int, payload: Any) -> None:
+    body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 1)
+    sock.sendall(HEADER.pack(len(body), kind) + body)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[int, Any]]:
+    """
+    Returns the next (kind, payload), or None when the peer closed the connection cleanly.
+    """
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    length, kind = HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {length} bytes exceeds the {MAX_FRAME_SIZE} bytes limit")
+    body = _recv_exactly(sock, length)
+    if body is None:
+        raise ConnectionError("Connection closed in the middle of a frame")
+    return kind, json.loads(zlib.decompress(body))
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    received = 0
+    while received < size:
+        chunk = sock.recv(size - received)
+        if not chunk:
+            if received:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            return None
+        chunks.append(chunk)
+        received += len(chunk)
+    return b"".join(chunks)
@@ -0,0 +1,123 @@
+import socketserver
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Tuple
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.infrastructure.distributed.wire_protocol import (AGGREGATE, BATCH, DONE, ERROR, HEARTBEAT, JOB, recv_frame,
+                                                               send_frame)
+from slatency.infrastructure.mappers.request_mapper import request_from_dict
+from slatency.infrastructure.mappers.response_codec import encode_response
+from slatency.infrastructure.services.curl_multi_test_runner_service import CurlMultiTestRunnerService
+from slatency.infrastructure.services.sketch_latency_analysis_service import SketchLatencyAnalysisService
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """
+    A slatency worker: accepts probing jobs from a coordinator over TCP (see
+    `wire_protocol`), runs each one with a CurlMultiTestRunnerService and streams the
+    results back while the job is running.
+
+    Results are sent every `batch_size` responses or `flush_interval` seconds, either
+    as encoded responses or, when the job asks for aggregates only, as the sketch of
+    the responses since the previous frame. A coordinator that disconnects mid-job
+    therefore keeps everything up to the last frame it received. A heartbeat is also
+    sent every `heartbeat_interval` seconds, so that a coordinator can tell a job whose
+    probes are slow to complete from a worker that is gone.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 7878, batch_size: int = 256,
+                 flush_interval: float = 0.5, heartbeat_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+        super().__init__((host, port), _JobHandler)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+
+class _JobHandler(socketserver.BaseRequestHandler):
+    server: WorkerServer
+
+    def handle(self) -> None:
+        frame = recv_frame(self.request)
+        if frame is None:
+            return
+        kind, job = frame
+        try:
+            if kind != JOB:
+                raise ValueError(f"Expected a job frame, got kind {kind}")
+            completed = _run_job(self.request, job, self.server.batch_size, self.server.flush_interval,
+                                 self.server.heartbeat_interval)
+        except OSError:
+            # The coordinator went away, there is nobody left to report to
+            return
+        except Exception:
+            send_frame(self.request, ERROR, {"message": traceback.format_exc()})
+            return
+        send_frame(self.request, DONE, {"completed": completed})
+
+
+def _run_job(sock, job: Dict[str, Any], batch_size: int, flush_interval: float, heartbeat_interval: float) -> int:
+    test = Test(request=request_from_dict(job["request"]), expected_responses=job["expected_responses"])
+    options = job.get("options", {})
+    stream_responses = job.get("stream_responses", True)
+    batch: List[tuple] = []
+    state = {"completed": 0, "pending": 0, "last_flush": time.monotonic(), "sketch": SketchLatencyAnalysisService()}
+    # Result frames are sent from the probing thread, heartbeats from their own
+    sending = threading.Lock()
+    finished = threading.Event()
+
+    def heartbeat() -> None:
+        while not finished.wait(heartbeat_interval):
+            try:
+                with sending:
+                    send_frame(sock, HEARTBEAT, {})
+            except OSError:
+                return
+
+    def flush() -> None:
+        if state["pending"] == 0:
+            return
+        with sending:
+            if stream_responses:
+                send_frame(sock, BATCH, batch)
+                batch.clear()
+            else:
+                send_frame(sock, AGGREGATE, state["sketch"].to_dict())
+                state["sketch"] = SketchLatencyAnalysisService()
+        state["pending"] = 0
+        state["last_flush"] = time.monotonic()
+
+    def on_response(response: Response) -> None:
+        if stream_responses:
+            batch.append(encode_response(response))
+        else:
+            state["sketch"].record(response)
+        state["completed"] += 1
+        state["pending"] += 1
+        if state["pending"] >= batch_size or time.monotonic() - state["last_flush"] >= flush_interval:
+            flush()
+
+    runner = CurlMultiTestRunnerService(
+        concurrency=options.get("concurrency", 1),
+        rate=options.get("rate"),
+        reuse_connections=options.get("reuse_connections", False),
+        on_response=on_response,
+        keep_responses=False,
+    )
+    heartbeats = threading.Thread(target=heartbeat, name="slatency-heartbeat", daemon=True)
+    heartbeats.start()
+    try:
+        runner.execute(test)
+        flush()
+    finally:
+        finished.set()
+        heartbeats.join()
+    return state["completed"]
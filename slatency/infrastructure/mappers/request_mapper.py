@@ -0,0 +1,49 @@
+import base64
+from typing import Any, Dict
+from uuid import UUID
+
+from slatency.domain.entities.request import Request
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.http_version import HTTPVersion
+from slatency.domain.value_objects.url import URL
+
+
+def request_to_dict(request: Request) -> Dict[str, Any]:
+    """
+    Maps a Request to a JSON-friendly dictionary; the body is base64 encoded.
+    """
+    return {
+        "request_id": str(request.request_id),
+        "url": request.url.to_string(),
+        "method": request.method.value,
+        "headers": dict(request.headers),
+        "body": base64.b64encode(request.body).decode("ascii") if request.body is not None else None,
+        "timeout": request.timeout,
+        "connect_timeout": request.connect_timeout,
+        "resolve": list(request.resolve),
+        "body_policy": request.body_policy.to_string(),
+        "http_version": request.http_version.value if request.http_version is not None else None,
+    }
+
+
+def request_from_dict(data: Dict[str, Any]) -> Request:
+    """
+    Builds a Request from the dictionary produced by `request_to_dict`.
+    Only `url` is required, the other keys fall back to the Request defaults.
+    """
+    body = data.get("body")
+    request = Request(
+        url=URL.from_string(data["url"]),
+        method=HTTPMethod(data.get("method", "GET").upper()),
+        headers=dict(data.get("headers") or {}),
+        body=base64.b64decode(body) if body is not None else None,
+        timeout=data.get("timeout", 10),
+        connect_timeout=data.get("connect_timeout"),
+        resolve=list(data.get("resolve") or []),
+        body_policy=BodyPolicy.from_string(data.get("body_policy") or "discard"),
+        http_version=HTTPVersion(str(data["http_version"])) if data.get("http_version") else None,
+    )
+    if data.get("request_id"):
+        request.request_id = UUID(data["request_id"])
+    return request
@@ -0,0 +1,134 @@
+from typing import Optional, Tuple
+
+from slatency.domain.entities.response import FailedResponse, Response, SuccessfulResponse
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.flow import Flow
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.schedule import Schedule
+
+SUCCESS = 0
+FAILURE = 1
+
+# A compact, positional form of a Response for shipping between processes or hosts:
+#   success  (0, status_code, queue, dns, connect, tls, send_first_byte, send_last_byte,
+#             receive_first_byte, total, source_ip, source_port, destination_ip,
+#             destination_port, connection_reused, intended_start, actual_start,
+#             scheduling_lag, processing_lag, started_at, body_size, download_speed, checksum,
+#             body_head)
+#   failure  (1, failure_phase name, error_message, status_code, intended_start, actual_start,
+#             scheduling_lag, processing_lag, started_at, body_size, download_speed, checksum,
+#             body_head, queue, dns, connect, tls, send_first_byte, send_last_byte,
+#             receive_first_byte, total, source_ip, source_port, destination_ip, destination_port)
+# Body heads are shipped as latin-1 text, which survives JSON. Response ids are not
+# shipped, the decoded Response gets a new one.
+EncodedResponse = Tuple
+
+
+def encode_response(response: Response) -> EncodedResponse:
+    intended, actual = _encode_schedule(response.schedule)
+    scheduling_lag, processing_lag = _encode_client_timing(response.client_timing)
+    body = _encode_body(response.body)
+    if isinstance(response, SuccessfulResponse):
+        latency = response.latency
+        flow = response.flow
+        return (SUCCESS, response.status_code, latency.queue, latency.dns, latency.connect, latency.tls,
+                latency.send_first_byte, latency.send_last_byte, latency.receive_first_byte, latency.total,
+                flow.source_ip, flow.source_port, flow.destination_ip, flow.destination_port,
+                response.connection_reused, intended, actual, scheduling_lag, processing_lag,
+                response.started_at) + body
+    return ((FAILURE, response.failure_phase.name, response.error_message, response.status_code, intended, actual,
+             scheduling_lag, processing_lag, response.started_at) + body
+            + _encode_latency(response.latency) + _encode_flow(response.flow))
+
+
+def decode_response(encoded: EncodedResponse) -> Response:
+    if encoded[0] == SUCCESS:
+        return SuccessfulResponse(
+            status_code=encoded[1],
+            latency=Latency(*encoded[2:10]),
+            flow=Flow(*encoded[10:14]),
+            connection_reused=encoded[14],
+            schedule=_decode_schedule(encoded[15], encoded[16]),
+            client_timing=_decode_client_timing(encoded[17], encoded[18]),
+            started_at=encoded[19],
+            body=_decode_body(encoded[20:24]),
+        )
+    return FailedResponse(
+        failure_phase=FailurePhase[encoded[1]],
+        error_message=encoded[2],
+        status_code=encoded[3],
+        schedule=_decode_schedule(encoded[4], encoded[5]),
+        client_timing=_decode_client_timing(encoded[6], encoded[7]),
+        started_at=encoded[8],
+        body=_decode_body(encoded[9:13]),
+        latency=_decode_latency(encoded[13:21]),
+        flow=_decode_flow(encoded[21:25]),
+    )
+
+
+def _encode_latency(latency: Optional[Latency]) -> Tuple:
+    if latency is None:
+        return (None,) * 8
+    return (latency.queue, latency.dns, latency.connect, latency.tls, latency.send_first_byte,
+            latency.send_last_byte, latency.receive_first_byte, latency.total)
+
+
+def _decode_latency(encoded: Tuple) -> Optional[Latency]:
+    # Failures encoded before their timings were kept end before these fields
+    if not encoded or encoded[0] is None:
+        return None
+    return Latency(*encoded)
+
+
+def _encode_flow(flow: Optional[Flow]) -> Tuple:
+    if flow is None:
+        return None, None, None, None
+    return flow.source_ip, flow.source_port, flow.destination_ip, flow.destination_port
+
+
+def _decode_flow(encoded: Tuple) -> Optional[Flow]:
+    if not encoded or encoded[0] is None:
+        return None
+    return Flow(*encoded)
+
+
+def _encode_schedule(schedule: Optional[Schedule]) -> Tuple[Optional[float], Optional[float]]:
+    if schedule is None:
+        return None, None
+    return schedule.intended_start, schedule.actual_start
+
+
+def _decode_schedule(intended: Optional[float], actual: Optional[float]) -> Optional[Schedule]:
+    if intended is None:
+        return None
+    return Schedule(intended_start=intended, actual_start=actual)
+
+
+def _encode_client_timing(client_timing: Optional[ClientTiming]) -> Tuple[Optional[float], Optional[float]]:
+    if client_timing is None:
+        return None, None
+    return client_timing.scheduling_lag, client_timing.processing_lag
+
+
+def _decode_client_timing(scheduling_lag: Optional[float], processing_lag: Optional[float]) -> Optional[ClientTiming]:
+    if scheduling_lag is None:
+        return None
+    return ClientTiming(scheduling_lag=scheduling_lag, processing_lag=processing_lag)
+
+
+def _encode_body(body: Optional[Body]) -> Tuple:
+    if body is None:
+        return None, None, None, None
+    head = body.head.decode("latin-1") if body.head is not None else None
+    return body.size, body.download_speed, body.checksum, head
+
+
+def _decode_body(encoded: Tuple) -> Optional[Body]:
+    # Responses encoded before bodies were recorded end before these fields
+    if not encoded or encoded[0] is None:
+        return None
+    size, download_speed, checksum, head = encoded
+    return Body(size=size, download_speed=download_speed, checksum=checksum,
+                head=head.encode("latin-1") if head is not None else None)
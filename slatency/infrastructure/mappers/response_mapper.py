@@ -0,0 +1,242 @@
+import re
+from typing import Any, Dict, Optional
+
+from slatency.domain.entities.response import FailedResponse, Response, SuccessfulResponse
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.flow import Flow
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.schedule import Schedule
+from slatency.infrastructure.curl.response_reader import ERROR_PHASES, ERROR_TEXTS
+
+TIMING_KEYS = ["queueTime_ms", "namelookupTime_ms", "connectTime_ms", "appconnectTime_ms",
+               "pretransferTime_ms", "startTransferTime_ms", "totalTime_ms"]
+FLOW_KEYS = ["localIP", "localPort", "remoteIP", "remotePort"]
+PYCURL_ERROR = re.compile(r"PycURL error: (\d+)")
+# The timestamps libcurl leaves at zero when a transfer fails in each phase
+UNREACHED_TIMINGS = {
+    FailurePhase.DNS: ["namelookupTime_ms", "connectTime_ms", "appconnectTime_ms", "pretransferTime_ms",
+                       "startTransferTime_ms"],
+    FailurePhase.TCP_CONNECTION: ["connectTime_ms", "appconnectTime_ms", "pretransferTime_ms", "startTransferTime_ms"],
+    FailurePhase.TLS_HANDSHAKE: ["appconnectTime_ms", "pretransferTime_ms", "startTransferTime_ms"],
+    FailurePhase.REQUEST: ["startTransferTime_ms"],
+    FailurePhase.RESPONSE: [],
+}
+
+
+def response_to_result(response: Response) -> Dict[str, Any]:
+    """
+    Maps a Response to the result dictionary written by main.py and read by analyze.py.
+    Phase durations are added back up into libcurl's cumulative timestamps. Failed
+    responses keep the timestamps and addresses libcurl got to before failing.
+    The runners do not follow redirects, so no redirect time is written.
+    """
+    if not isinstance(response, SuccessfulResponse):
+        result: Dict[str, Any] = {
+            "error": response.error_message,
+            "http_code": response.status_code if response.status_code is not None else -1,
+        }
+        if response.latency is None:
+            result.update(dict.fromkeys(TIMING_KEYS, 0.0))
+        else:
+            result.update(_latency_to_result(response.latency))
+            # A transport error leaves the phases it never reached at zero, an HTTP error reached them all
+            if response.status_code is None:
+                result.update(dict.fromkeys(UNREACHED_TIMINGS[response.failure_phase], 0.0))
+        result.update(_flow_to_result(response.flow) if response.flow is not None
+                      else dict.fromkeys(FLOW_KEYS, "N/A"))
+        result.update(_schedule_to_result(response.schedule, None))
+        result.update(_client_timing_to_result(response.client_timing))
+        result.update(_started_at_to_result(response.started_at))
+        result.update(body_to_result(response.body))
+        return result
+
+    result = {"http_code": response.status_code}
+    result.update(_latency_to_result(response.latency))
+    result.update(_flow_to_result(response.flow))
+    result["connectionReused"] = response.connection_reused
+    result.update(_schedule_to_result(response.schedule, response.latency.total))
+    result.update(_client_timing_to_result(response.client_timing))
+    result.update(_started_at_to_result(response.started_at))
+    result.update(body_to_result(response.body))
+    return result
+
+
+def _latency_to_result(latency: Latency) -> Dict[str, Any]:
+    namelookup = latency.queue + latency.dns
+    connect = namelookup + latency.connect
+    appconnect = connect + latency.tls if latency.tls > 0 else 0.0
+    pretransfer = (appconnect or connect) + latency.send_first_byte
+    # libcurl reports whole microseconds, rounding drops the float noise of the sums
+    return {
+        "queueTime_ms": round(latency.queue, 3),
+        "namelookupTime_ms": round(namelookup, 3),
+        "connectTime_ms": round(connect, 3),
+        "appconnectTime_ms": round(appconnect, 3),
+        "pretransferTime_ms": round(pretransfer, 3),
+        "startTransferTime_ms": round(pretransfer + latency.send_last_byte + latency.receive_first_byte, 3),
+        "totalTime_ms": round(latency.total, 3),
+    }
+
+
+def _flow_to_result(flow: Flow) -> Dict[str, Any]:
+    return {
+        "localIP": flow.source_ip,
+        "localPort": flow.source_port,
+        "remoteIP": flow.destination_ip,
+        "remotePort": flow.destination_port,
+    }
+
+
+def body_to_result(body: Optional[Body]) -> Dict[str, Any]:
+    """
+    Adds the body size and download speed, and the checksum or first bytes when the
+    BodyPolicy kept them. The first bytes are decoded as UTF-8 for reading; other
+    bytes are backslash-escaped.
+    """
+    if body is None:
+        return {}
+    result: Dict[str, Any] = {"downloadSize_bytes": body.size, "downloadSpeed_Bps": round(body.download_speed, 3)}
+    if body.checksum is not None:
+        result["bodySha256"] = body.checksum
+    if body.head is not None:
+        result["bodyHead"] = body.head.decode("utf-8", "backslashreplace")
+    return result
+
+
+def _schedule_to_result(schedule: Optional[Schedule], total: Optional[float]) -> Dict[str, Any]:
+    """
+    Adds the open-loop send times; the latency seen from the intended start includes
+    the queueing delay, which corrects for coordinated omission.
+    """
+    if schedule is None:
+        return {}
+    result = {
+        "intendedStart_ms": round(schedule.intended_start, 3),
+        "actualStart_ms": round(schedule.actual_start, 3),
+        "queueingDelay_ms": round(schedule.queueing_delay, 3),
+    }
+    if total is not None:
+        result["totalTimeFromIntended_ms"] = round(schedule.queueing_delay + total, 3)
+    return result
+
+
+def _client_timing_to_result(client_timing: Optional[ClientTiming]) -> Dict[str, Any]:
+    if client_timing is None:
+        return {}
+    return {
+        "schedulingLag_ms": round(client_timing.scheduling_lag, 3),
+        "processingLag_ms": round(client_timing.processing_lag, 3),
+    }
+
+
+def _started_at_to_result(started_at: Optional[float]) -> Dict[str, Any]:
+    if started_at is None:
+        return {}
+    # Seconds since the epoch, to the microsecond
+    return {"timestamp": round(started_at, 6)}
+
+
+def error_category(error: str) -> str:
+    """
+    Returns the error of a result without the details that differ between probes of
+    the same failure: a libcurl error becomes its code and libcurl's fixed
+    description. Other errors, e.g. "HTTP Error: 503", are returned unchanged.
+    """
+    match = PYCURL_ERROR.match(error)
+    if match is None:
+        return error
+    errno = int(match.group(1))
+    return f"PycURL error: {errno} - {ERROR_TEXTS[errno]}" if errno in ERROR_TEXTS else f"PycURL error: {errno}"
+
+
+def result_to_response(result: Dict[str, Any]) -> Response:
+    """
+    Maps a result dictionary written by main.py back to a Response; the inverse of
+    `response_to_result`. Cumulative timestamps are split back into phase durations.
+    """
+    schedule = None
+    if "intendedStart_ms" in result:
+        schedule = Schedule(intended_start=result["intendedStart_ms"], actual_start=result["actualStart_ms"])
+    client_timing = None
+    if "schedulingLag_ms" in result:
+        client_timing = ClientTiming(scheduling_lag=result["schedulingLag_ms"], processing_lag=result["processingLag_ms"])
+
+    if "error" in result or not 200 <= result.get("http_code", -1) < 400:
+        status_code = result.get("http_code", -1)
+        return FailedResponse(
+            failure_phase=_failure_phase(result),
+            error_message=result.get("error") or f"HTTP Error: {status_code}",
+            status_code=status_code if status_code != -1 else None,
+            latency=_latency_from_result(result) if result.get("totalTime_ms") else None,
+            flow=_flow_from_result(result) if result.get("remoteIP", "N/A") != "N/A" else None,
+            schedule=schedule,
+            client_timing=client_timing,
+            started_at=result.get("timestamp"),
+            body=_body_from_result(result),
+        )
+
+    return SuccessfulResponse(
+        status_code=result["http_code"],
+        latency=_latency_from_result(result),
+        flow=_flow_from_result(result),
+        connection_reused=bool(result.get("connectionReused", False)),
+        schedule=schedule,
+        client_timing=client_timing,
+        started_at=result.get("timestamp"),
+        body=_body_from_result(result),
+    )
+
+
+def _latency_from_result(result: Dict[str, Any]) -> Latency:
+    queue = result.get("queueTime_ms", 0.0)
+    namelookup = result.get("namelookupTime_ms", 0.0)
+    connect = result.get("connectTime_ms", 0.0)
+    appconnect = result.get("appconnectTime_ms", 0.0)
+    pretransfer = result.get("pretransferTime_ms", 0.0)
+    starttransfer = result.get("startTransferTime_ms", 0.0)
+    # Failed results hold zero for the timestamps libcurl never reached
+    return Latency(
+        queue=queue,
+        dns=max(namelookup - queue, 0.0),
+        connect=max(connect - namelookup, 0.0),
+        tls=max(appconnect - connect, 0.0) if appconnect > 0 else 0.0,
+        send_first_byte=max(pretransfer - (appconnect or connect), 0.0),
+        send_last_byte=0.0,
+        receive_first_byte=max(starttransfer - pretransfer, 0.0),
+        total=result.get("totalTime_ms", 0.0),
+    )
+
+
+def _flow_from_result(result: Dict[str, Any]) -> Flow:
+    return Flow(
+        source_ip=result.get("localIP", ""),
+        source_port=result.get("localPort", 0),
+        destination_ip=result.get("remoteIP", ""),
+        destination_port=result.get("remotePort", 0),
+    )
+
+
+def _body_from_result(result: Dict[str, Any]) -> Optional[Body]:
+    if result.get("downloadSize_bytes") is None:
+        return None
+    head = result.get("bodyHead")
+    return Body(size=int(result["downloadSize_bytes"]), download_speed=result.get("downloadSpeed_Bps", 0.0),
+                checksum=result.get("bodySha256"), head=head.encode("utf-8") if head is not None else None)
+
+
+def _failure_phase(result: Dict[str, Any]) -> FailurePhase:
+    match = PYCURL_ERROR.match(result.get("error") or "")
+    if match is None:
+        return FailurePhase.RESPONSE
+    errno = int(match.group(1))
+    if errno in ERROR_PHASES:
+        return ERROR_PHASES[errno]
+    # Timeouts and other generic errors: the first phase libcurl never completed
+    for key, phase in (("namelookupTime_ms", FailurePhase.DNS), ("connectTime_ms", FailurePhase.TCP_CONNECTION),
+                       ("pretransferTime_ms", FailurePhase.TLS_HANDSHAKE),
+                       ("startTransferTime_ms", FailurePhase.REQUEST)):
+        if not result.get(key):
+            return phase
+    return FailurePhase.RESPONSE
@@ -0,0 +1,64 @@
+import json
+from typing import Any, List, Tuple
+
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.infrastructure.mappers.request_mapper import request_from_dict
+
+
+def read_target_entries(path: str) -> List[Any]:
+    """
+    Reads the entries of a targets file, a JSON array or JSON Lines file. Targets
+    files are written by hand, so every line must parse, the last one included.
+    """
+    with open(path, "r") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Malformed JSON array: {e}")
+    entries = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            raise ValueError(f"Malformed JSON on line {line_number}")
+    return entries
+
+
+def load_targets(path: str, probes: int, timeout: int, connect_timeout: int,
+                 body_policy: BodyPolicy = BodyPolicy()) -> List[Tuple[str, Test]]:
+    """
+    Reads the targets of a sweep or monitor from a JSON array or JSON Lines file.
+    Every entry is a Request definition (url, method, headers, body, timeout,
+    connect_timeout, resolve, body_policy) with an optional `name` and `probes`, or
+    just a URL string.
+    """
+    targets: List[Tuple[str, Test]] = []
+    names = set()
+    for number, entry in enumerate(read_target_entries(path), start=1):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if not isinstance(entry, dict) or "url" not in entry:
+            raise ValueError(f"Target {number} has no 'url'")
+        request = request_from_dict({"timeout": timeout, "connect_timeout": connect_timeout,
+                                     "body_policy": body_policy.to_string(), **entry})
+        name = entry.get("name") or target_name(request.url.to_string(), request.resolve)
+        if name in names:
+            name = f"{name} #{number}"
+        names.add(name)
+        expected = entry.get("probes", probes)
+        if not isinstance(expected, int) or expected <= 0:
+            raise ValueError(f"Target {number} ({name}) needs a positive number of probes")
+        targets.append((name, Test(request=request, expected_responses=expected)))
+    return targets
+
+
+def target_name(url: str, resolve: List[str]) -> str:
+    # Pinned targets share a URL, the pinned address tells them apart
+    if resolve:
+        return f"{url} @{resolve[0].split(':', 2)[-1]}"
+    return url
@@ -0,0 +1,120 @@
+import bisect
+import math
+import threading
+from typing import Dict, List, Sequence
+
+from slatency.domain.entities.response import Response, SuccessfulResponse
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.infrastructure.services.sketch_latency_analysis_service import PHASES
+
+# Upper bounds of the histogram buckets, in milliseconds, from a loopback probe to a timeout
+DEFAULT_BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 75, 100, 150, 250, 500, 750, 1000, 2500, 5000, 10000]
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _TargetMetrics:
+    """
+    The counters of one target: a bucket count, sum and count per latency phase,
+    a failure count per FailurePhase and the outcome of the last probe.
+    """
+    def __init__(self, buckets: int):
+        self.buckets: Dict[str, List[int]] = {phase: [0] * (buckets + 1) for phase in PHASES}
+        self.sums: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.successes = 0
+        self.failures: Dict[FailurePhase, int] = {phase: 0 for phase in FailurePhase}
+        self.last_probe = math.nan
+        self.last_success = math.nan
+
+
+class LatencyMetrics:
+    """
+    Cumulative per-phase latency histograms and failure counters of the targets of a
+    monitor, rendered in the OpenMetrics or Prometheus text exposition format.
+
+    Each target holds a fixed number of integers per phase, so memory stays flat
+    however long the monitor runs. Buckets are fixed (`buckets_ms`, upper bounds in
+    milliseconds) rather than log-scaled like a LogHistogram: a scraper derives
+    percentiles over any time window from the difference of two scrapes, which only
+    works if every scrape exports the same buckets. Exported durations are in
+    seconds, as the formats prescribe.
+
+    Responses are recorded from the probing thread while scrapes render from the
+    server's threads, so both take the same lock.
+    """
+    def __init__(self, targets: Sequence[str], buckets_ms: Sequence[float] = DEFAULT_BUCKETS_MS):
+        bounds = sorted(set(buckets_ms))
+        if not bounds or bounds[0] <= 0:
+            raise ValueError("Histogram buckets must be positive numbers of milliseconds")
+        self.buckets_ms = bounds
+        self.targets: Dict[str, _TargetMetrics] = {target: _TargetMetrics(len(bounds)) for target in targets}
+        self._lock = threading.Lock()
+
+    def record(self, target: str, response: Response) -> None:
+        metrics = self.targets[target]
+        with self._lock:
+            metrics.last_probe = response.started_at if response.started_at is not None else math.nan
+            if isinstance(response, SuccessfulResponse):
+                for phase in PHASES:
+                    value = getattr(response.latency, phase)
+                    metrics.buckets[phase][bisect.bisect_left(self.buckets_ms, value)] += 1
+                    metrics.sums[phase] += value
+                metrics.successes += 1
+                metrics.last_success = 1.0
+            else:
+                metrics.failures[response.failure_phase] += 1
+                metrics.last_success = 0.0
+
+    def render(self, openmetrics: bool = True) -> str:
+        """
+        Returns every metric in the OpenMetrics text format, or in the older
+        Prometheus text format with `openmetrics` set to False.
+        """
+        lines: List[str] = []
+        # OpenMetrics names counters without their `_total` suffix, Prometheus with it
+        failures = "slatency_probe_failures" if openmetrics else "slatency_probe_failures_total"
+        with self._lock:
+            lines.append("# TYPE slatency_probe_phase_seconds histogram")
+            lines.append("# HELP slatency_probe_phase_seconds Duration of each phase of the successful probes.")
+            if openmetrics:
+                lines.append("# UNIT slatency_probe_phase_seconds seconds")
+            for target, metrics in self.targets.items():
+                for phase in PHASES:
+                    labels = f'target="{_escape(target)}",phase="{phase}"'
+                    cumulative = 0
+                    for bound, count in zip(self.buckets_ms, metrics.buckets[phase]):
+                        cumulative += count
+                        lines.append(f'slatency_probe_phase_seconds_bucket{{{labels},le="{_number(bound / 1000)}"}} {cumulative}')
+                    lines.append(f'slatency_probe_phase_seconds_bucket{{{labels},le="+Inf"}} {metrics.successes}')
+                    lines.append(f"slatency_probe_phase_seconds_sum{{{labels}}} {_number(metrics.sums[phase] / 1000)}")
+                    lines.append(f"slatency_probe_phase_seconds_count{{{labels}}} {metrics.successes}")
+
+            lines.append(f"# TYPE {failures} counter")
+            lines.append(f"# HELP {failures} Failed probes by the phase they failed in.")
+            for target, metrics in self.targets.items():
+                for phase, count in metrics.failures.items():
+                    lines.append(f'slatency_probe_failures_total{{target="{_escape(target)}",phase="{phase.name}"}} {count}')
+
+            lines.append("# TYPE slatency_last_probe_timestamp_seconds gauge")
+            lines.append("# HELP slatency_last_probe_timestamp_seconds When the last probe of the target was started.")
+            for target, metrics in self.targets.items():
+                lines.append(f'slatency_last_probe_timestamp_seconds{{target="{_escape(target)}"}} {_number(metrics.last_probe)}')
+
+            lines.append("# TYPE slatency_last_probe_success gauge")
+            lines.append("# HELP slatency_last_probe_success Whether the last probe of the target succeeded (1) or failed (0).")
+            for target, metrics in self.targets.items():
+                lines.append(f'slatency_last_probe_success{{target="{_escape(target)}"}} {_number(metrics.last_success)}')
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
@@ -0,0 +1,59 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+from slatency.infrastructure.monitoring.latency_metrics import (OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE,
+                                                                LatencyMetrics)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    Serves the LatencyMetrics of a monitor at `/metrics` for a Prometheus-compatible
+    scraper. Scrapers that accept OpenMetrics get that format, others the Prometheus
+    text format. Nothing is rendered between scrapes.
+
+    `start` serves from a daemon thread, so the monitor keeps the main thread.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, metrics: LatencyMetrics, host: str = "127.0.0.1", port: int = 9464):
+        self.metrics = metrics
+        self._thread = None
+        super().__init__((host, port), _MetricsHandler)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, name="slatency-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MetricsServer
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self._send(404, "text/plain; charset=utf-8", b"Not found, metrics are served at /metrics\n")
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.server.metrics.render(openmetrics).encode("utf-8")
+        self._send(200, OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE, body)
+
+    def log_message(self, format, *args) -> None:
+        # A scrape every few seconds for weeks would flood stderr
+        pass
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,78 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO
+
+from slatency.infrastructure.analysis.phases import PHASES, result_phases
+from slatency.infrastructure.analysis.rolling_window import RollingWindow
+
+class LiveProgressView:
+    """
+    A progress display refreshed from a background thread every `interval` seconds,
+    independently of the probe rate. It shows overall progress plus the throughput,
+    error rate and per-phase P50/P95/P99 of the last `window_seconds`, from a
+    constant-memory RollingWindow. On a terminal the block is redrawn in place,
+    otherwise one summary line is written per refresh.
+    """
+    def __init__(self, total: int, interval: float = 0.5, window_seconds: float = 10.0,
+                 stream: Optional[TextIO] = None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stdout
+        self._window = RollingWindow(PHASES, window_seconds=window_seconds)
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._start = time.monotonic()
+        self._drawn_lines = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._interactive = self.stream.isatty()
+
+    def start(self) -> None:
+        self._start = time.monotonic()
+        self._thread.start()
+
+    def update(self, result: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._completed += 1
+            if "error" in result:
+                self._window.record_failure(now)
+            else:
+                self._window.record(now, result_phases(result))
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._render()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._render()
+
+    def _render(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            completed = self._completed
+            snapshot = self._window.snapshot(now, now - self._start)
+        percent = 100.0 * completed / self.total if self.total else 100.0
+        header = (f"[{completed:>{len(str(self.total))}}/{self.total} {percent:5.1f}%] "
+                  f"{snapshot.throughput:8.1f} probes/s  errors {100.0 * snapshot.error_rate:5.1f}%  "
+                  f"(last {snapshot.seconds:.0f}s)")
+        if not self._interactive:
+            total = snapshot.histograms["total"]
+            self.stream.write(f"{header}  total p50/p95/p99 {total.quantile(0.5):.3f}/"
+                              f"{total.quantile(0.95):.3f}/{total.quantile(0.99):.3f} ms\n")
+            self.stream.flush()
+            return
+        lines: List[str] = [header, f"  {'phase':<8} {'p50':>10} {'p95':>10} {'p99':>10}  (ms)"]
+        for phase in PHASES:
+            histogram = snapshot.histograms[phase]
+            lines.append(f"  {phase:<8} {histogram.quantile(0.5):>10.3f} {histogram.quantile(0.95):>10.3f} "
+                         f"{histogram.quantile(0.99):>10.3f}")
+        # Move back over the previous block and redraw it in place
+        prefix = f"\x1b[{self._drawn_lines}F" if self._drawn_lines else ""
+        self.stream.write(prefix + "".join(f"\x1b[2K{line}\n" for line in lines))
+        self.stream.flush()
+        self._drawn_lines = len(lines)
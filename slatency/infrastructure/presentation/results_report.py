@@ -0,0 +1,148 @@
+import json
+import math
+from array import array
+from typing import Any, Dict, Iterator, List
+
+from slatency.infrastructure.analysis.phases import PHASES, phase_arrays, result_phases
+from slatency.infrastructure.columnar.columnar_format import TIMING_COLUMNS, is_columnar, open_columns
+
+PHASE_LABELS = {
+    "dns": "DNS Lookup",
+    "connect": "TCP Connect",
+    "tls": "TLS Handshake",
+    "server": "Server Processing",
+    "total": "Total Time",
+}
+
+
+class ResultsReport:
+    """
+    The compact three-part report of a results file: execution overview, summary
+    statistics per phase and failure analysis.
+
+    It only needs the standard library for JSON and JSON Lines files (numpy for
+    columnar ones), so it starts in a fraction of the time analyze.py needs to load
+    pandas. Statistics are exact and match pandas' (linear percentiles, sample
+    standard deviation).
+    """
+    def __init__(self):
+        self.total = 0
+        self.successes = 0
+        self.failures: Dict[str, int] = {}
+        self.values: Dict[str, array] = {phase: array("d") for phase in PHASES}
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        self.total += 1
+        code = result.get("http_code")
+        if "error" in result or not isinstance(code, int) or not 200 <= code < 400:
+            error = result.get("error") or f"HTTP Error: {code}"
+            self.failures[error] = self.failures.get(error, 0) + 1
+            return
+        self.successes += 1
+        for phase, value in result_phases(result).items():
+            self.values[phase].append(value)
+
+    def add_columns(self, columns: Dict[str, Any], errors: List[str]) -> None:
+        """
+        Adds the rows of a memory-mapped columnar file without building a dict per row.
+        """
+        import numpy as np
+        codes = columns["http_code"]
+        error_codes = columns["error"]
+        success = (error_codes < 0) & (codes >= 200) & (codes < 400)
+        self.total += len(codes)
+        self.successes += int(success.sum())
+        for code, count in zip(*np.unique(error_codes[error_codes >= 0], return_counts=True)):
+            self.failures[errors[code]] = self.failures.get(errors[code], 0) + int(count)
+        for code, count in zip(*np.unique(codes[(error_codes < 0) & ~success], return_counts=True)):
+            key = f"HTTP Error: {code}"
+            self.failures[key] = self.failures.get(key, 0) + int(count)
+        phases = phase_arrays({name: columns[name][success] for name in TIMING_COLUMNS if name in columns})
+        for phase, values in phases.items():
+            self.values[phase].frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+    def print(self) -> None:
+        failed = self.total - self.successes
+        print("\n--- Execution Overview ---")
+        print(f"{'Total Requests':<16} {self.total}")
+        print(f"{'Success Count':<16} {self.successes}")
+        print(f"{'Failure Count':<16} {failed}")
+        print(f"{'Success Rate':<16} {100.0 * self.successes / self.total if self.total else 0.0:.1f}%")
+
+        print("\n--- Summary Statistics (Successful Requests, ms) ---")
+        print(f"{'Timing Metric':<18} {'Min':>10} {'P50':>10} {'Mean':>10} {'P95':>10} {'P99':>10} {'StdDev':>10}")
+        for phase in PHASES:
+            values = sorted(self.values[phase])
+            if not values:
+                print(f"{PHASE_LABELS[phase]:<18} {'-':>10} {'-':>10} {'-':>10} {'-':>10} {'-':>10} {'-':>10}")
+                continue
+            print(f"{PHASE_LABELS[phase]:<18} {values[0]:>10.3f} {_percentile(values, 0.5):>10.3f} "
+                  f"{_mean(values):>10.3f} {_percentile(values, 0.95):>10.3f} {_percentile(values, 0.99):>10.3f} "
+                  f"{_std(values):>10.3f}")
+
+        print("\n--- Failure Analysis ---")
+        if not failed:
+            print("No failures.")
+            return
+        width = max(len(error) for error in self.failures)
+        print(f"{'Failure Type':<{width}} {'Count':>8} {'% of Total':>11}")
+        for error, count in sorted(self.failures.items(), key=lambda item: -item[1]):
+            print(f"{error:<{width}} {count:>8} {100.0 * count / self.total:>10.1f}%")
+        print(f"{'TOTAL FAILURES':<{width}} {failed:>8} {100.0 * failed / self.total:>10.1f}%")
+
+
+def build_report(input_file_path: str) -> ResultsReport:
+    report = ResultsReport()
+    if is_columnar(input_file_path):
+        columns, errors = open_columns(input_file_path)
+        report.add_columns(columns, errors)
+        return report
+    for result in iter_result_records(input_file_path):
+        report.add_result(result)
+    return report
+
+
+def iter_result_records(input_file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the result dictionaries of a JSON array or JSON Lines results file.
+    A truncated last line, left behind by an interrupted run, is skipped.
+    """
+    with open(input_file_path, "r") as f:
+        is_array = False
+        for line in f:
+            if line.strip():
+                is_array = line.lstrip().startswith("[")
+                break
+        f.seek(0)
+        if is_array:
+            yield from json.load(f)
+            return
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise ValueError(f"Malformed JSON on line {line_number}")
+                print(f"Warning: Skipping truncated last line {line_number}.")
+                continue
+            yield record
+
+
+def _percentile(values: List[float], q: float) -> float:
+    position = q * (len(values) - 1)
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _mean(values: List[float]) -> float:
+    return math.fsum(values) / len(values)
+
+
+def _std(values: List[float]) -> float:
+    if len(values) < 2:
+        return float("nan")
+    mean = _mean(values)
+    return math.sqrt(math.fsum((value - mean) ** 2 for value in values) / (len(values) - 1))
@@ -0,0 +1,121 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from slatency.domain.entities.request import Request
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.domain.value_objects.http_method import HTTPMethod
+from slatency.domain.value_objects.url import URL
+
+# Path segments that identify a resource rather than a route, replaced by a placeholder
+ID_SEGMENTS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "{uuid}"),
+    (re.compile(r"\d+"), "{id}"),
+    (re.compile(r"[0-9a-fA-F]{16,}"), "{hash}"),
+]
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    """
+    One recorded request to replay: when it was sent, in seconds after the first
+    request of the trace, the Request to reissue and the route it is reported under.
+    """
+    offset: float
+    request: Request
+    route: str
+
+
+def read_trace(path: str, target: Optional[str] = None, timeout: int = 10, connect_timeout: Optional[int] = None,
+               body_policy: BodyPolicy = BodyPolicy()) -> Iterator[TraceRecord]:
+    """
+    Streams the records of a JSON Lines request log, one line at a time, so traces
+    of any size replay in constant memory. Every line holds a `timestamp` (seconds
+    since the epoch or ISO 8601), a `url`, and optionally a `method`, `headers`, a
+    `route` and the body, inline as `body` (text) or as a `body_file` path relative
+    to the trace. With a `target` (scheme://host[:port]) the requests are sent there
+    instead of to the recorded host, e.g. to replay production traffic on staging.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    first = None
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                timestamp = _timestamp(entry["timestamp"])
+                url = retarget(entry["url"], target) if target else entry["url"]
+                request = Request(
+                    url=URL.from_string(url),
+                    method=HTTPMethod(entry.get("method", "GET").upper()),
+                    headers=dict(entry.get("headers") or {}),
+                    body=_body(entry, directory),
+                    timeout=timeout,
+                    connect_timeout=connect_timeout,
+                    body_policy=body_policy,
+                )
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise ValueError(f"Malformed JSON on line {line_number}")
+                print(f"Warning: Skipping truncated last line {line_number}.")
+                continue
+            except (KeyError, ValueError, TypeError, OSError) as e:
+                raise ValueError(f"Invalid request on line {line_number}: {e}")
+            if first is None:
+                first = timestamp
+            yield TraceRecord(offset=timestamp - first, request=request,
+                              route=entry.get("route") or route_of(request.url.path))
+
+
+def route_of(path: str) -> str:
+    """
+    Turns a request path into its route by replacing the segments that look like
+    identifiers, e.g. '/users/42/orders/9f0c...' becomes '/users/{id}/orders/{uuid}'.
+    """
+    segments = []
+    for segment in path.split("/"):
+        for pattern, placeholder in ID_SEGMENTS:
+            if pattern.fullmatch(segment):
+                segment = placeholder
+                break
+        segments.append(segment)
+    return "/".join(segments)
+
+
+def retarget(url: str, target: str) -> str:
+    """
+    Replaces the scheme, host and port of a URL with those of `target`.
+    """
+    parts, base = urlsplit(url), urlsplit(target)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+
+def count_records(path: str) -> int:
+    """
+    Counts the lines of a trace without parsing them, for progress reporting.
+    """
+    count = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            count += chunk.count(b"\n")
+    return count
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def _body(entry: Dict[str, Any], directory: str) -> Optional[bytes]:
+    if entry.get("body_file"):
+        with open(os.path.join(directory, entry["body_file"]), "rb") as f:
+            return f.read()
+    if entry.get("body") is not None:
+        return str(entry["body"]).encode("utf-8")
+    return None
@@ -0,0 +1,297 @@
+import json
+import math
+import sqlite3
+import time
+from dataclasses import fields
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from slatency.domain.entities.response import FailedResponse, Response, SuccessfulResponse
+from slatency.domain.entities.response_columns import FAILURE_PHASES, NONE, PHASES, ResponseColumns
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.body import Body
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.flow import Flow
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.latency_report import LatencyReport
+from slatency.domain.value_objects.latency_statistics import LatencyStatistics
+from slatency.domain.value_objects.schedule import Schedule
+from slatency.domain.value_objects.url import URL
+from slatency.infrastructure.mappers.request_mapper import request_from_dict, request_to_dict
+
+STATISTICS = [statistic.name for statistic in fields(LatencyStatistics)]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tests (
+    test_id TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    host TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    expected_responses INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    successes INTEGER NOT NULL,
+    failures INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tests_saved_at ON tests (saved_at);
+CREATE INDEX IF NOT EXISTS tests_host ON tests (host, saved_at);
+CREATE INDEX IF NOT EXISTS tests_endpoint ON tests (endpoint, saved_at);
+
+CREATE TABLE IF NOT EXISTS responses (
+    test_id TEXT NOT NULL REFERENCES tests (test_id) ON DELETE CASCADE,
+    row INTEGER NOT NULL,
+    response_id BLOB NOT NULL,
+    status_code INTEGER,
+    failure_phase TEXT,
+    error_message TEXT,
+    {", ".join(f"{phase} REAL" for phase in PHASES)},
+    source_ip TEXT,
+    source_port INTEGER,
+    destination_ip TEXT,
+    destination_port INTEGER,
+    connection_reused INTEGER NOT NULL,
+    intended_start REAL,
+    actual_start REAL,
+    scheduling_lag REAL,
+    processing_lag REAL,
+    started_at REAL,
+    body_size INTEGER,
+    download_speed REAL,
+    body_checksum TEXT,
+    body_head BLOB,
+    PRIMARY KEY (test_id, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS responses_status ON responses (status_code, test_id);
+
+CREATE TABLE IF NOT EXISTS latency_reports (
+    test_id TEXT NOT NULL REFERENCES tests (test_id) ON DELETE CASCADE,
+    phase TEXT NOT NULL,
+    {", ".join(f"{statistic} REAL" for statistic in STATISTICS)},
+    PRIMARY KEY (test_id, phase)
+) WITHOUT ROWID;
+"""
+
+RESPONSE_COLUMNS = (["test_id", "row", "response_id", "status_code", "failure_phase", "error_message"] + PHASES +
+                    ["source_ip", "source_port", "destination_ip", "destination_port", "connection_reused",
+                     "intended_start", "actual_start", "scheduling_lag", "processing_lag", "started_at",
+                     "body_size", "download_speed", "body_checksum", "body_head"])
+
+
+class SqliteTestRepository:
+    """
+    A TestRepository backed by an embedded SQLite database.
+
+    Every Test is stored with its Request definition and its responses, one row per
+    probe, inserted in bulk straight from the ResponseColumns arrays. Saving a Test
+    also stores its LatencyReport, one row per phase, so that trends across runs
+    ("P99 TLS time for a host over the last 30 runs", see `latency_history`) are
+    answered from the indexed `tests` and `latency_reports` tables without reading
+    any probe. Saving a Test again replaces it.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def save(self, test: Test) -> None:
+        """
+        Stores the Test, its responses and its LatencyReport in one transaction.
+        """
+        responses = test.responses
+        if not isinstance(responses, ResponseColumns):
+            responses = ResponseColumns(responses)
+        # numpy is only needed when saving, not for the history queries
+        from slatency.infrastructure.services.numpy_latency_analysis_service import NumpyLatencyAnalysisService
+        report = NumpyLatencyAnalysisService().analyze(Test(request=test.request,
+                                                            expected_responses=test.expected_responses,
+                                                            responses=responses, test_id=test.test_id))
+        test_id = str(test.test_id)
+        successes = responses.successes()
+        with self._connection:
+            self._connection.execute("DELETE FROM tests WHERE test_id = ?", (test_id,))
+            self._connection.execute(
+                "INSERT INTO tests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (test_id, json.dumps(request_to_dict(test.request)), test.request.url.host,
+                 endpoint(test.request.url), test.expected_responses, time.time(), successes,
+                 len(responses) - successes),
+            )
+            self._connection.executemany(
+                f"INSERT INTO responses VALUES ({', '.join('?' * len(RESPONSE_COLUMNS))})",
+                _response_rows(test_id, responses),
+            )
+            self._connection.executemany(
+                f"INSERT INTO latency_reports VALUES ({', '.join('?' * (len(STATISTICS) + 2))})",
+                [(test_id, phase) + tuple(_nullable(getattr(getattr(report, phase), statistic))
+                                          for statistic in STATISTICS)
+                 for phase in PHASES],
+            )
+
+    def find_by_id(self, test_id: UUID) -> Optional[Test]:
+        row = self._connection.execute(
+            "SELECT test_id, request, expected_responses FROM tests WHERE test_id = ?", (str(test_id),)
+        ).fetchone()
+        return None if row is None else self._load(row)
+
+    def get_all(self) -> List[Test]:
+        rows = self._connection.execute(
+            "SELECT test_id, request, expected_responses FROM tests ORDER BY saved_at"
+        ).fetchall()
+        return [self._load(row) for row in rows]
+
+    def find_report(self, test_id: UUID) -> Optional[LatencyReport]:
+        """
+        Returns the LatencyReport stored with the Test, without reading its responses.
+        """
+        rows = self._connection.execute(
+            f"SELECT phase, {', '.join(STATISTICS)} FROM latency_reports WHERE test_id = ?", (str(test_id),)
+        ).fetchall()
+        if not rows:
+            return None
+        return LatencyReport(**{
+            phase: LatencyStatistics(**{statistic: _float(value) for statistic, value in zip(STATISTICS, values)})
+            for phase, *values in rows
+        })
+
+    def latency_history(self, phase: str, statistic: str = "p99", host: Optional[str] = None,
+                        endpoint: Optional[str] = None, limit: int = 30) -> List[Tuple[UUID, float, float]]:
+        """
+        Returns (test_id, saved_at, value) of one statistic of one phase for the last
+        `limit` runs, newest first, optionally restricted to a host or an endpoint.
+        """
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase '{phase}', expected one of {', '.join(PHASES)}")
+        if statistic not in STATISTICS:
+            raise ValueError(f"Unknown statistic '{statistic}', expected one of {', '.join(STATISTICS)}")
+        conditions, parameters = ["r.phase = ?"], [phase]
+        if host is not None:
+            conditions.append("t.host = ?")
+            parameters.append(host)
+        if endpoint is not None:
+            conditions.append("t.endpoint = ?")
+            parameters.append(endpoint)
+        rows = self._connection.execute(
+            f"SELECT t.test_id, t.saved_at, r.{statistic} FROM tests t "
+            f"JOIN latency_reports r ON r.test_id = t.test_id "
+            f"WHERE {' AND '.join(conditions)} ORDER BY t.saved_at DESC LIMIT ?",
+            parameters + [limit],
+        ).fetchall()
+        return [(UUID(test_id), saved_at, _float(value)) for test_id, saved_at, value in rows]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _load(self, row: Tuple[str, str, int]) -> Test:
+        test_id, request, expected_responses = row
+        responses = ResponseColumns()
+        cursor = self._connection.execute(
+            f"SELECT {', '.join(RESPONSE_COLUMNS[2:])} FROM responses WHERE test_id = ? ORDER BY row", (test_id,)
+        )
+        responses.extend(_row_to_response(values) for values in cursor)
+        return Test(request=request_from_dict(json.loads(request)), expected_responses=expected_responses,
+                    responses=responses, test_id=UUID(test_id))
+
+    def __enter__(self) -> "SqliteTestRepository":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def endpoint(url: URL) -> str:
+    """
+    The URL a Test probes without its query string, the key runs are compared by.
+    """
+    return f"{url.protocol}://{url.host}:{url.port}{url.path}"
+
+
+def _response_rows(test_id: str, responses: ResponseColumns) -> Iterable[tuple]:
+    timings = [responses.timings[phase] for phase in PHASES]
+    for row in range(len(responses)):
+        phase = responses.failure_phase[row]
+        status_code = responses.status_code[row]
+        flow = responses.flows[responses.flow[row]] if responses.flow[row] != NONE else None
+        error = responses.error_message[row]
+        yield (
+            test_id, row, responses.response_id(row).bytes,
+            None if status_code == NONE else status_code,
+            None if phase == NONE else FAILURE_PHASES[phase].value,
+            None if error == NONE else responses.error_messages[error],
+            *(_nullable(round(column[row], 3)) for column in timings),
+            *((flow.source_ip, flow.source_port, flow.destination_ip, flow.destination_port)
+              if flow is not None else (None, None, None, None)),
+            responses.connection_reused[row],
+            *(_nullable(responses.cell(column, row))
+              for column in ("intended_start", "actual_start", "scheduling_lag", "processing_lag", "started_at")),
+            *_body_columns(responses, row),
+        )
+
+
+def _body_columns(responses: ResponseColumns, row: int) -> tuple:
+    size = responses.cell("body_size", row)
+    if math.isnan(size):
+        return None, None, None, None
+    checksum, head = responses.cell("checksum", row), responses.cell("body_head", row)
+    return (int(size), responses.download_speed[row],
+            None if checksum == NONE else responses.checksums[checksum],
+            None if head == NONE else responses.body_heads[head])
+
+
+def _row_to_response(values: tuple) -> Response:
+    response_id, status_code, failure_phase, error_message = values[:4]
+    timings = values[4:4 + len(PHASES)]
+    (source_ip, source_port, destination_ip, destination_port, connection_reused,
+     intended_start, actual_start, scheduling_lag, processing_lag, started_at,
+     body_size, download_speed, body_checksum, body_head) = values[4 + len(PHASES):]
+    schedule = None
+    if intended_start is not None:
+        schedule = Schedule(intended_start=intended_start, actual_start=actual_start)
+    client_timing = None
+    if scheduling_lag is not None:
+        client_timing = ClientTiming(scheduling_lag=scheduling_lag, processing_lag=processing_lag)
+    body = None
+    if body_size is not None:
+        body = Body(size=body_size, download_speed=download_speed, checksum=body_checksum, head=body_head)
+    # Failed responses have timings and a flow only if libcurl got that far
+    latency = None
+    if timings[-1] is not None:
+        latency = Latency(**{phase: _float(value) for phase, value in zip(PHASES, timings)})
+    flow = None
+    if destination_ip is not None:
+        flow = Flow(source_ip=source_ip, source_port=source_port, destination_ip=destination_ip,
+                    destination_port=destination_port)
+    if failure_phase is not None:
+        return FailedResponse(
+            failure_phase=FailurePhase(failure_phase),
+            error_message=error_message,
+            status_code=status_code,
+            latency=latency,
+            flow=flow,
+            schedule=schedule,
+            client_timing=client_timing,
+            started_at=started_at,
+            body=body,
+            response_id=UUID(bytes=response_id),
+        )
+    return SuccessfulResponse(
+        status_code=status_code,
+        latency=latency,
+        flow=flow,
+        connection_reused=bool(connection_reused),
+        schedule=schedule,
+        client_timing=client_timing,
+        started_at=started_at,
+        body=body,
+        response_id=UUID(bytes=response_id),
+    )
+
+
+def _nullable(value: float) -> Optional[float]:
+    # SQLite has no NaN, missing values are NULL
+    return None if math.isnan(value) else value
+
+
+def _float(value: Optional[float]) -> float:
+    return math.nan if value is None else value
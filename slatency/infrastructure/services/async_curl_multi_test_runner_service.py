@@ -0,0 +1,185 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import pycurl
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.schedule import Schedule
+from slatency.infrastructure.curl.handle_setup import create_handle, create_share, default_ca_info
+from slatency.infrastructure.curl.response_reader import read_response
+
+
+class AsyncCurlMultiTestRunnerService:
+    """
+    An asyncio-native test runner. libcurl's socket and timer callbacks are hooked into
+    the running event loop, so thousands of probes can be in flight without threads
+    and without blocking other coroutines.
+
+    `execute(test)` is the awaitable counterpart of TestRunnerService.execute, and
+    `iter_responses(test)` yields responses as they complete. Concurrency, warm mode
+    and open-loop `rate` behave as in CurlMultiTestRunnerService.
+    """
+    def __init__(self, concurrency: int = 1, ca_info: Optional[str] = None, reuse_connections: bool = False,
+                 rate: Optional[float] = None):
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be a positive integer")
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate must be a positive number")
+        self.concurrency = concurrency
+        self.ca_info = ca_info if ca_info is not None else default_ca_info()
+        self.reuse_connections = reuse_connections
+        self.rate = rate
+
+    async def execute(self, test: Test) -> Test:
+        """
+        Executes the test based on its `expected_responses` attribute.
+        """
+        async for response in self.iter_responses(test):
+            test.responses.append(response)
+        return test
+
+    async def iter_responses(self, test: Test) -> AsyncIterator[Response]:
+        """
+        Runs the test and yields each response as soon as its transfer completes.
+        The responses are not added to `test.responses`.
+        """
+        total = test.expected_responses - len(test.responses)
+        session = _Session(self, test, total, asyncio.get_running_loop())
+        try:
+            session.start()
+            for _ in range(total):
+                item = await session.completed.get()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            session.close()
+
+
+class _Session:
+    """
+    The state of one run: the multi handle, the event loop registrations and the
+    queue completed responses are delivered through.
+    """
+    def __init__(self, runner: AsyncCurlMultiTestRunnerService, test: Test, total: int,
+                 loop: asyncio.AbstractEventLoop):
+        self.runner = runner
+        self.test = test
+        self.loop = loop
+        self.remaining = total
+        self.started = 0
+        self.completed: "asyncio.Queue[Union[Response, BaseException]]" = asyncio.Queue()
+        self.multi = pycurl.CurlMulti()
+        self.multi.setopt(pycurl.M_SOCKETFUNCTION, self._on_socket)
+        self.multi.setopt(pycurl.M_TIMERFUNCTION, self._on_timer)
+        self.share = create_share() if runner.reuse_connections else None
+        self.in_flight: List[pycurl.Curl] = []
+        self.idle: List[pycurl.Curl] = []
+        self.schedules: Dict[pycurl.Curl, Schedule] = {}
+        self.started_at: Dict[pycurl.Curl, float] = {}
+        self.readers: Dict[int, int] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.fill_timer: Optional[asyncio.TimerHandle] = None
+        self.start_time = loop.time()
+
+    def start(self) -> None:
+        self._fill()
+
+    def close(self) -> None:
+        for fd in list(self.readers):
+            self._unwatch(fd)
+        for timer in (self.timer, self.fill_timer):
+            if timer is not None:
+                timer.cancel()
+        for handle in self.in_flight:
+            self.multi.remove_handle(handle)
+        for handle in self.in_flight + self.idle:
+            handle.close()
+        self.in_flight.clear()
+        self.idle.clear()
+        self.multi.close()
+        if self.share is not None:
+            self.share.close()
+
+    def _fill(self) -> None:
+        """
+        Starts as many probes as the concurrency and, in open-loop mode, the schedule allow.
+        """
+        self.fill_timer = None
+        while self.remaining > 0 and len(self.in_flight) < self.runner.concurrency:
+            elapsed_ms = (self.loop.time() - self.start_time) * 1000.0
+            intended_ms = self.started * 1000.0 / self.runner.rate if self.runner.rate is not None else None
+            if intended_ms is not None and intended_ms > elapsed_ms:
+                self.fill_timer = self.loop.call_later((intended_ms - elapsed_ms) / 1000.0, self._guarded, self._fill)
+                return
+            handle = self.idle.pop() if self.idle else create_handle(self.test.request, self.runner.ca_info, self.share)
+            self.multi.add_handle(handle)
+            self.in_flight.append(handle)
+            self.started_at[handle] = time.time()
+            if intended_ms is not None:
+                self.schedules[handle] = Schedule(intended_start=intended_ms, actual_start=elapsed_ms)
+            self.started += 1
+            self.remaining -= 1
+
+    def _on_socket(self, what: int, fd: int, multi: pycurl.CurlMulti, socketp) -> None:
+        self._unwatch(fd)
+        if what == pycurl.POLL_REMOVE:
+            return
+        if what in (pycurl.POLL_IN, pycurl.POLL_INOUT):
+            self.loop.add_reader(fd, self._guarded, self._action, fd, pycurl.CSELECT_IN)
+        if what in (pycurl.POLL_OUT, pycurl.POLL_INOUT):
+            self.loop.add_writer(fd, self._guarded, self._action, fd, pycurl.CSELECT_OUT)
+        self.readers[fd] = what
+
+    def _unwatch(self, fd: int) -> None:
+        what = self.readers.pop(fd, None)
+        if what in (pycurl.POLL_IN, pycurl.POLL_INOUT):
+            self.loop.remove_reader(fd)
+        if what in (pycurl.POLL_OUT, pycurl.POLL_INOUT):
+            self.loop.remove_writer(fd)
+
+    def _on_timer(self, timeout_ms: int) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if timeout_ms >= 0:
+            self.timer = self.loop.call_later(timeout_ms / 1000.0, self._guarded, self._action,
+                                              pycurl.SOCKET_TIMEOUT, 0)
+
+    def _action(self, fd: int, event: int) -> None:
+        while True:
+            ret, _ = self.multi.socket_action(fd, event)
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+        self._drain()
+
+    def _drain(self) -> None:
+        while True:
+            queued, succeeded, failed = self.multi.info_read()
+            for handle in succeeded:
+                self._finish(handle, read_response(handle, schedule=self.schedules.pop(handle, None),
+                                                   started_at=self.started_at.pop(handle)))
+            for handle, errno, errmsg in failed:
+                self._finish(handle, read_response(handle, errno, errmsg, self.schedules.pop(handle, None),
+                                                   started_at=self.started_at.pop(handle)))
+            if queued == 0:
+                break
+        self._fill()
+
+    def _finish(self, handle: pycurl.Curl, response: Response) -> None:
+        self.multi.remove_handle(handle)
+        self.in_flight.remove(handle)
+        if self.runner.reuse_connections:
+            self.idle.append(handle)
+        else:
+            handle.close()
+        self.completed.put_nowait(response)
+
+    def _guarded(self, callback, *args) -> None:
+        # Event loop callbacks cannot raise to the iterator, hand errors over through the queue
+        try:
+            callback(*args)
+        except Exception as e:
+            self.completed.put_nowait(e)
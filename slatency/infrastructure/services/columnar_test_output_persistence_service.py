@@ -0,0 +1,118 @@
+import os
+from typing import Any, Dict, List
+
+import numpy as np
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.infrastructure.columnar.columnar_format import (NO_ERROR, column_layout, column_offsets, pack_header,
+                                                              pack_trailer)
+from slatency.infrastructure.mappers.response_mapper import error_category, response_to_result
+
+
+class ColumnarTestOutputPersistenceService:
+    """
+    A TestOutputPersistenceService that writes a binary, column-oriented results file
+    (see `columnar_format`): fixed-width numeric columns for the libcurl timings and
+    `http_code`, and a dictionary-encoded `error` column. With `include_body` the
+    body size and download speed get columns too. Errors are stored by category (see
+    `error_category`): libcurl's messages name hosts and durations, which would grow
+    the dictionary with every probe, so the file keeps the error code and libcurl's
+    description but not the full message.
+
+    The file is preallocated for `capacity` results and filled in place through a
+    memory map, so results can be appended as they complete. The header's row count
+    and the error dictionary are rewritten on every flush, which keeps an interrupted
+    run readable up to its last flush.
+    """
+    def __init__(self, path: str, capacity: int, include_schedule: bool = False, include_body: bool = False,
+                 flush_every: int = 4096):
+        if capacity <= 0:
+            raise ValueError("Capacity must be a positive integer")
+        self.path = path
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self._columns = column_layout(include_schedule, include_body)
+        offsets, self._trailer_offset = column_offsets(self._columns, capacity)
+        with open(path, "wb") as f:
+            f.truncate(self._trailer_offset)
+        self._map = np.memmap(path, dtype=np.uint8, mode="r+")
+        self._arrays = {
+            name: self._map[offsets[name]:offsets[name] + capacity * np.dtype(dtype).itemsize].view(dtype)
+            for name, dtype in self._columns
+        }
+        self._errors: Dict[str, int] = {}
+        self._rows = 0
+        self._closed = False
+        self.flush()
+
+    def save(self, test: Test) -> None:
+        """
+        Saves the Test object to a persistent storage.
+        """
+        for response in test.responses:
+            self.append(response)
+        self.flush()
+
+    def append(self, response: Response) -> None:
+        """
+        Writes one response into the next row.
+        """
+        self.append_result(response_to_result(response))
+
+    def append_result(self, result: Dict[str, Any]) -> None:
+        """
+        Writes one result dictionary, as produced by main.py, into the next row.
+        """
+        if self._rows >= self.capacity:
+            raise ValueError(f"Columnar file '{self.path}' is full ({self.capacity} rows)")
+        row = self._rows
+        for name, _ in self._columns:
+            self._arrays[name][row] = self._encode(name, result)
+        self._rows += 1
+        if self._rows % self.flush_every == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Publishes the rows written so far by updating the trailer and the header.
+        """
+        trailer = pack_trailer(self._columns, self._error_dictionary())
+        self._map.flush()
+        with open(self.path, "r+b") as f:
+            f.seek(self._trailer_offset)
+            f.write(trailer)
+            f.truncate()
+            f.seek(0)
+            f.write(pack_header(self.capacity, self._rows, self._trailer_offset, len(trailer)))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        del self._arrays
+        del self._map
+        self._closed = True
+
+    def _encode(self, name: str, result: Dict[str, Any]) -> Any:
+        value = result.get(name)
+        if name == "error":
+            if value is None:
+                return NO_ERROR
+            return self._errors.setdefault(error_category(value), len(self._errors))
+        if name == "connectionReused":
+            return 1 if value else 0
+        if name == "http_code":
+            return -1 if value is None else value
+        return np.nan if value is None else value
+
+    def _error_dictionary(self) -> List[str]:
+        return sorted(self._errors, key=self._errors.get)
+
+    def __enter__(self) -> "ColumnarTestOutputPersistenceService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
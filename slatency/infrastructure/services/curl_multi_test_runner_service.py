@@ -0,0 +1,228 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import pycurl
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.client_timing import ClientTiming
+from slatency.domain.value_objects.schedule import Schedule
+from slatency.infrastructure.analysis.client_saturation_monitor import ClientSaturationMonitor
+from slatency.infrastructure.curl.handle_setup import (configure_multiplexed_multi, create_handle, create_share,
+                                                       default_ca_info)
+from slatency.infrastructure.curl.response_reader import read_response
+
+
+class CurlMultiTestRunnerService:
+    """
+    A TestRunnerService that drives a pycurl.CurlMulti, keeping up to `concurrency`
+    transfers in flight until the Test has received `expected_responses` responses.
+    Responses are appended to `Test.responses` in completion order.
+
+    By default every probe is cold: a fresh handle, connection, DNS lookup and TLS
+    handshake. With `reuse_connections` the runner is warm: finished handles are
+    re-added to the multi instead of being re-created, connections are kept alive,
+    and the DNS cache, TLS sessions and connection pool are shared through a
+    pycurl.CurlShare.
+
+    Without a `rate` the runner is closed-loop: a probe starts as soon as a slot frees
+    up. With a `rate` (probes per second) it is open-loop: probe N is due at N / rate
+    seconds whether or not earlier probes have finished, and each response records its
+    intended and actual send time so the queueing delay is not silently omitted.
+
+    `on_response` is called with every response as it completes. With `keep_responses`
+    set to False responses are only handed to `on_response`, which keeps memory bounded
+    for long runs; `Test.responses` then stays empty.
+
+    With a `monitor` the runner instruments itself: every response gets a ClientTiming
+    and the monitor collects the client's lags, callback time, CPU use and backlog.
+
+    With `multiplex_connections` the probes are HTTP/2 streams multiplexed over that
+    many connections, `concurrency` streams in flight in total and at most
+    concurrency / multiplex_connections on each connection. A probe waits for a free
+    stream rather than opening a socket of its own, so the Request should ask for
+    HTTP/2. Each response still records its own timings, and its Flow names the
+    connection it rode on.
+
+    `stop_when` is asked before every probe is started; once it returns True no more
+    probes are started and the runner returns when the probes in flight have finished,
+    possibly short of `expected_responses`.
+    """
+    def __init__(self, concurrency: int = 1, select_timeout: float = 1.0, ca_info: Optional[str] = None,
+                 reuse_connections: bool = False, rate: Optional[float] = None,
+                 on_response: Optional[Callable[[Response], None]] = None, keep_responses: bool = True,
+                 monitor: Optional[ClientSaturationMonitor] = None, stop_when: Optional[Callable[[], bool]] = None,
+                 multiplex_connections: Optional[int] = None):
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be a positive integer")
+        if multiplex_connections is not None and multiplex_connections <= 0:
+            raise ValueError("Multiplexed connections must be a positive integer")
+        if rate is not None and rate <= 0:
+            raise ValueError("Rate must be a positive number")
+        self.concurrency = concurrency
+        self.select_timeout = select_timeout
+        self.ca_info = ca_info if ca_info is not None else default_ca_info()
+        self.reuse_connections = reuse_connections
+        self.rate = rate
+        self.on_response = on_response
+        self.keep_responses = keep_responses
+        self.monitor = monitor
+        self.stop_when = stop_when
+        self.multiplex_connections = multiplex_connections
+
+    def execute(self, test: Test) -> Test:
+        """
+        Executes the test based on its `expected_responses` attribute.
+        """
+        multi = pycurl.CurlMulti()
+        multiplexed = self.multiplex_connections is not None
+        if multiplexed:
+            configure_multiplexed_multi(multi, self.multiplex_connections,
+                                        math.ceil(self.concurrency / self.multiplex_connections))
+        share = create_share() if self.reuse_connections and not multiplexed else None
+        in_flight: List[pycurl.Curl] = []
+        idle: List[pycurl.Curl] = []
+        schedules: Dict[pycurl.Curl, Schedule] = {}
+        # Wall-clock start of every probe in flight
+        started_at: Dict[pycurl.Curl, float] = {}
+        remaining = test.expected_responses - len(test.responses)
+        started = 0
+        test_start = time.monotonic()
+        monitor = self.monitor
+        # With a monitor: when each slot became free, and when and how late each handle started
+        free_slots: Deque[float] = deque([test_start] * self.concurrency)
+        starts: Dict[pycurl.Curl, Tuple[float, float]] = {}
+        perform, collect, wait = self._perform, self._collect, self._wait
+        if monitor is not None:
+            monitor.start()
+            if monitor.profile:
+                perform = monitor.timed("perform", perform)
+                collect = monitor.timed("collect", collect)
+                wait = monitor.timed("wait", wait)
+        try:
+            while remaining > 0 or in_flight:
+                while remaining > 0 and len(in_flight) < self.concurrency:
+                    if self.stop_when is not None and self.stop_when():
+                        remaining = 0
+                        break
+                    intended_ms = self._intended_start(started)
+                    if intended_ms is not None and intended_ms > (time.monotonic() - test_start) * 1000.0:
+                        break
+                    handle = idle.pop() if idle else create_handle(test.request, self.ca_info, share, multiplexed)
+                    multi.add_handle(handle)
+                    in_flight.append(handle)
+                    started_at[handle] = time.time()
+                    now = time.monotonic()
+                    if intended_ms is not None:
+                        schedules[handle] = Schedule(intended_start=intended_ms, actual_start=(now - test_start) * 1000.0)
+                    if monitor is not None:
+                        due = test_start + intended_ms / 1000.0 if intended_ms is not None else test_start
+                        starts[handle] = (now, (now - max(due, free_slots.popleft())) * 1000.0)
+                    started += 1
+                    remaining -= 1
+                if monitor is not None and self.rate is not None and remaining > 0:
+                    due_probes = int((time.monotonic() - test_start) * self.rate) + 1
+                    monitor.record_overdue(min(due_probes - started, remaining))
+
+                perform(multi)
+                if not collect(multi, test, in_flight, idle, schedules, started_at, starts, free_slots):
+                    wait(multi, in_flight, self._wait_timeout(started, remaining, in_flight, test_start))
+        finally:
+            if monitor is not None:
+                monitor.stop()
+            for handle in in_flight:
+                multi.remove_handle(handle)
+            for handle in in_flight + idle:
+                handle.close()
+            multi.close()
+            if share is not None:
+                share.close()
+        return test
+
+    def _intended_start(self, index: int) -> Optional[float]:
+        """
+        Returns when probe `index` is due in open-loop mode, in milliseconds since the test started.
+        """
+        if self.rate is None:
+            return None
+        return index * 1000.0 / self.rate
+
+    def _wait_timeout(self, started: int, remaining: int, in_flight: List[pycurl.Curl], test_start: float) -> float:
+        intended_ms = self._intended_start(started)
+        if intended_ms is None or remaining == 0 or len(in_flight) >= self.concurrency:
+            return self.select_timeout
+        due_in = intended_ms / 1000.0 - (time.monotonic() - test_start)
+        return min(max(due_in, 0.0), self.select_timeout)
+
+    def _wait(self, multi: pycurl.CurlMulti, in_flight: List[pycurl.Curl], timeout: float) -> None:
+        if in_flight:
+            multi.select(timeout)
+        elif timeout > 0:
+            time.sleep(timeout)
+
+    def _perform(self, multi: pycurl.CurlMulti) -> None:
+        while True:
+            ret, _ = multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+    def _collect(self, multi: pycurl.CurlMulti, test: Test, in_flight: List[pycurl.Curl],
+                 idle: List[pycurl.Curl], schedules: Dict[pycurl.Curl, Schedule], started_at: Dict[pycurl.Curl, float],
+                 starts: Dict[pycurl.Curl, Tuple[float, float]], free_slots: Deque[float]) -> int:
+        """
+        Records every finished transfer and returns how many finished.
+        """
+        finished = 0
+        while True:
+            queued, succeeded, failed = multi.info_read()
+            for handle in succeeded:
+                client_timing = self._client_timing(handle, starts)
+                self._record(test, read_response(handle, schedule=schedules.pop(handle, None),
+                                                 client_timing=client_timing, started_at=started_at.pop(handle)))
+                self._release(multi, handle, in_flight, idle, free_slots)
+            for handle, errno, errmsg in failed:
+                client_timing = self._client_timing(handle, starts)
+                self._record(test, read_response(handle, errno, errmsg, schedules.pop(handle, None), client_timing,
+                                                 started_at.pop(handle)))
+                self._release(multi, handle, in_flight, idle, free_slots)
+            finished += len(succeeded) + len(failed)
+            if queued == 0:
+                if finished and self.monitor is not None:
+                    self.monitor.record_drain(finished)
+                return finished
+
+    def _client_timing(self, handle: pycurl.Curl, starts: Dict[pycurl.Curl, Tuple[float, float]]) -> Optional[ClientTiming]:
+        """
+        With a monitor, measures how late the probe started and how long its finished
+        transfer waited for the runner, which libcurl's own timings do not show.
+        """
+        if self.monitor is None:
+            return None
+        started_at, scheduling_lag = starts.pop(handle)
+        finished_at = started_at + handle.getinfo(pycurl.TOTAL_TIME_T) / 1_000_000.0
+        processing_lag = max(time.monotonic() - finished_at, 0.0) * 1000.0
+        self.monitor.record_probe(handle.getinfo(pycurl.QUEUE_TIME_T) / 1000.0, scheduling_lag, processing_lag)
+        return ClientTiming(scheduling_lag=scheduling_lag, processing_lag=processing_lag)
+
+    def _record(self, test: Test, response: Response) -> None:
+        if self.monitor is not None:
+            callback_start = time.perf_counter()
+        if self.keep_responses:
+            test.responses.append(response)
+        if self.on_response is not None:
+            self.on_response(response)
+        if self.monitor is not None:
+            self.monitor.record_callback(time.perf_counter() - callback_start)
+
+    def _release(self, multi: pycurl.CurlMulti, handle: pycurl.Curl, in_flight: List[pycurl.Curl],
+                 idle: List[pycurl.Curl], free_slots: Deque[float]) -> None:
+        multi.remove_handle(handle)
+        in_flight.remove(handle)
+        if self.monitor is not None:
+            free_slots.append(time.monotonic())
+        if self.reuse_connections or self.multiplex_connections is not None:
+            idle.append(handle)
+        else:
+            handle.close()
@@ -0,0 +1,179 @@
+import queue
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.latency_report import LatencyReport
+from slatency.infrastructure.distributed.wire_protocol import (AGGREGATE, BATCH, DONE, ERROR, HEARTBEAT, JOB, recv_frame,
+                                                               send_frame)
+from slatency.infrastructure.mappers.request_mapper import request_to_dict
+from slatency.infrastructure.mappers.response_codec import decode_response
+from slatency.infrastructure.services.sharding import split_evenly
+from slatency.infrastructure.services.sketch_latency_analysis_service import SketchLatencyAnalysisService
+
+
+@dataclass
+class _Job:
+    worker: str
+    assigned: int
+    received: int = 0
+    thread: Optional[threading.Thread] = None
+
+
+class DistributedTestRunnerService:
+    """
+    A TestRunnerService acting as coordinator: it splits a Test across remote
+    WorkerServers (given as "host:port"), collects the results they stream back and
+    combines them into one Test and one LatencyReport, with a per-worker breakdown.
+
+    `concurrency` and `rate` are totals, split evenly across the workers. With
+    `stream_responses` every response is shipped and lands in `Test.responses` and
+    `on_response`; without it workers only ship partial aggregates, which is all
+    `report()` needs. When a worker fails, the results it already delivered are kept,
+    the error is recorded in `worker_errors` and its unfinished probes are handed to
+    the workers that are still healthy; `missing` counts probes nobody could run.
+    A worker that sends nothing, not even a heartbeat, for `idle_timeout` seconds
+    counts as failed.
+    """
+    def __init__(self, workers: List[str], concurrency: int = 1, rate: Optional[float] = None,
+                 reuse_connections: bool = False, on_response: Optional[Callable[[Response], None]] = None,
+                 keep_responses: bool = True, stream_responses: bool = True, connect_timeout: float = 5.0,
+                 idle_timeout: float = 10.0):
+        if not workers:
+            raise ValueError("At least one worker is required")
+        if concurrency < len(workers):
+            raise ValueError("Concurrency must be at least the number of workers")
+        self.workers = list(workers)
+        self.concurrency = concurrency
+        self.rate = rate
+        self.reuse_connections = reuse_connections
+        self.on_response = on_response
+        self.keep_responses = keep_responses
+        self.stream_responses = stream_responses
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.analysis = SketchLatencyAnalysisService()
+        self.worker_analyses: Dict[str, SketchLatencyAnalysisService] = {}
+        self.worker_errors: Dict[str, str] = {}
+        self.missing = 0
+
+    def execute(self, test: Test) -> Test:
+        """
+        Executes the test based on its `expected_responses` attribute.
+        """
+        concurrency_shares = split_evenly(self.concurrency, len(self.workers))
+        options = {
+            worker: {
+                "concurrency": concurrency_shares[i],
+                "rate": self.rate / len(self.workers) if self.rate is not None else None,
+                "reuse_connections": self.reuse_connections,
+            }
+            for i, worker in enumerate(self.workers)
+        }
+        for worker in self.workers:
+            self.worker_analyses.setdefault(worker, SketchLatencyAnalysisService())
+
+        messages: "queue.Queue[Tuple[int, str, object]]" = queue.Queue()
+        active: Dict[str, _Job] = {}
+        idle = list(self.workers)
+        pending = test.expected_responses - len(test.responses)
+        while True:
+            if pending > 0 and idle:
+                for worker, shard in zip(list(idle), split_evenly(pending, len(idle))):
+                    if shard == 0:
+                        continue
+                    idle.remove(worker)
+                    active[worker] = _Job(worker=worker, assigned=shard,
+                                          thread=self._start(test, worker, shard, options[worker], messages))
+                    pending -= shard
+            if not active:
+                break
+
+            try:
+                kind, worker, payload = messages.get(timeout=1.0)
+            except queue.Empty:
+                # Every job thread reports its end before exiting, one that exited silently crashed
+                for worker, job in list(active.items()):
+                    if not job.thread.is_alive():
+                        del active[worker]
+                        self.worker_errors[worker] = "Job thread exited without a result"
+                        pending += max(job.assigned - job.received, 0)
+                continue
+            job = active[worker]
+            if kind == BATCH:
+                for encoded in payload:
+                    self._record(test, worker, decode_response(encoded))
+                job.received += len(payload)
+            elif kind == AGGREGATE:
+                partial = SketchLatencyAnalysisService.from_dict(payload)
+                self.analysis.merge(partial)
+                self.worker_analyses[worker].merge(partial)
+                job.received += partial.successes + sum(partial.failures.values())
+            elif kind == DONE:
+                del active[worker]
+                idle.append(worker)
+                pending += max(job.assigned - job.received, 0)
+            elif kind == ERROR:
+                del active[worker]
+                self.worker_errors[worker] = payload
+                pending += max(job.assigned - job.received, 0)
+        self.missing = pending
+        return test
+
+    def report(self) -> LatencyReport:
+        return self.analysis.report()
+
+    def worker_reports(self) -> Dict[str, LatencyReport]:
+        return {worker: analysis.report() for worker, analysis in self.worker_analyses.items()}
+
+    def _start(self, test: Test, worker: str, shard: int, options: Dict, messages: queue.Queue) -> threading.Thread:
+        job = {
+            "request": request_to_dict(test.request),
+            "expected_responses": shard,
+            "options": options,
+            "stream_responses": self.stream_responses,
+        }
+        thread = threading.Thread(target=self._run_job, args=(worker, job, messages), daemon=True)
+        thread.start()
+        return thread
+
+    def _run_job(self, worker: str, job: Dict, messages: queue.Queue) -> None:
+        """
+        Talks to one worker for one job, forwarding its frames to the coordinator loop.
+        Every job ends with exactly one DONE or ERROR message, an ERROR as well when
+        the worker stays silent for `idle_timeout` seconds.
+        """
+        host, _, port = worker.rpartition(":")
+        try:
+            with socket.create_connection((host, int(port)), timeout=self.connect_timeout) as sock:
+                sock.settimeout(self.idle_timeout)
+                send_frame(sock, JOB, job)
+                while True:
+                    frame = recv_frame(sock)
+                    if frame is None:
+                        raise ConnectionError("Worker closed the connection before finishing the job")
+                    kind, payload = frame
+                    if kind == HEARTBEAT:
+                        continue
+                    if kind == ERROR:
+                        messages.put((ERROR, worker, payload.get("message", "Unknown worker error")))
+                        return
+                    messages.put((kind, worker, payload))
+                    if kind == DONE:
+                        return
+        except socket.timeout:
+            messages.put((ERROR, worker, f"Worker sent nothing for {self.idle_timeout:g}s"))
+        except (OSError, ValueError) as e:
+            messages.put((ERROR, worker, f"{type(e).__name__}: {e}"))
+
+    def _record(self, test: Test, worker: str, response: Response) -> None:
+        self.analysis.record(response)
+        self.worker_analyses[worker].record(response)
+        if self.keep_responses:
+            test.responses.append(response)
+        if self.on_response is not None:
+            self.on_response(response)
+
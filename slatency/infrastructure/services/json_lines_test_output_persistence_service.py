@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.infrastructure.mappers.response_mapper import response_to_result
+
+
+class JsonLinesTestOutputPersistenceService:
+    """
+    A TestOutputPersistenceService that writes one compact JSON object per line.
+    Results can be appended as each response completes, so memory stays bounded and
+    an interrupted run keeps everything written up to its last flush.
+
+    Lines are buffered and written in batches of `batch_size`. Unless
+    `fsync_interval` is None, a background thread also writes the pending lines and
+    fsyncs the file every `fsync_interval` seconds, so the results of a slow or
+    stalled run reach the disk within that interval whether or not more results
+    arrive. The file is always fsync'ed on close.
+    """
+    def __init__(self, path: str, batch_size: int = 256, fsync_interval: float = 1.0, append: bool = False):
+        if batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer")
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+        self._pending: List[str] = []
+        self._unsynced = False
+        # Results are appended from the probing thread and flushed from the timer's too
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._timer = None
+        if fsync_interval is not None:
+            self._timer = threading.Thread(target=self._flush_periodically, name="slatency-jsonl-flush", daemon=True)
+            self._timer.start()
+
+    def save(self, test: Test) -> None:
+        """
+        Saves the Test object to a persistent storage.
+        """
+        for response in test.responses:
+            self.append(response)
+        self.flush()
+
+    def append(self, response: Response) -> None:
+        """
+        Queues one response for writing.
+        """
+        self.append_result(response_to_result(response))
+
+    def append_result(self, result: Dict[str, Any]) -> None:
+        """
+        Queues one result dictionary, as produced by main.py, for writing.
+        """
+        line = json.dumps(result, separators=(",", ":"))
+        with self._lock:
+            self._pending.append(line)
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def flush(self) -> None:
+        """
+        Writes the pending lines and, unless `fsync_interval` is None, fsyncs what was
+        written since the last fsync.
+        """
+        with self._lock:
+            self._write_pending()
+            if self.fsync_interval is not None and self._unsynced:
+                self._fsync()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._closing.set()
+        if self._timer is not None:
+            self._timer.join()
+        with self._lock:
+            self._write_pending()
+            self._fsync()
+            self._file.close()
+
+    def _flush_periodically(self) -> None:
+        while not self._closing.wait(self.fsync_interval):
+            self.flush()
+
+    def _write_pending(self) -> None:
+        if self._pending:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._pending.clear()
+            self._file.flush()
+            self._unsynced = True
+
+    def _fsync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = False
+
+    def __enter__(self) -> "JsonLinesTestOutputPersistenceService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
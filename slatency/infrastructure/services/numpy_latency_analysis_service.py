@@ -0,0 +1,51 @@
+from typing import Dict
+
+import numpy as np
+
+from slatency.domain.entities.response_columns import NONE, PHASES, ResponseColumns
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.latency_report import LatencyReport
+from slatency.domain.value_objects.latency_statistics import LatencyStatistics
+
+
+class NumpyLatencyAnalysisService:
+    """
+    A LatencyAnalysisService computing exact statistics with NumPy.
+
+    The typed arrays of the Test's ResponseColumns are wrapped without copying, so no
+    response object is materialised; any other sequence of responses is converted to
+    columns first. Percentiles use linear interpolation, like pandas' `quantile`.
+    """
+    def __init__(self):
+        self.failures: Dict[FailurePhase, int] = {phase: 0 for phase in FailurePhase}
+
+    def analyze(self, test: Test) -> LatencyReport:
+        """
+        Analyzes the responses in a Test object and returns a LatencyReport.
+        """
+        responses = test.responses
+        if not isinstance(responses, ResponseColumns):
+            responses = ResponseColumns(responses)
+        failure_phases = np.frombuffer(responses.failure_phase, dtype=np.int8)
+        successful = failure_phases == NONE
+        counts = np.bincount(failure_phases[~successful], minlength=len(FailurePhase))
+        self.failures = {phase: int(count) for phase, count in zip(FailurePhase, counts)}
+        return LatencyReport(**{
+            phase: self._statistics(np.frombuffer(responses.timings[phase], dtype=np.float32)[successful].astype(np.float64).round(3))
+            for phase in PHASES
+        })
+
+    def _statistics(self, values: np.ndarray) -> LatencyStatistics:
+        if not len(values):
+            nan = float("nan")
+            return LatencyStatistics(min=nan, max=nan, average=nan, p90=nan, p95=nan, p99=nan)
+        p90, p95, p99 = np.percentile(values, [90, 95, 99])
+        return LatencyStatistics(
+            min=float(values.min()),
+            max=float(values.max()),
+            average=float(values.mean()),
+            p90=float(p90),
+            p95=float(p95),
+            p99=float(p99),
+        )
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import pycurl
+
+from slatency.domain.entities.request import Request
+from slatency.domain.entities.response import Response
+from slatency.infrastructure.curl.handle_setup import create_handle, create_share, default_ca_info
+from slatency.infrastructure.curl.response_reader import read_response
+
+
+class PeriodicTestRunnerService:
+    """
+    Probes a fixed set of Requests every `interval` seconds until stopped, on a
+    single pycurl.CurlMulti, for a monitor that runs for weeks.
+
+    Each Request is probed once per interval on a fixed grid, the Requests' slots
+    spread evenly over the interval so they do not all fire at once. A probe still
+    in flight when its next slot comes skips that slot rather than overlapping, so a
+    hanging target is probed at most once per `Request.timeout`. Between probes the
+    runner blocks in `select` or `sleep` until the next slot is due.
+
+    Every Request keeps one handle for the lifetime of the runner, so the steady
+    state allocates nothing per probe beyond the Response. Probes are cold by
+    default; with `reuse_connections` each Request gets its own pycurl.CurlShare, as
+    in SweepTestRunnerService.
+
+    `on_response` is called with the index of the Request and every response as it
+    completes. `stop` ends `execute` from another thread or a signal handler within
+    `select_timeout`; probes in flight are abandoned.
+    """
+    def __init__(self, interval: float = 10.0, select_timeout: float = 1.0, ca_info: Optional[str] = None,
+                 reuse_connections: bool = False, on_response: Optional[Callable[[int, Response], None]] = None):
+        if interval <= 0:
+            raise ValueError("Interval must be a positive number")
+        self.interval = interval
+        self.select_timeout = select_timeout
+        self.ca_info = ca_info if ca_info is not None else default_ca_info()
+        self.reuse_connections = reuse_connections
+        self.on_response = on_response
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def execute(self, requests: List[Request]) -> int:
+        """
+        Probes the Requests until `stop` is called and returns how many probes completed.
+        """
+        multi = pycurl.CurlMulti()
+        shares = [create_share() if self.reuse_connections else None for _ in requests]
+        handles = [create_handle(request, self.ca_info, share) for request, share in zip(requests, shares)]
+        indices: Dict[pycurl.Curl, int] = {handle: index for index, handle in enumerate(handles)}
+        # Wall-clock start of every handle in flight
+        started_at: Dict[pycurl.Curl, float] = {}
+        start = time.monotonic()
+        next_due = [start + self.interval * index / len(requests) for index in range(len(requests))]
+        completed = 0
+        try:
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                for index, handle in enumerate(handles):
+                    if next_due[index] > now:
+                        continue
+                    # Slots missed while the previous probe was in flight are skipped
+                    next_due[index] += self.interval * (int((now - next_due[index]) / self.interval) + 1)
+                    if handle not in started_at:
+                        multi.add_handle(handle)
+                        started_at[handle] = time.time()
+
+                self._perform(multi)
+                finished = self._collect(multi, indices, started_at)
+                completed += finished
+                if not finished:
+                    timeout = min(min(next_due) - time.monotonic(), self.select_timeout)
+                    if started_at:
+                        multi.select(max(timeout, 0.0))
+                    elif timeout > 0:
+                        self._stopped.wait(timeout)
+        finally:
+            for handle in handles:
+                if handle in started_at:
+                    multi.remove_handle(handle)
+                handle.close()
+            multi.close()
+            for share in shares:
+                if share is not None:
+                    share.close()
+        return completed
+
+    def _perform(self, multi: pycurl.CurlMulti) -> None:
+        while True:
+            ret, _ = multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+    def _collect(self, multi: pycurl.CurlMulti, indices: Dict[pycurl.Curl, int],
+                 started_at: Dict[pycurl.Curl, float]) -> int:
+        """
+        Records every finished transfer and returns how many finished.
+        """
+        finished = 0
+        while True:
+            queued, succeeded, failed = multi.info_read()
+            for handle in succeeded:
+                self._finish(multi, handle, indices[handle], read_response(handle, started_at=started_at.pop(handle)))
+            for handle, errno, errmsg in failed:
+                self._finish(multi, handle, indices[handle], read_response(handle, errno, errmsg,
+                                                                           started_at=started_at.pop(handle)))
+            finished += len(succeeded) + len(failed)
+            if queued == 0:
+                return finished
+
+    def _finish(self, multi: pycurl.CurlMulti, handle: pycurl.Curl, index: int, response: Response) -> None:
+        multi.remove_handle(handle)
+        if self.on_response is not None:
+            self.on_response(index, response)
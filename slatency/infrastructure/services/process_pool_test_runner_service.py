@@ -0,0 +1,144 @@
+import multiprocessing
+import queue
+import traceback
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.response_columns import ResponseColumns
+from slatency.domain.entities.test import Test
+from slatency.infrastructure.mappers.response_codec import decode_response, encode_response
+from slatency.infrastructure.services.curl_multi_test_runner_service import CurlMultiTestRunnerService
+from slatency.infrastructure.services.sharding import split_evenly
+from slatency.infrastructure.services.sketch_latency_analysis_service import SketchLatencyAnalysisService
+
+# Messages sent from a worker to the parent: (kind, worker index, payload)
+BATCH = "batch"
+DONE = "done"
+ERROR = "error"
+
+
+class ProcessPoolTestRunnerService:
+    """
+    A TestRunnerService that shards a Test across `workers` processes, each driving its
+    own CurlMultiTestRunnerService, so probing is not limited by one interpreter's GIL.
+
+    `concurrency` and `rate` are totals and are split evenly across the workers. Workers
+    stream their responses back in compact batches (see `response_codec`), which the
+    parent appends to `Test.responses` and hands to `on_response`. With an `analysis`
+    each worker also keeps a SketchLatencyAnalysisService that the parent merges into
+    it; `stream_responses=False` then ships only those aggregates, which is the cheapest
+    way to get a LatencyReport for very large runs.
+    """
+    def __init__(self, workers: int, concurrency: int = 1, rate: Optional[float] = None,
+                 reuse_connections: bool = False, on_response: Optional[Callable[[Response], None]] = None,
+                 keep_responses: bool = True, stream_responses: bool = True,
+                 analysis: Optional[SketchLatencyAnalysisService] = None, batch_size: int = 256,
+                 start_method: Optional[str] = None):
+        if workers <= 0:
+            raise ValueError("Workers must be a positive integer")
+        if concurrency < workers:
+            raise ValueError("Concurrency must be at least the number of workers")
+        self.workers = workers
+        self.concurrency = concurrency
+        self.rate = rate
+        self.reuse_connections = reuse_connections
+        self.on_response = on_response
+        self.keep_responses = keep_responses
+        self.stream_responses = stream_responses
+        self.analysis = analysis
+        self.batch_size = batch_size
+        self._context = multiprocessing.get_context(start_method)
+
+    def execute(self, test: Test) -> Test:
+        """
+        Executes the test based on its `expected_responses` attribute.
+        """
+        remaining = test.expected_responses - len(test.responses)
+        shards = split_evenly(remaining, self.workers)
+        messages = self._context.Queue()
+        processes = []
+        for index, shard_size in enumerate(shards):
+            if shard_size == 0:
+                continue
+            options = {
+                "concurrency": split_evenly(self.concurrency, self.workers)[index],
+                "rate": self.rate / self.workers if self.rate is not None else None,
+                "reuse_connections": self.reuse_connections,
+            }
+            shard = replace(test, expected_responses=shard_size, responses=ResponseColumns())
+            process = self._context.Process(
+                target=_run_shard,
+                args=(index, shard, options, messages, self.stream_responses, self.analysis is not None,
+                      self.batch_size),
+                daemon=True,
+            )
+            process.start()
+            processes.append((index, process))
+
+        try:
+            self._receive(test, messages, processes)
+        finally:
+            for _, process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        return test
+
+    def _receive(self, test: Test, messages, processes) -> None:
+        running = {index: process for index, process in processes}
+        exited = set()
+        while running:
+            try:
+                kind, index, payload = messages.get(timeout=1.0)
+            except queue.Empty:
+                # A worker's last messages can still be in flight right after it exits,
+                # so it only counts as lost when it stays silent for another timeout
+                for index, process in running.items():
+                    if index in exited:
+                        raise RuntimeError(f"Worker {index} exited unexpectedly with code {process.exitcode}")
+                    if not process.is_alive():
+                        exited.add(index)
+                continue
+            if kind == BATCH:
+                for encoded in payload:
+                    self._record(test, decode_response(encoded))
+            elif kind == DONE:
+                if payload is not None and self.analysis is not None:
+                    self.analysis.merge(SketchLatencyAnalysisService.from_dict(payload))
+                del running[index]
+            elif kind == ERROR:
+                raise RuntimeError(f"Worker {index} failed:\n{payload}")
+
+    def _record(self, test: Test, response: Response) -> None:
+        if self.keep_responses:
+            test.responses.append(response)
+        if self.on_response is not None:
+            self.on_response(response)
+
+
+def _run_shard(index: int, shard: Test, options: Dict[str, Any], messages, stream_responses: bool,
+               aggregate: bool, batch_size: int) -> None:
+    """
+    Worker entry point: runs one shard and streams its results to the parent.
+    """
+    try:
+        analysis = SketchLatencyAnalysisService() if aggregate else None
+        batch: List[tuple] = []
+
+        def on_response(response: Response) -> None:
+            if analysis is not None:
+                analysis.record(response)
+            if stream_responses:
+                batch.append(encode_response(response))
+                if len(batch) >= batch_size:
+                    messages.put((BATCH, index, list(batch)))
+                    batch.clear()
+
+        CurlMultiTestRunnerService(on_response=on_response, keep_responses=False, **options).execute(shard)
+        if batch:
+            messages.put((BATCH, index, batch))
+        messages.put((DONE, index, analysis.to_dict() if analysis is not None else None))
+    except Exception:
+        messages.put((ERROR, index, traceback.format_exc()))
+
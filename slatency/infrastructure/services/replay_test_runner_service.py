@@ -0,0 +1,124 @@
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pycurl
+
+from slatency.domain.entities.response import Response
+from slatency.domain.value_objects.schedule import Schedule
+from slatency.infrastructure.curl.handle_setup import create_handle, create_share, default_ca_info
+from slatency.infrastructure.curl.response_reader import read_response
+from slatency.infrastructure.replay.trace_reader import TraceRecord
+
+
+class ReplayTestRunnerService:
+    """
+    Reissues the requests of a recorded trace on a single pycurl.CurlMulti at their
+    original relative timing, divided by `speed` (2.0 replays twice as fast).
+
+    The replay is open-loop like CurlMultiTestRunnerService with a `rate`: a request
+    is due at its recorded offset whether or not earlier ones have finished, and every
+    response carries a Schedule with its intended and actual send time, so a server
+    that cannot keep up shows as queueing delay instead of a slower replay. At most
+    `concurrency` requests are in flight; requests due while all slots are taken are
+    sent late, which their Schedule records too.
+
+    Records are pulled from the iterable one at a time, just before they are due, so a
+    trace streamed from disk replays in constant memory. Probes are cold by default;
+    with `reuse_connections` connections, DNS entries and TLS sessions are shared by
+    all requests through a pycurl.CurlShare, as a production client pool would.
+
+    `on_response` is called with the TraceRecord and its response as it completes.
+    """
+    def __init__(self, concurrency: int = 100, speed: float = 1.0, select_timeout: float = 1.0,
+                 ca_info: Optional[str] = None, reuse_connections: bool = False,
+                 on_response: Optional[Callable[[TraceRecord, Response], None]] = None):
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be a positive integer")
+        if speed <= 0:
+            raise ValueError("Speed must be a positive number")
+        self.concurrency = concurrency
+        self.speed = speed
+        self.select_timeout = select_timeout
+        self.ca_info = ca_info if ca_info is not None else default_ca_info()
+        self.reuse_connections = reuse_connections
+        self.on_response = on_response
+
+    def execute(self, records: Iterable[TraceRecord]) -> int:
+        """
+        Replays every record and returns how many were sent.
+        """
+        multi = pycurl.CurlMulti()
+        share = create_share() if self.reuse_connections else None
+        # Record, schedule and wall-clock start of every handle in flight
+        in_flight: Dict[pycurl.Curl, Tuple[TraceRecord, Schedule, float]] = {}
+        records = iter(records)
+        pending = next(records, None)
+        sent = 0
+        replay_start = time.monotonic()
+        try:
+            while pending is not None or in_flight:
+                while pending is not None and len(in_flight) < self.concurrency:
+                    intended_ms = pending.offset * 1000.0 / self.speed
+                    now_ms = (time.monotonic() - replay_start) * 1000.0
+                    if intended_ms > now_ms:
+                        break
+                    handle = create_handle(pending.request, self.ca_info, share)
+                    multi.add_handle(handle)
+                    in_flight[handle] = (pending, Schedule(intended_start=intended_ms, actual_start=now_ms),
+                                         time.time())
+                    sent += 1
+                    pending = next(records, None)
+
+                self._perform(multi)
+                if not self._collect(multi, in_flight):
+                    self._wait(multi, in_flight, self._wait_timeout(pending, in_flight, replay_start))
+        finally:
+            for handle in in_flight:
+                multi.remove_handle(handle)
+                handle.close()
+            multi.close()
+            if share is not None:
+                share.close()
+        return sent
+
+    def _wait_timeout(self, pending: Optional[TraceRecord], in_flight: Dict, replay_start: float) -> float:
+        if pending is None or len(in_flight) >= self.concurrency:
+            return self.select_timeout
+        due_in = pending.offset / self.speed - (time.monotonic() - replay_start)
+        return min(max(due_in, 0.0), self.select_timeout)
+
+    def _wait(self, multi: pycurl.CurlMulti, in_flight: Dict, timeout: float) -> None:
+        if in_flight:
+            multi.select(timeout)
+        elif timeout > 0:
+            time.sleep(timeout)
+
+    def _perform(self, multi: pycurl.CurlMulti) -> None:
+        while True:
+            ret, _ = multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+    def _collect(self, multi: pycurl.CurlMulti, in_flight: Dict[pycurl.Curl, Tuple[TraceRecord, Schedule, float]]) -> int:
+        """
+        Records every finished transfer and returns how many finished.
+        """
+        finished = 0
+        while True:
+            queued, succeeded, failed = multi.info_read()
+            for handle in succeeded:
+                record, schedule, started_at = in_flight.pop(handle)
+                self._finish(multi, handle, record, read_response(handle, schedule=schedule, started_at=started_at))
+            for handle, errno, errmsg in failed:
+                record, schedule, started_at = in_flight.pop(handle)
+                self._finish(multi, handle, record, read_response(handle, errno, errmsg, schedule,
+                                                                  started_at=started_at))
+            finished += len(succeeded) + len(failed)
+            if queued == 0:
+                return finished
+
+    def _finish(self, multi: pycurl.CurlMulti, handle: pycurl.Curl, record: TraceRecord, response: Response) -> None:
+        multi.remove_handle(handle)
+        handle.close()
+        if self.on_response is not None:
+            self.on_response(record, response)
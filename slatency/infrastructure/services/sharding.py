@@ -0,0 +1,8 @@
+from typing import List
+
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """
+    Splits `total` into `parts` integers that differ by at most one, the larger ones first.
+    """
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
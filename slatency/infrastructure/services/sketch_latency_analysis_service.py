@@ -0,0 +1,93 @@
+from dataclasses import fields
+from typing import Any, Dict
+
+from slatency.domain.entities.response import Response, SuccessfulResponse
+from slatency.domain.entities.response_columns import FAILURE_PHASES, NONE, ResponseColumns
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.failure_phase import FailurePhase
+from slatency.domain.value_objects.latency import Latency
+from slatency.domain.value_objects.latency_report import LatencyReport
+from slatency.domain.value_objects.latency_statistics import LatencyStatistics
+from slatency.infrastructure.analysis.log_histogram import LogHistogram
+
+PHASES = [phase.name for phase in fields(Latency)]
+
+
+class SketchLatencyAnalysisService:
+    """
+    A LatencyAnalysisService backed by one LogHistogram per latency phase.
+
+    Responses are recorded as they arrive, so a LatencyReport is available at any
+    point of a run in time and memory independent of the number of responses.
+    Percentiles are within `relative_accuracy` of the exact values, min, max and
+    average are exact. Services with the same accuracy, e.g. from separate runs or
+    workers, merge without losing information.
+    """
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.histograms: Dict[str, LogHistogram] = {phase: LogHistogram(relative_accuracy) for phase in PHASES}
+        self.failures: Dict[FailurePhase, int] = {phase: 0 for phase in FailurePhase}
+
+    def analyze(self, test: Test) -> LatencyReport:
+        """
+        Records the responses in a Test object and returns a LatencyReport.
+        """
+        responses = test.responses
+        if not isinstance(responses, ResponseColumns):
+            for response in responses:
+                self.record(response)
+            return self.report()
+        # Read the columns directly instead of materialising a view per response
+        failure_phases = responses.failure_phase
+        for phase, histogram in self.histograms.items():
+            column = responses.timings[phase]
+            for row, failure_phase in enumerate(failure_phases):
+                if failure_phase == NONE:
+                    histogram.record(round(column[row], 3))
+        for index, phase in enumerate(FAILURE_PHASES):
+            self.failures[phase] += failure_phases.count(index)
+        return self.report()
+
+    def record(self, response: Response) -> None:
+        if isinstance(response, SuccessfulResponse):
+            for phase, histogram in self.histograms.items():
+                histogram.record(getattr(response.latency, phase))
+        else:
+            self.failures[response.failure_phase] += 1
+
+    def merge(self, other: "SketchLatencyAnalysisService") -> None:
+        for phase, histogram in self.histograms.items():
+            histogram.merge(other.histograms[phase])
+        for phase, count in other.failures.items():
+            self.failures[phase] += count
+
+    def report(self) -> LatencyReport:
+        return LatencyReport(**{phase: self._statistics(histogram) for phase, histogram in self.histograms.items()})
+
+    @property
+    def successes(self) -> int:
+        return self.histograms["total"].count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "histograms": {phase: histogram.to_dict() for phase, histogram in self.histograms.items()},
+            "failures": {phase.name: count for phase, count in self.failures.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SketchLatencyAnalysisService":
+        service = cls(data["relative_accuracy"])
+        service.histograms = {phase: LogHistogram.from_dict(histogram) for phase, histogram in data["histograms"].items()}
+        service.failures = {FailurePhase[name]: count for name, count in data["failures"].items()}
+        return service
+
+    def _statistics(self, histogram: LogHistogram) -> LatencyStatistics:
+        return LatencyStatistics(
+            min=histogram.min if histogram.count else float("nan"),
+            max=histogram.max if histogram.count else float("nan"),
+            average=histogram.mean,
+            p90=histogram.quantile(0.90),
+            p95=histogram.quantile(0.95),
+            p99=histogram.quantile(0.99),
+        )
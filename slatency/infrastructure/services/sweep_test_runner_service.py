@@ -0,0 +1,136 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+import pycurl
+
+from slatency.domain.entities.response import Response
+from slatency.domain.entities.test import Test
+from slatency.infrastructure.curl.handle_setup import create_handle, create_share, default_ca_info
+from slatency.infrastructure.curl.response_reader import read_response
+
+
+class SweepTestRunnerService:
+    """
+    Runs many Tests, one per target, interleaved on a single pycurl.CurlMulti, so a
+    sweep over hundreds of endpoints pays for one process instead of one per target.
+
+    At most `concurrency` transfers are in flight in total and at most
+    `per_target_concurrency` per Test. Targets take turns round-robin, so a slow
+    target holds back no more than its own slots and every target progresses at a
+    similar pace.
+
+    Probes are cold by default, as in CurlMultiTestRunnerService. With
+    `reuse_connections` each target gets its own pycurl.CurlShare: connections, DNS
+    entries and TLS sessions are reused between the probes of a target but never
+    across targets, which keeps targets that pin the same host name to different
+    backends (`Request.resolve`) apart.
+
+    `on_response` is called with the Test and every response as it completes. With
+    `keep_responses` set to False responses are only handed to `on_response` and the
+    Tests' responses stay empty.
+    """
+    def __init__(self, concurrency: int = 100, per_target_concurrency: int = 1, select_timeout: float = 1.0,
+                 ca_info: Optional[str] = None, reuse_connections: bool = False,
+                 on_response: Optional[Callable[[Test, Response], None]] = None, keep_responses: bool = True):
+        if concurrency <= 0:
+            raise ValueError("Concurrency must be a positive integer")
+        if per_target_concurrency <= 0:
+            raise ValueError("Per-target concurrency must be a positive integer")
+        self.concurrency = concurrency
+        self.per_target_concurrency = per_target_concurrency
+        self.select_timeout = select_timeout
+        self.ca_info = ca_info if ca_info is not None else default_ca_info()
+        self.reuse_connections = reuse_connections
+        self.on_response = on_response
+        self.keep_responses = keep_responses
+
+    def execute(self, tests: List[Test]) -> List[Test]:
+        """
+        Executes every Test until it has received its `expected_responses`.
+        """
+        multi = pycurl.CurlMulti()
+        shares = [create_share() for _ in tests] if self.reuse_connections else [None] * len(tests)
+        idle: List[List[pycurl.Curl]] = [[] for _ in tests]
+        remaining = [test.expected_responses - len(test.responses) for test in tests]
+        in_flight = [0] * len(tests)
+        # Target of every handle in flight, and when its probe started
+        targets: Dict[pycurl.Curl, int] = {}
+        started_at: Dict[pycurl.Curl, float] = {}
+        # Targets that may start a probe now, in turn
+        ready: Deque[int] = deque(index for index, count in enumerate(remaining) if count > 0)
+        try:
+            while ready or targets:
+                while ready and len(targets) < self.concurrency:
+                    index = ready.popleft()
+                    test = tests[index]
+                    handle = idle[index].pop() if idle[index] else create_handle(test.request, self.ca_info,
+                                                                                 shares[index])
+                    multi.add_handle(handle)
+                    targets[handle] = index
+                    started_at[handle] = time.time()
+                    remaining[index] -= 1
+                    in_flight[index] += 1
+                    if remaining[index] > 0 and in_flight[index] < self.per_target_concurrency:
+                        ready.append(index)
+
+                self._perform(multi)
+                finished = self._collect(multi, tests, targets, started_at, idle)
+                for index in finished:
+                    in_flight[index] -= 1
+                    # A target at its cap is out of turn until one of its probes finishes
+                    if remaining[index] > 0 and in_flight[index] == self.per_target_concurrency - 1:
+                        ready.append(index)
+                if not finished and targets:
+                    multi.select(self.select_timeout)
+        finally:
+            for handle in targets:
+                multi.remove_handle(handle)
+                handle.close()
+            for handles in idle:
+                for handle in handles:
+                    handle.close()
+            multi.close()
+            for share in shares:
+                if share is not None:
+                    share.close()
+        return tests
+
+    def _perform(self, multi: pycurl.CurlMulti) -> None:
+        while True:
+            ret, _ = multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+    def _collect(self, multi: pycurl.CurlMulti, tests: List[Test], targets: Dict[pycurl.Curl, int],
+                 started_at: Dict[pycurl.Curl, float], idle: List[List[pycurl.Curl]]) -> List[int]:
+        """
+        Records every finished transfer and returns the targets they belonged to.
+        """
+        finished: List[int] = []
+        while True:
+            queued, succeeded, failed = multi.info_read()
+            for handle in succeeded:
+                finished.append(self._finish(multi, handle, read_response(handle, started_at=started_at.pop(handle)),
+                                             tests, targets, idle))
+            for handle, errno, errmsg in failed:
+                finished.append(self._finish(multi, handle, read_response(handle, errno, errmsg,
+                                                                          started_at=started_at.pop(handle)),
+                                             tests, targets, idle))
+            if queued == 0:
+                return finished
+
+    def _finish(self, multi: pycurl.CurlMulti, handle: pycurl.Curl, response: Response, tests: List[Test],
+                targets: Dict[pycurl.Curl, int], idle: List[List[pycurl.Curl]]) -> int:
+        index = targets.pop(handle)
+        multi.remove_handle(handle)
+        if self.reuse_connections:
+            idle[index].append(handle)
+        else:
+            handle.close()
+        test = tests[index]
+        if self.keep_responses:
+            test.responses.append(response)
+        if self.on_response is not None:
+            self.on_response(test, response)
+        return index
@@ -0,0 +1,176 @@
+import argparse
+import json
+import math
+import sys
+from dataclasses import asdict
+from typing import Any, Dict, List, Tuple
+
+from slatency.domain.entities.test import Test
+from slatency.domain.value_objects.body_policy import BodyPolicy
+from slatency.domain.value_objects.latency_report import LatencyReport
+from slatency.infrastructure.mappers.request_mapper import request_to_dict
+from slatency.infrastructure.mappers.response_mapper import response_to_result
+from slatency.infrastructure.mappers.target_mapper import load_targets
+from slatency.infrastructure.presentation.live_progress_view import LiveProgressView
+from slatency.infrastructure.services.json_lines_test_output_persistence_service import JsonLinesTestOutputPersistenceService
+from slatency.infrastructure.services.sketch_latency_analysis_service import SketchLatencyAnalysisService
+from slatency.infrastructure.services.sweep_test_runner_service import SweepTestRunnerService
+
+# Columns of the comparative table: (label, phase, statistic)
+SUMMARY_COLUMNS = [
+    ("DNS P99", "dns", "p99"),
+    ("Conn P99", "connect", "p99"),
+    ("TLS P99", "tls", "p99"),
+    ("TTFB P99", "receive_first_byte", "p99"),
+    ("Total Avg", "total", "average"),
+    ("Total P90", "total", "p90"),
+    ("Total P99", "total", "p99"),
+]
+
+
+def print_summary(rows: List[Tuple[str, SketchLatencyAnalysisService, LatencyReport]]) -> None:
+    """
+    Prints one line per target, slowest total P99 first, with times in milliseconds.
+    """
+    width = max([len("Target")] + [len(name) for name, _, _ in rows])
+    print(f"\n--- Sweep Summary ({len(rows)} targets, times in ms, slowest first) ---")
+    print(f"{'Target':<{width}} {'OK':>7} {'Failed':>7} " + " ".join(f"{label:>10}" for label, _, _ in SUMMARY_COLUMNS))
+    ordered = sorted(rows, key=lambda row: -row[2].total.p99 if not math.isnan(row[2].total.p99) else math.inf)
+    for name, analysis, report in ordered:
+        values = " ".join(_format(getattr(getattr(report, phase), statistic)) for _, phase, statistic in SUMMARY_COLUMNS)
+        print(f"{name:<{width}} {analysis.successes:>7} {sum(analysis.failures.values()):>7} {values}")
+
+
+def print_target_report(name: str, analysis: SketchLatencyAnalysisService, report: LatencyReport) -> None:
+    print(f"\n--- {name} ---")
+    print(f"OK {analysis.successes}, failed {sum(analysis.failures.values())}"
+          + "".join(f", {phase.value} {count}" for phase, count in analysis.failures.items() if count))
+    print(f"{'Phase':<20} {'Min':>10} {'Avg':>10} {'P90':>10} {'P95':>10} {'P99':>10} {'Max':>10}")
+    for phase, statistics in asdict(report).items():
+        print(f"{phase:<20} " + " ".join(_format(statistics[key]) for key in ("min", "average", "p90", "p95", "p99", "max")))
+
+
+def report_to_dict(name: str, test: Test, analysis: SketchLatencyAnalysisService, report: LatencyReport) -> Dict[str, Any]:
+    return {
+        "target": name,
+        "test_id": str(test.test_id),
+        "request": request_to_dict(test.request),
+        "successes": analysis.successes,
+        "failures": {phase.name: count for phase, count in analysis.failures.items()},
+        # Phases without successful probes have no statistics
+        "report": {phase: {key: None if math.isnan(value) else value for key, value in statistics.items()}
+                   for phase, statistics in asdict(report).items()},
+    }
+
+
+def _format(value: float) -> str:
+    return f"{'-':>10}" if math.isnan(value) else f"{value:>10.3f}"
+
+
+def build_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Probe many endpoints interleaved in one process and compare their latency.")
+    parser.add_argument("targets_file", type=str, help="JSON array or JSON Lines file of Request definitions (url, method, headers, body, timeout, connect_timeout, resolve, body_policy), each with an optional name and probes, or plain URL strings.")
+    parser.add_argument("--probes", type=int, default=10, help="Probes per target, unless the target sets 'probes' (default: 10).")
+    parser.add_argument("--concurrency", type=int, default=50, help="Max number of requests in flight across all targets (default: 50).")
+    parser.add_argument("--per-target-concurrency", type=int, default=1, help="Max number of requests in flight to any one target (default: 1).")
+    parser.add_argument("--warm", action="store_true", help="Reuse connections, DNS entries and TLS sessions between the probes of a target, never across targets (default: every probe is cold).")
+    parser.add_argument("--timeout", type=int, default=60, help="Total timeout for each request in seconds, unless the target sets one (default: 60).")
+    parser.add_argument("--connect-timeout", type=int, default=30, help="Connection timeout for each request in seconds, unless the target sets one (default: 30).")
+    parser.add_argument("--body", type=str, default="discard", metavar="POLICY", help="What to record of response bodies, unless the target sets 'body_policy': 'discard', 'count', 'hash' or 'keep[:N]', as in 'slatency run' (default: discard).")
+    parser.add_argument("--output-file", type=str, default="sweep.jsonl", help="JSON Lines file for the results of every probe, tagged with their target (default: sweep.jsonl).")
+    parser.add_argument("--report-file", type=str, default=None, help="Also save the LatencyReport of every target as JSON to this file.")
+    parser.add_argument("--database", type=str, default=None, help="Also store every target's Test, with its responses, in this SQLite database.")
+    parser.add_argument("--details", action="store_true", help="Print the full LatencyReport of every target after the summary.")
+    parser.add_argument("--progress-interval", type=float, default=0.5, help="Seconds between refreshes of the live progress view; 0 disables it (default: 0.5).")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = build_parser(prog).parse_args(argv)
+    for option, value in (("Probes", args.probes), ("Concurrency", args.concurrency),
+                          ("Per-target concurrency", args.per_target_concurrency)):
+        if value <= 0:
+            print(f"Error: {option} must be a positive integer.")
+            sys.exit(1)
+    try:
+        body_policy = BodyPolicy.from_string(args.body)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    try:
+        targets = load_targets(args.targets_file, args.probes, args.timeout, args.connect_timeout, body_policy)
+    except FileNotFoundError:
+        print(f"Error: Targets file '{args.targets_file}' not found.")
+        sys.exit(1)
+    except (ValueError, KeyError) as e:
+        print(f"Error reading '{args.targets_file}': {e}")
+        sys.exit(1)
+    if not targets:
+        print(f"Error: '{args.targets_file}' lists no targets.")
+        sys.exit(1)
+
+    total = sum(test.expected_responses for _, test in targets)
+    print(f"Sweeping {len(targets)} targets with {total} probes...\n")
+    names = {test.test_id: name for name, test in targets}
+    analyses = {test.test_id: SketchLatencyAnalysisService() for _, test in targets}
+    try:
+        writer = JsonLinesTestOutputPersistenceService(args.output_file)
+    except IOError as e:
+        print(f"Error opening {args.output_file}: {e}")
+        sys.exit(1)
+    progress = LiveProgressView(total, interval=args.progress_interval) if args.progress_interval > 0 else None
+
+    def on_response(test, response):
+        analyses[test.test_id].record(response)
+        result = response_to_result(response)
+        if progress is not None:
+            progress.update(result)
+        result["target"] = names[test.test_id]
+        writer.append_result(result)
+
+    runner = SweepTestRunnerService(concurrency=args.concurrency, per_target_concurrency=args.per_target_concurrency,
+                                    reuse_connections=args.warm, on_response=on_response,
+                                    keep_responses=args.database is not None)
+    if progress is not None:
+        progress.start()
+    try:
+        runner.execute([test for _, test in targets])
+        if progress is not None:
+            progress.stop()
+        print(f"\nFinished {total} probes.")
+    except KeyboardInterrupt:
+        if progress is not None:
+            progress.stop()
+        print("\nInterrupted, reporting the probes completed so far.")
+    finally:
+        writer.close()
+        print(f"Results saved to {args.output_file}")
+
+    rows = [(name, analyses[test.test_id], analyses[test.test_id].report()) for name, test in targets]
+    print_summary(rows)
+    if args.details:
+        for name, analysis, report in rows:
+            print_target_report(name, analysis, report)
+
+    if args.report_file:
+        try:
+            with open(args.report_file, "w") as f:
+                json.dump([report_to_dict(name, test, analysis, report)
+                           for (name, test), (_, analysis, report) in zip(targets, rows)], f, indent=4)
+            print(f"\nReports saved to {args.report_file}")
+        except IOError as e:
+            print(f"Error saving reports to {args.report_file}: {e}")
+
+    if args.database:
+        from slatency.infrastructure.repositories.sqlite_test_repository import SqliteTestRepository
+        try:
+            with SqliteTestRepository(args.database) as repository:
+                for _, test in targets:
+                    repository.save(test)
+            print(f"{len(targets)} tests saved to {args.database}")
+        except Exception as e:
+            print(f"Error saving tests to {args.database}: {e}")
+
+
+if __name__ == "__main__":
+    main()
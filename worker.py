@@ -0,0 +1,25 @@
+import argparse
+
+from slatency.infrastructure.distributed.worker_server import WorkerServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a slatency worker that executes probing jobs sent by a coordinator (main.py --remote-worker).")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1). Anyone who can reach it can make this host send requests.")
+    parser.add_argument("--port", type=int, default=7878, help="Port to listen on (default: 7878).")
+    parser.add_argument("--batch-size", type=int, default=256, help="Results sent per frame (default: 256).")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="Max seconds between result frames while probes complete (default: 0.5).")
+
+    args = parser.parse_args()
+
+    server = WorkerServer(args.host, args.port, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    host, port = server.address
+    print(f"slatency worker listening on {host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nWorker stopped.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()